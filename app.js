@@ -13,6 +13,7 @@ if (typeof pdfjsLib !== 'undefined') {
 // 전역 변수
 let currentTab = 'editor';
 let templates = JSON.parse(localStorage.getItem('templates') || '{}');
+const AUTO_DETECT_VENDOR = '__auto__';  // 업체 선택 대신 서버 템플릿 라이브러리에서 자동 감지 (/detect)
 let currentPdfDoc = null;
 let currentPage = null;
 let currentViewport = null;
@@ -20,6 +21,7 @@ let currentPageRealViewport = null;  // scale=1.0인 실제 PDF 좌표계
 let currentPageNum = 1;
 let selectedField = null;
 let highlights = [];
+let lastExtraction = null;  // 마지막 추출의 { file, vendor, template } (같은 PDF를 템플릿만 고쳐 다시 추출하는지 판단)
 
 // 필드 정의 및 색상
 const DEFAULT_FIELDS = [
@@ -217,6 +219,7 @@ function loadExtractorTab() {
                 <div style="display: flex; gap: 5px; margin-bottom: 20px;">
                     <select id="vendor-select" style="flex: 1; padding: 10px; border: 1px solid #ddd; border-radius: 5px;">
                         <option value="">업체를 선택하세요</option>
+                        <option value="${AUTO_DETECT_VENDOR}">자동 감지 (서버 템플릿 라이브러리)</option>
                         ${vendorList.map(v => `<option value="${v}">${v}</option>`).join('')}
                     </select>
                     ${vendorList.length > 0 ? `<button onclick="deleteTemplate(document.getElementById('vendor-select').value)" style="padding: 10px 15px; background: #dc3545; color: white; border: none; border-radius: 5px; cursor: pointer;" title="선택된 템플릿 삭제">삭제</button>` : ''}
@@ -674,8 +677,9 @@ async function extractData() {
         return;
     }
     
-    const template = templates[vendorName];
-    if (!template || !template.fields) {
+    const autoDetect = vendorName === AUTO_DETECT_VENDOR;
+    const template = autoDetect ? null : templates[vendorName];
+    if (!autoDetect && (!template || !template.fields)) {
         alert('템플릿을 찾을 수 없습니다.');
         return;
     }
@@ -702,25 +706,43 @@ async function extractData() {
     try {
         const file = fileInput.files[0];
         addLog(`PDF 파일: ${file.name}`);
-        addLog(`템플릿: ${vendorName}`);
-        addLog(`필드 수: ${template.fields.length}`);
         
         // FormData 생성
         addLog('FormData 생성 중...');
         const formData = new FormData();
         formData.append('pdf', file);
         
-        // 템플릿 정보 추가
-        const templateData = {
-            vendor: vendorName,
-            pattern_extraction: true,  // Y축 스캔 방식 활성화
-            fields: template.fields.map(f => ({
-                field: f.field,
-                bbox: f.bbox,
-                type: f.type || (f.field === 'size_grid' ? 'table' : 'text')
-            }))
-        };
-        formData.append('template', JSON.stringify(templateData));
+        let templateData = null;
+        if (autoDetect) {
+            // 템플릿은 서버가 첫 페이지로 업체를 감지해서 결정
+            addLog('템플릿: 자동 감지');
+            formData.append('pattern_extraction', 'true');
+        } else {
+            addLog(`템플릿: ${vendorName}`);
+            addLog(`필드 수: ${template.fields.length}`);
+            
+            // 템플릿 정보 추가
+            templateData = {
+                vendor: vendorName,
+                pattern_extraction: true,  // Y축 스캔 방식 활성화
+                fields: template.fields.map(f => ({
+                    field: f.field,
+                    bbox: f.bbox,
+                    type: f.type || (f.field === 'size_grid' ? 'table' : 'text')
+                }))
+            };
+            formData.append('template', JSON.stringify(templateData));
+            
+            // 같은 PDF를 템플릿만 고쳐 다시 추출할 때만 증분 추출 (바뀐 필드만 재계산)
+            // 처음 추출하는 PDF는 일반 경로(병렬/결과 캐시)로 처리
+            const templateJson = JSON.stringify(templateData.fields);
+            if (lastExtraction && lastExtraction.file === fileKey(file) && lastExtraction.vendor === vendorName
+                && lastExtraction.template !== templateJson) {
+                formData.append('incremental', 'true');
+                addLog('템플릿 수정 후 재추출: 바뀐 필드만 다시 계산');
+            }
+        }
+        formData.append('format', 'ndjson');  // 제품 단위 스트리밍 응답
         addLog('템플릿 데이터 준비 완료');
         
         // 백엔드 API 호출
@@ -728,7 +750,7 @@ async function extractData() {
         const apiUrl = API_URL !== 'YOUR_RENDER_API_URL_HERE' ? API_URL : 'http://localhost:5000';
         addLog(`API URL: ${apiUrl}`);
         
-        const response = await fetch(`${apiUrl}/extract`, {
+        const response = await fetch(`${apiUrl}/${autoDetect ? 'detect' : 'extract'}`, {
             method: 'POST',
             body: formData
         });
@@ -741,23 +763,77 @@ async function extractData() {
             throw new Error(errorData.error || '추출 실패');
         }
         
-        addLog('응답 데이터 파싱 중...');
-        const result = await response.json();
-        addLog(`추출 완료. 제품 수: ${result.products ? result.products.length : 'N/A'}`);
-        
-        const extractedData = result.data;
+        // 필드별 배열 (Excel 다운로드용). 자동 감지면 감지 레코드가 올 때 정해짐
+        let fieldNames = templateData ? templateData.fields.map(f => f.field) : [];
+        const extractedData = {};
+        fieldNames.forEach(name => { extractedData[name] = []; });
+        const headerHtml = () => `<tr>${['page', ...fieldNames].map(name => `<th style="border-bottom: 1px solid #ddd; padding: 4px 8px; text-align: left;">${escapeHtml(name)}</th>`).join('')}</tr>`;
         
-        // 결과 표시
+        // 스트리밍 결과 테이블 (제품이 도착할 때마다 행 추가)
         const resultContainer = document.createElement('div');
         resultContainer.style.cssText = 'background: white; padding: 20px; border-radius: 8px; margin-top: 10px;';
         resultContainer.innerHTML = `
-            <h4>추출 결과</h4>
-            <pre style="background: #f5f5f5; padding: 15px; border-radius: 5px; overflow-x: auto; max-height: 400px; overflow-y: auto;">${JSON.stringify(extractedData, null, 2)}</pre>
-            <button onclick="downloadExcel(${JSON.stringify(extractedData).replace(/"/g, '&quot;')})" style="margin-top: 15px; padding: 10px 20px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;">
-                Excel 다운로드
-            </button>
+            <h4>추출 결과 <span class="product-count" style="color: #888; font-size: 0.9em;">(0개)</span></h4>
+            <div style="overflow-x: auto; max-height: 400px; overflow-y: auto;">
+                <table style="border-collapse: collapse; font-size: 12px; width: 100%;">
+                    <thead>${headerHtml()}</thead>
+                    <tbody></tbody>
+                </table>
+            </div>
         `;
         resultDiv.appendChild(resultContainer);
+        const tbody = resultContainer.querySelector('tbody');
+        const countLabel = resultContainer.querySelector('.product-count');
+        
+        addLog('제품 수신 중...');
+        let productCount = 0;
+        let lastPage = -1;
+        let summary = null;
+        
+        await readNdjsonStream(response, record => {
+            if (record.type === 'detection') {
+                fieldNames = record.fields;
+                fieldNames.forEach(name => { extractedData[name] = []; });
+                resultContainer.querySelector('thead').innerHTML = headerHtml();
+                addLog(`감지된 업체: ${record.vendor} (점수 ${record.score})`);
+            } else if (record.type === 'product') {
+                const product = record.product;
+                fieldNames.forEach(name => extractedData[name].push(product[name] ?? null));
+                
+                const row = document.createElement('tr');
+                row.innerHTML = ['page', ...fieldNames].map(name => {
+                    const value = name === 'page' ? record.page + 1 : product[name];
+                    const text = value && typeof value === 'object' ? JSON.stringify(value) : (value ?? '');
+                    return `<td style="border-bottom: 1px solid #f0f0f0; padding: 4px 8px;">${escapeHtml(String(text))}</td>`;
+                }).join('');
+                tbody.appendChild(row);
+                
+                productCount++;
+                countLabel.textContent = `(${productCount}개)`;
+                if (record.page !== lastPage) {
+                    lastPage = record.page;
+                    addLog(`페이지 ${record.page + 1} 처리 완료`);
+                }
+            } else if (record.type === 'summary') {
+                summary = record;
+            } else if (record.type === 'error') {
+                throw new Error(record.error);
+            }
+        });
+        
+        if (!summary) {
+            throw new Error('응답이 중간에 끊겼습니다');
+        }
+        addLog(`추출 완료. 페이지 수: ${summary.pages}, 제품 수: ${summary.products}`);
+        lastExtraction = templateData
+            ? { file: fileKey(file), vendor: vendorName, template: JSON.stringify(templateData.fields) }
+            : null;
+        
+        const downloadButton = document.createElement('button');
+        downloadButton.textContent = 'Excel 다운로드';
+        downloadButton.style.cssText = 'margin-top: 15px; padding: 10px 20px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;';
+        downloadButton.onclick = () => downloadServerExport(`${apiUrl}/${autoDetect ? 'detect' : 'extract'}`, formData, extractedData);
+        resultContainer.appendChild(downloadButton);
         addLog('결과 표시 완료');
         
     } catch (error) {
@@ -777,6 +853,38 @@ async function extractData() {
     }
 }
 
+// NDJSON 스트림을 한 줄씩 읽어서 레코드 콜백 호출
+async function readNdjsonStream(response, onRecord) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        
+        let newlineIndex;
+        while ((newlineIndex = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newlineIndex).trim();
+            buffer = buffer.slice(newlineIndex + 1);
+            if (line) {
+                onRecord(JSON.parse(line));
+            }
+        }
+        
+        if (done) break;
+    }
+    
+    if (buffer.trim()) {
+        onRecord(JSON.parse(buffer));
+    }
+}
+
+// HTML 특수문자 이스케이프
+function escapeHtml(text) {
+    return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
 // 필드 색상 가져오기
 function getFieldColor(fieldName) {
     const field = fieldDefinitions.find(f => f.name === fieldName);
@@ -866,7 +974,7 @@ function importTemplates(event) {
 
 // 템플릿 제거
 function deleteTemplate(vendorName) {
-    if (!vendorName) {
+    if (!vendorName || vendorName === AUTO_DETECT_VENDOR) {
         alert('삭제할 템플릿을 선택해주세요.');
         return;
     }
@@ -877,6 +985,36 @@ function deleteTemplate(vendorName) {
     alert('템플릿이 삭제되었습니다.');
 }
 
+// 업로드 파일 식별자 (같은 PDF를 다시 고른 경우 판단용)
+function fileKey(file) {
+    return `${file.name}:${file.size}:${file.lastModified}`;
+}
+
+// 서버에서 XLSX로 내보내기 (사이즈 그리드는 사이즈별 열)
+// 서버에 openpyxl이 없거나 요청이 실패하면 브라우저에서 SheetJS로 생성
+async function downloadServerExport(url, formData, fallbackData) {
+    const exportData = new FormData();
+    for (const [key, value] of formData.entries()) {
+        if (key !== 'format') exportData.append(key, value);
+    }
+    exportData.append('format', 'xlsx');
+    
+    try {
+        const response = await fetch(url, { method: 'POST', body: exportData });
+        if (!response.ok) {
+            throw new Error(`응답 상태 ${response.status}`);
+        }
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(await response.blob());
+        link.download = 'extracted_data.xlsx';
+        link.click();
+        setTimeout(() => URL.revokeObjectURL(link.href), 0);
+    } catch (error) {
+        console.warn('서버 내보내기 실패, 브라우저에서 생성:', error);
+        downloadExcel(fallbackData);
+    }
+}
+
 // Excel 다운로드
 function downloadExcel(data) {
     const ws = XLSX.utils.json_to_sheet([data]);
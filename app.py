@@ -1,27 +1,251 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-import pdfplumber
-import pandas as pd
-import numpy as np
 import json
+import csv
+import re
 import tempfile
+import io
 import os
-from collections import defaultdict
+import sys
+import mmap
+import time
+import uuid
+import shutil
+import sqlite3
+import zipfile
+import zlib
+import multiprocessing
+import hashlib
+import hmac
+import gc
+import importlib
+import pickle
+import threading
+import signal
+import fcntl
+import contextvars
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from collections import Counter, OrderedDict, defaultdict, namedtuple
+from contextlib import ExitStack, closing, contextmanager, nullcontext
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 무거운 모듈(pdfplumber, pandas, numpy)은 기본적으로 처음 쓰는 코드 경로에서 import
+# (콜드 스타트 단축. LAZY_IMPORTS=0이면 모듈 로드 시 바로 import)
+LAZY_IMPORTS = os.environ.get('LAZY_IMPORTS', '1').strip().lower() in ('true', '1', 'yes', 'on')
+
+class _LazyModule:
+    """
+    처음 속성에 접근할 때 모듈을 import하는 자리표시자
+    import한 뒤에는 이 모듈의 전역 이름을 실제 모듈로 바꿔서 이후 접근은 일반 모듈과 같음
+    """
+    def __init__(self, global_name, module_name):
+        self._global_name = global_name
+        self._module_name = module_name
+
+    def load(self):
+        module = importlib.import_module(self._module_name)
+        globals()[self._global_name] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+def _heavy_import(global_name, module_name):
+    if LAZY_IMPORTS:
+        return _LazyModule(global_name, module_name)
+    return importlib.import_module(module_name)
+
+pdfplumber = _heavy_import('pdfplumber', 'pdfplumber')
+pd = _heavy_import('pd', 'pandas')  # 단일 위치 추출에서 빠른 변환이 처리하지 못하는 표 필드에만 사용
+np = _heavy_import('np', 'numpy')  # 'numpy' 엔진에서만 사용
 
 app = Flask(__name__)
 CORS(app)  # 프론트엔드에서 API 호출 허용
 
-def parse_size_grid(field_chars, pattern=None):
+DIGITS_RE = re.compile(r'\d+')  # 수량 셀에서 숫자 추출
+
+SIZE_CELL_GAP = 15  # 셀 간격 (픽셀): X 간격이 이보다 크면 새 셀
+SIZE_PATTERN_COLUMN_TOLERANCE = 20  # 패턴의 size 셀과 qty 셀을 같은 열로 보는 xCenter 차이
+
+def segment_cells(row_chars, threshold=SIZE_CELL_GAP):
     """
-    사이즈 그리드 파싱: size 행과 qty 행을 X 좌표로 매핑
+    한 행의 문자를 X 간격 기준으로 셀 단위로 나누기
     
     Args:
-        field_chars: [(y, x, text), ...] 형식의 문자 데이터
-        pattern: 저장된 패턴 정보 (size_row_y, qty_row_y, size_cells, qty_cells)
+        row_chars: [(x, text), ...] 형식의 문자 데이터
+        threshold: X 간격이 이보다 크면 새 셀 시작
         
     Returns:
-        dict: {size: qty, ...} 형식의 딕셔너리 또는 None
+        list: [(text, x_center, x_start, x_end), ...] X 순서 (공백뿐인 셀은 제외)
+              셀 사이 간격이 threshold보다 크므로 x_start, x_end, x_center 모두 오름차순
+    """
+    cells = []
+    cell_texts = []
+    x_start = prev_x = None
+    
+    for char_x, char_text in sorted(row_chars, key=lambda c: c[0]):
+        if prev_x is not None and abs(char_x - prev_x) > threshold:
+            cell_text = ''.join(cell_texts).strip()
+            if cell_text:
+                cells.append((cell_text, (x_start + prev_x) / 2, x_start, prev_x))
+            cell_texts = []
+        if not cell_texts:
+            x_start = char_x
+        cell_texts.append(char_text)
+        prev_x = char_x
+    
+    # 마지막 셀 저장
+    cell_text = ''.join(cell_texts).strip()
+    if cell_text:
+        cells.append((cell_text, (x_start + prev_x) / 2, x_start, prev_x))
+    
+    return cells
+
+def _qty_value(qty_text):
+    """수량 셀 텍스트의 첫 번째 숫자 (없으면 0)"""
+    if not qty_text:
+        return 0
+    numbers = DIGITS_RE.findall(qty_text)
+    return int(numbers[0]) if numbers else 0
+
+def _nearest_cell(sorted_values, x):
+    """
+    오름차순 값 목록에서 x와 가장 가까운 위치 (같은 거리면 앞쪽)
+
+    Returns:
+        (distance, index) 또는 값이 없으면 (inf, None)
+    """
+    i = bisect_left(sorted_values, x)
+    best_distance, best_index = float('inf'), None
+    for k in (i - 1, i):
+        if 0 <= k < len(sorted_values):
+            distance = abs(sorted_values[k] - x)
+            if distance < best_distance:
+                best_distance, best_index = distance, k
+    return best_distance, best_index
+
+def _match_size_qty(size_cells, qty_cells):
+    """
+    size 셀마다 qty 셀 매칭 (X 정렬 sweep)
+    
+    X 범위가 겹치는 첫 qty 셀, 없으면 (가운데/양 끝 기준) 가장 가까운 qty 셀을 사용
+    qty 셀은 X 순서로 서로 겹치지 않으므로 겹치는 첫 셀은 x_end로 bisect해서 찾고,
+    가장 가까운 셀은 그 바로 왼쪽/오른쪽 셀 중 하나
+    
+    Returns:
+        dict: {size: qty, ...}
+    """
+    qty_starts = [c[2] for c in qty_cells]
+    qty_ends = [c[3] for c in qty_cells]
+    size_grid_dict = {}
+    
+    for size_text, size_x_center, size_x_start, size_x_end in size_cells:
+        j = bisect_left(qty_ends, size_x_start)
+        if j < len(qty_cells) and qty_starts[j] <= size_x_end:
+            matched_qty_text = qty_cells[j][0]
+        else:
+            matched_qty_text = None
+            min_distance = float('inf')
+            for k in (j - 1, j):
+                if 0 <= k < len(qty_cells):
+                    qty_text, qty_x_center, qty_x_start, qty_x_end = qty_cells[k]
+                    distance = min(
+                        abs(qty_x_center - size_x_center),
+                        abs(qty_x_start - size_x_center),
+                        abs(qty_x_end - size_x_center)
+                    )
+                    if distance < min_distance:
+                        min_distance = distance
+                        matched_qty_text = qty_text
+        
+        size_grid_dict[size_text] = _qty_value(matched_qty_text)
+    
+    return size_grid_dict
+
+class SizeGridPattern:
+    """
+    저장된 size/qty 셀 패턴을 정렬해 둔 매칭기 (한 번 만들어서 여러 그리드에 재사용)
+    
+    size 셀 템플릿마다 같은 열(xCenter 차이 < SIZE_PATTERN_COLUMN_TOLERANCE)인 qty 셀 템플릿을
+    미리 찾아두고, 그리드마다 실제 셀과는 bisect로 가장 가까운 셀만 찾음
     """
+    def __init__(self, size_cells_template, qty_cells_template):
+        """
+        Args:
+            size_cells_template: 저장된 size 셀 패턴 [{'text': ..., 'xCenter': ..., ...}, ...]
+            qty_cells_template: 저장된 qty 셀 패턴 [{'text': ..., 'xCenter': ..., ...}, ...]
+        """
+        self.size_template_xs = [t.get('xCenter', 0) for t in size_cells_template]
+        self.qty_template_xs = [t.get('xCenter', 0) for t in qty_cells_template]
+        
+        # size 템플릿별 같은 열 qty 템플릿 인덱스 (원래 순서, 같은 거리면 앞쪽이 우선)
+        order = sorted(range(len(self.qty_template_xs)), key=self.qty_template_xs.__getitem__)
+        sorted_xs = [self.qty_template_xs[k] for k in order]
+        tolerance = SIZE_PATTERN_COLUMN_TOLERANCE
+        self.columns = []
+        for template_x_center in self.size_template_xs:
+            # 경계 오차를 감안해 넓게 자른 뒤 원래 조건으로 다시 확인
+            lo = bisect_left(sorted_xs, template_x_center - tolerance - 1)
+            hi = bisect_right(sorted_xs, template_x_center + tolerance + 1)
+            self.columns.append(sorted(
+                k for k in order[lo:hi]
+                if abs(self.qty_template_xs[k] - template_x_center) < tolerance
+            ))
+
+    def parse(self, size_row_chars, qty_row_chars):
+        """
+        Args:
+            size_row_chars: size 행의 문자 데이터 [(x, text), ...]
+            qty_row_chars: qty 행의 문자 데이터 [(x, text), ...]
+            
+        Returns:
+            dict: {size: qty, ...} 형식의 딕셔너리 또는 None
+        """
+        size_cells = segment_cells(size_row_chars)
+        qty_cells = segment_cells(qty_row_chars)
+        if not size_cells:
+            return None
+        
+        size_centers = [c[1] for c in size_cells]
+        qty_centers = [c[1] for c in qty_cells]
+        # qty 템플릿별 가장 가까운 실제 qty 셀 (distance, index)
+        nearest_qty = [_nearest_cell(qty_centers, x) for x in self.qty_template_xs]
+        
+        size_grid_dict = {}
+        for template_x_center, column in zip(self.size_template_xs, self.columns):
+            # 가장 가까운 실제 size 셀
+            _, size_index = _nearest_cell(size_centers, template_x_center)
+            size_text = size_cells[size_index][0]
+            
+            # 같은 열 qty 템플릿 중 실제 qty 셀과 가장 가까운 것
+            matched_qty = None
+            min_qty_distance = float('inf')
+            for k in column:
+                qty_distance, qty_index = nearest_qty[k]
+                if qty_distance < min_qty_distance:
+                    min_qty_distance = qty_distance
+                    matched_qty = qty_cells[qty_index][0]
+            
+            size_grid_dict[size_text] = _qty_value(matched_qty)
+        
+        return size_grid_dict if size_grid_dict else None
+
+def _compile_size_grid_pattern(pattern):
+    """저장된 패턴에 size/qty 행 위치와 셀 패턴이 모두 있으면 SizeGridPattern, 아니면 None"""
+    if not (pattern and 'size_row_y' in pattern and 'qty_row_y' in pattern):
+        return None
+    size_cells_template = pattern.get('size_cells', [])
+    qty_cells_template = pattern.get('qty_cells', [])
+    if not (size_cells_template and qty_cells_template):
+        return None
+    return SizeGridPattern(size_cells_template, qty_cells_template)
+
+def _parse_size_grid(field_chars, pattern, grid_pattern):
+    """parse_size_grid 본체 (grid_pattern: 미리 만든 SizeGridPattern 또는 None)"""
     if not field_chars:
         return None
     
@@ -39,73 +263,18 @@ def parse_size_grid(field_chars, pattern=None):
     if len(sorted_y_positions) < 2:
         return None
     
-    # 패턴이 있으면 저장된 Y 위치 사용
-    if pattern and 'size_row_y' in pattern and 'qty_row_y' in pattern:
+    # 패턴이 있으면 저장된 Y 위치와 가장 가까운 실제 행에 저장된 셀 패턴 적용
+    if grid_pattern is not None:
         size_row_y = pattern['size_row_y']
         qty_row_y = pattern['qty_row_y']
-        
-        # 저장된 Y 위치와 가장 가까운 실제 Y 위치 찾기
         size_row_y_actual = min(sorted_y_positions, key=lambda y: abs(y - size_row_y))
         qty_row_y_actual = min(sorted_y_positions, key=lambda y: abs(y - qty_row_y))
-        
-        if size_row_y_actual in y_groups and qty_row_y_actual in y_groups:
-            # 저장된 셀 패턴 사용
-            size_cells_template = pattern.get('size_cells', [])
-            qty_cells_template = pattern.get('qty_cells', [])
-            
-            if size_cells_template and qty_cells_template:
-                return parse_size_grid_with_pattern(
-                    y_groups[size_row_y_actual], 
-                    y_groups[qty_row_y_actual],
-                    size_cells_template,
-                    qty_cells_template
-                )
-    
-    # 각 행에서 텍스트 블록 추출 (셀 단위)
-    def extract_cells_from_row(row_chars):
-        """한 행에서 셀 단위로 텍스트 추출"""
-        if not row_chars:
-            return []
-        
-        # X 좌표 순으로 정렬
-        sorted_chars = sorted(row_chars, key=lambda c: c[0])
-        
-        cells = []
-        current_cell = []
-        prev_x = None
-        cell_separation_threshold = 15  # 셀 간격 (픽셀) - 더 크게 설정
-        
-        for char_x, char_text in sorted_chars:
-            # 새 셀 시작 조건: X 좌표 간격이 threshold보다 크면
-            if prev_x is not None and abs(char_x - prev_x) > cell_separation_threshold:
-                # 이전 셀 저장
-                if current_cell:
-                    cell_text = ''.join(c[1] for c in current_cell).strip()
-                    if cell_text:
-                        x_start = min(c[0] for c in current_cell)
-                        x_end = max(c[0] for c in current_cell)
-                        x_center = (x_start + x_end) / 2
-                        cells.append((cell_text, x_center, x_start, x_end))
-                    current_cell = []
-            
-            current_cell.append((char_x, char_text))
-            prev_x = char_x
-        
-        # 마지막 셀 저장
-        if current_cell:
-            cell_text = ''.join(c[1] for c in current_cell).strip()
-            if cell_text:
-                x_start = min(c[0] for c in current_cell)
-                x_end = max(c[0] for c in current_cell)
-                x_center = (x_start + x_end) / 2
-                cells.append((cell_text, x_center, x_start, x_end))
-        
-        return cells
+        return grid_pattern.parse(y_groups[size_row_y_actual], y_groups[qty_row_y_actual])
     
     # 모든 행에서 셀 추출
     row_cells = {}
     for y_pos in sorted_y_positions:
-        cells = extract_cells_from_row(y_groups[y_pos])
+        cells = segment_cells(y_groups[y_pos])
         if cells:
             row_cells[y_pos] = cells
     
@@ -137,63 +306,39 @@ def parse_size_grid(field_chars, pattern=None):
     # size 행과 qty 행을 찾지 못한 경우, 첫 번째와 두 번째 행 사용
     if size_row is None or qty_row is None:
         sorted_rows = sorted(row_cells.items(), reverse=True)
-        if len(sorted_rows) >= 2:
-            size_row = (sorted_rows[0][0], sorted_rows[0][1])
-            qty_row = (sorted_rows[1][0], sorted_rows[1][1])
-        else:
-            return None
-    
-    size_cells = size_row[1]  # [(text, x_center, x_start, x_end), ...]
-    qty_cells = qty_row[1]
+        size_row = sorted_rows[0]
+        qty_row = sorted_rows[1]
     
-    # 각 사이즈에 대해 qty 매핑
-    size_grid_dict = {}
+    size_grid_dict = _match_size_qty(size_row[1], qty_row[1])
+    return size_grid_dict if size_grid_dict else None
+
+def parse_size_grid(field_chars, pattern=None):
+    """
+    사이즈 그리드 파싱: size 행과 qty 행을 X 좌표로 매핑
     
-    for size_text, size_x_center, size_x_start, size_x_end in size_cells:
-        # 사이즈 셀 범위 내에 있는 qty 찾기
-        matched_qty = None
-        min_distance = float('inf')
-        matched_qty_text = None
-        
-        for qty_text, qty_x_center, qty_x_start, qty_x_end in qty_cells:
-            # qty 셀의 중앙이 사이즈 셀 범위 내에 있거나, 겹치는 경우
-            if (size_x_start <= qty_x_center <= size_x_end) or \
-               (qty_x_start <= size_x_center <= qty_x_end) or \
-               (size_x_start <= qty_x_start <= size_x_end) or \
-               (size_x_start <= qty_x_end <= size_x_end):
-                # 매칭됨
-                matched_qty = qty_text
-                matched_qty_text = qty_text
-                break
-            else:
-                # 거리 계산 (더 가까운 것으로)
-                distance = min(
-                    abs(qty_x_center - size_x_center),
-                    abs(qty_x_start - size_x_center),
-                    abs(qty_x_end - size_x_center)
-                )
-                if distance < min_distance:
-                    min_distance = distance
-                    matched_qty_text = qty_text
-        
-        # 수량 추출
-        if matched_qty_text:
-            try:
-                # 숫자만 추출 (문자 제거)
-                import re
-                numbers = re.findall(r'\d+', matched_qty_text)
-                if numbers:
-                    qty_value = int(numbers[0])
-                else:
-                    qty_value = 0
-            except (ValueError, IndexError):
-                qty_value = 0
-        else:
-            qty_value = 0
+    Args:
+        field_chars: [(y, x, text), ...] 형식의 문자 데이터
+        pattern: 저장된 패턴 정보 (size_row_y, qty_row_y, size_cells, qty_cells)
         
-        size_grid_dict[size_text] = qty_value
+    Returns:
+        dict: {size: qty, ...} 형식의 딕셔너리 또는 None
+    """
+    return _parse_size_grid(field_chars, pattern, _compile_size_grid_pattern(pattern))
+
+def parse_size_grids(grids_chars, pattern=None):
+    """
+    같은 패턴의 사이즈 그리드 여러 개를 한 번에 파싱 (한 페이지의 모든 제품 행)
+    저장된 셀 패턴은 한 번만 정렬해서 모든 그리드에 재사용
     
-    return size_grid_dict if size_grid_dict else None
+    Args:
+        grids_chars: 그리드별 [(y, x, text), ...] 리스트
+        pattern: 저장된 패턴 정보
+        
+    Returns:
+        list: 그리드 순서대로 parse_size_grid() 결과
+    """
+    grid_pattern = _compile_size_grid_pattern(pattern)
+    return [_parse_size_grid(field_chars, pattern, grid_pattern) for field_chars in grids_chars]
 
 def parse_size_grid_with_pattern(size_row_chars, qty_row_chars, size_cells_template, qty_cells_template):
     """
@@ -208,390 +353,3239 @@ def parse_size_grid_with_pattern(size_row_chars, qty_row_chars, size_cells_templ
     Returns:
         dict: {size: qty, ...} 형식의 딕셔너리 또는 None
     """
-    # 실제 셀 추출
-    def extract_cells(row_chars):
-        sorted_chars = sorted(row_chars, key=lambda c: c[0])
-        cells = []
-        current_cell = []
-        prev_x = None
-        threshold = 15
-        
-        for char_x, char_text in sorted_chars:
-            if prev_x is not None and abs(char_x - prev_x) > threshold:
-                if current_cell:
-                    text = ''.join(c[1] for c in current_cell).strip()
-                    if text:
-                        x_start = min(c[0] for c in current_cell)
-                        x_end = max(c[0] for c in current_cell)
-                        x_center = (x_start + x_end) / 2
-                        cells.append({'text': text, 'xCenter': x_center, 'xStart': x_start, 'xEnd': x_end})
-                    current_cell = []
-            current_cell.append((char_x, char_text))
-            prev_x = char_x
-        
-        if current_cell:
-            text = ''.join(c[1] for c in current_cell).strip()
-            if text:
-                x_start = min(c[0] for c in current_cell)
-                x_end = max(c[0] for c in current_cell)
-                x_center = (x_start + x_end) / 2
-                cells.append({'text': text, 'xCenter': x_center, 'xStart': x_start, 'xEnd': x_end})
-        
-        return cells
-    
-    size_cells = extract_cells(size_row_chars)
-    qty_cells = extract_cells(qty_row_chars)
-    
-    # 템플릿 셀과 실제 셀 매핑
-    size_grid_dict = {}
-    
-    for size_cell_template in size_cells_template:
-        template_x_center = size_cell_template.get('xCenter', 0)
-        template_size_text = size_cell_template.get('text', '')
-        
-        # 가장 가까운 실제 size 셀 찾기
-        matched_size_cell = None
-        min_distance = float('inf')
-        
-        for size_cell in size_cells:
-            distance = abs(size_cell['xCenter'] - template_x_center)
-            if distance < min_distance:
-                min_distance = distance
-                matched_size_cell = size_cell
-        
-        if matched_size_cell:
-            size_text = matched_size_cell['text']
-            
-            # 해당 size 셀과 매칭되는 qty 찾기
-            matched_qty = None
-            min_qty_distance = float('inf')
-            
-            for qty_cell_template in qty_cells_template:
-                if abs(qty_cell_template.get('xCenter', 0) - template_x_center) < 20:  # 같은 열
-                    # 실제 qty 셀 찾기
-                    for qty_cell in qty_cells:
-                        qty_distance = abs(qty_cell['xCenter'] - qty_cell_template.get('xCenter', 0))
-                        if qty_distance < min_qty_distance:
-                            min_qty_distance = qty_distance
-                            matched_qty = qty_cell['text']
-            
-            # 수량 추출
-            if matched_qty:
-                import re
-                numbers = re.findall(r'\d+', matched_qty)
-                qty_value = int(numbers[0]) if numbers else 0
-            else:
-                qty_value = 0
-            
-            size_grid_dict[size_text] = qty_value
-    
-    return size_grid_dict if size_grid_dict else None
+    return SizeGridPattern(size_cells_template, qty_cells_template).parse(size_row_chars, qty_row_chars)
 
-def extract_with_y_scan(pdf_path, template):
+class PageCharIndex:
     """
-    Y축 스캔 방식으로 반복 제품 추출
-    필드 영역(X 범위 AND Y 범위) 내의 텍스트만 정확히 수집
+    페이지 문자 공간 인덱스
+    Y 내림차순으로 정렬된 문자 리스트에서 bisect로 Y 범위를 잘라낸 뒤 X 범위만 검사
     """
-    all_products = []
-    fields_template = template.get('fields', [])
-    
-    if not fields_template: 
-        return []
+    def __init__(self, chars):
+        """
+        Args:
+            chars: [{'text', 'x', 'y'}, ...] Y 내림차순으로 정렬된 문자 리스트
+        """
+        self.chars = chars
+        # bisect는 오름차순 배열이 필요하므로 Y 부호를 뒤집어 저장
+        self.neg_y = [-c['y'] for c in chars]
+
+    def query(self, x0, x1, y_bottom, y_top):
+        """bbox 내의 문자를 원래 리스트 순서 그대로 반환 (선형 스캔과 동일한 결과)"""
+        start = bisect_left(self.neg_y, -y_top)
+        end = bisect_right(self.neg_y, -y_bottom)
+        return [c for c in self.chars[start:end] if x0 <= c['x'] <= x1]
+
+
+class LinearCharScan:
+    """인덱스 없이 전체 문자를 훑는 기존 방식 (결과 비교용)"""
+    def __init__(self, chars):
+        self.chars = chars
+
+    def query(self, x0, x1, y_bottom, y_top):
+        return [c for c in self.chars if (x0 <= c['x'] <= x1) and (y_bottom <= c['y'] <= y_top)]
+
+
+class NumpyPageScanner:
+    """
+    NumPy struct-of-arrays 페이지 스캐너
+    문자를 x/y/텍스트 인덱스 배열로만 보관하고, 필드별 X 마스크와 searchsorted로
+    모든 후보 행 × 모든 필드를 한 번에 검사 (문자별 dict 생성 없음)
+    """
+    def __init__(self, page_chars):
+        """
+        Args:
+            page_chars: PageChars (page.chars 순서 그대로의 texts, xs, ys)
+        """
+        ys = np.frombuffer(page_chars.ys, dtype=np.float64)
+        # 기존 경로의 chars_with_js_y.sort(key=-y)와 같은 순서 (안정 정렬)
+        order = np.argsort(-ys, kind='stable')
+        self.texts = page_chars.texts
+        self.text_idx = order
+        self.x = np.frombuffer(page_chars.xs, dtype=np.float64)[order]
+        self.y = ys[order]
+        stripped = [t.strip() for t in page_chars.texts]
+        self.stripped = stripped
+        self.nonblank = np.fromiter((bool(t) for t in stripped), dtype=bool, count=len(stripped))[order]
+        self._columns = {}
+
+    def unique_y_positions(self, y_tolerance):
+        rounded = np.round(self.y / y_tolerance) * y_tolerance
+        return np.unique(rounded)[::-1]
+
+    def _column(self, x0, x1):
+        """X 범위 내 문자의 Y 값 (전체 / 공백 제외), 오름차순"""
+        key = (x0, x1)
+        if key not in self._columns:
+            x_mask = (self.x >= x0) & (self.x <= x1)
+            self._columns[key] = (
+                np.sort(self.y[x_mask]),
+                np.sort(self.y[x_mask & self.nonblank]),
+            )
+        return self._columns[key]
+
+    def probe(self, x0, x1, y_bottoms, y_tops):
+        """
+        후보 행 전체에 대해 필드 영역 내 문자 존재 여부를 한 번에 계산
+
+        Returns:
+            (any_chars, any_nonblank): 후보 행별 bool 배열
+        """
+        all_y, nonblank_y = self._column(x0, x1)
+        any_chars = np.searchsorted(all_y, y_tops, side='right') > np.searchsorted(all_y, y_bottoms, side='left')
+        any_nonblank = np.searchsorted(nonblank_y, y_tops, side='right') > np.searchsorted(nonblank_y, y_bottoms, side='left')
+        return any_chars, any_nonblank
+
+    def field_chars(self, x0, x1, y_bottom, y_top):
+        """필드 영역 내 공백 아닌 문자를 [(y, x, text), ...]로 반환 (기존 순서 유지)"""
+        mask = (self.x >= x0) & (self.x <= x1) & (self.y >= y_bottom) & (self.y <= y_top) & self.nonblank
+        positions = np.flatnonzero(mask)
+        return [
+            (y, x, self.stripped[i])
+            for y, x, i in zip(self.y[positions].tolist(), self.x[positions].tolist(), self.text_idx[positions].tolist())
+        ]
+
+
+# Y축 스캔 추출 엔진 (template['engine']으로 선택)
+CHAR_ENGINES = {
+    'index': PageCharIndex,
+    'linear': LinearCharScan,
+    'numpy': NumpyPageScanner,
+}
+
+# 제품 행 탐지 방식 (template['row_detection']으로 선택)
+# - scan: 모든 Y 후보 × 모든 필드 검사 (기본)
+# - anchor: 앵커 필드(정규식이 있는 가장 작은 필드) X 열 문자를 한 번 훑어 앵커 영역이 빈 후보를 걸러낸 뒤 나머지만 검사
+ROW_DETECTION_MODES = ('scan', 'anchor')
+
+# 페이지 문자 로더 (template['char_loader']로 선택, 없으면 CHAR_LOADER 환경변수)
+# - pdfplumber: page.chars (문자마다 폰트/색/행렬까지 담은 dict와 선/사각형 레이아웃 객체를 만듦)
+# - lean: pdfminer 인터프리터가 글자를 그릴 때 text, x0, top만 계산해서 배열에 바로 넣음 (좌표는 같음)
+CHAR_LOADERS = ('pdfplumber', 'lean')
+CHAR_LOADER = os.environ.get('CHAR_LOADER', 'pdfplumber').strip().lower()
+
+PageChars = namedtuple('PageChars', ['texts', 'xs', 'ys'])
+
+# 업로드 보관 설정: 이 크기 이하는 메모리, 초과하면 익명 임시 파일 + mmap
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get('UPLOAD_SPOOL_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# 병렬 추출 설정 (환경변수)
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS') or os.cpu_count() or 1)  # 프로세스 풀 크기
+PARALLEL_MIN_PAGES = int(os.environ.get('PARALLEL_MIN_PAGES', '4'))  # 이보다 적은 페이지는 순차 처리
+
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', '100'))  # /extract/batch 최대 파일 수
+BATCH_MAX_BYTES = int(os.environ.get('BATCH_MAX_BYTES', str(512 * 1024 * 1024)))  # /extract/batch zip 압축 해제 크기 합 상한
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# 비동기 작업 큐 설정 (환경변수)
+JOBS_DIR = os.environ.get('JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'packing-list-jobs')  # SQLite + 업로드 저장
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '1'))  # 작업 워커 수 (0이면 외부 워커 사용)
+# gunicorn.conf.py가 마스터에서 작업 워커를 띄우면 true (웹 워커는 작업 워커를 띄우지 않음)
+JOB_WORKERS_SUPERVISED = os.environ.get('JOB_WORKERS_SUPERVISED', '').strip().lower() in ('true', '1', 'yes', 'on')
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '0.5'))  # 대기열 확인 간격 (초)
+JOB_TTL_SECONDS = int(os.environ.get('JOB_TTL_SECONDS', str(24 * 3600)))  # 완료된 작업 보관 기간
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))  # 워커가 죽어도 다시 실행하는 최대 횟수 (넘으면 failed)
+JOB_SWEEP_INTERVAL = 30  # 죽은 워커의 작업 회수 / 만료 작업 삭제 간격 (초)
+
+_job_workers = []
+_job_workers_lock = threading.Lock()
+
+# 메모리 설정 (환경변수)
+LOW_MEMORY = os.environ.get('LOW_MEMORY', '').strip().lower() in ('true', '1', 'yes', 'on')  # 저메모리 모드 기본값
+EXTRACT_MEMORY_LIMIT_MB = int(os.environ.get('EXTRACT_MEMORY_LIMIT_MB', '0'))  # 추출 중 RSS 상한 (0이면 제한 없음)
+
+# 증분 추출 캐시 설정 (템플릿 편집 중 재추출)
+INCREMENTAL_CACHE_PAGES = int(os.environ.get('INCREMENTAL_CACHE_PAGES', '512'))  # 중간 결과를 보관할 최대 페이지 수
+INCREMENTAL_CACHE_MAX_BYTES = int(os.environ.get('INCREMENTAL_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))  # 중간 결과 메모리 예산 (0이면 끔)
+INCREMENTAL_FIELD_KEYS = 64  # 페이지마다 보관할 필드 영역 / 행 / 값 캐시 항목 수
+
+# 추출 결과 캐시 설정 (환경변수): 같은 PDF + 같은 템플릿의 /extract 결과를 워커 간 공유
+RESULT_CACHE_PATH = os.environ.get('RESULT_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'packing-list-results.db')  # SQLite
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # 압축한 결과 크기 합 상한 (0이면 끔)
+# 같은 추출이 진행 중일 때 기다리는 최대 시간. 기다리다 gunicorn 워커 timeout(GUNICORN_TIMEOUT, 기본 30초)에
+# 걸려 워커가 죽지 않도록 기본값은 그 2/3
+GUNICORN_TIMEOUT = float(os.environ.get('GUNICORN_TIMEOUT', '30'))
+RESULT_CACHE_WAIT_SECONDS = float(os.environ.get('RESULT_CACHE_WAIT_SECONDS') or GUNICORN_TIMEOUT * 2 / 3)
+RESULT_CACHE_POLL_INTERVAL = 0.05  # 진행 중인 추출의 결과 확인 간격 (초)
+
+class MemoryLimitExceeded(MemoryError):
+    """추출 중 프로세스 RSS가 EXTRACT_MEMORY_LIMIT_MB를 넘음"""
+
+# 템플릿 라이브러리 / 업체 자동 감지 설정 (환경변수)
+TEMPLATE_LIBRARY_PATH = os.environ.get('TEMPLATE_LIBRARY_PATH') or os.path.join(tempfile.gettempdir(), 'packing-list-templates.json')
+DETECT_MIN_SCORE = float(os.environ.get('DETECT_MIN_SCORE', '0.5'))  # 최고 점수가 이보다 낮으면 일치하는 업체 없음
+TEMPLATE_ADMIN_TOKEN = os.environ.get('TEMPLATE_ADMIN_TOKEN', '')  # 템플릿 등록/삭제용 토큰 (없으면 라이브러리 읽기 전용)
+FINGERPRINT_MAX_TOKENS = 40  # 업체 지문에 저장할 기준 토큰 수
+FINGERPRINT_POSITION_TOLERANCE = 10  # 기준 토큰 위치 허용 오차 (픽셀)
+DETECT_CANDIDATES = 5  # 감지 결과에 보여줄 상위 후보 수
+
+class TemplateNotDetected(ValueError):
+    """업체 자동 감지에서 DETECT_MIN_SCORE 이상인 템플릿이 없음 (detection: 감지 결과)"""
+    def __init__(self, message, detection):
+        super().__init__(message, detection)  # 프로세스 풀에서 넘어올 때 다시 만들 수 있도록 args에 보관
+        self.detection = detection
+
+    def __str__(self):
+        return self.args[0]
+
+# 단계별 시간 / 지표 설정 (환경변수)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').strip().lower() in ('true', '1', 'yes', 'on')
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'packing-list-metrics')  # 프로세스별 지표 파일
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # 히스토그램 상한 (초)
+
+class StageTimings:
+    """
+    요청 하나의 단계별 소요 시간과 처리량
+
+    단계는 중첩될 수 있고 (예: rows 안의 fields), 안쪽 단계 시간은 바깥 단계에서 빼서
+    단계별 시간의 합이 측정한 전체 시간과 같도록 누적
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = defaultdict(float)  # 단계 -> 자기 시간 (안쪽 단계 제외)
+        self.pages = 0
+        self.products = 0
+        self.cache = None  # 추출 결과 캐시 조회 결과 ('hit' / 'coalesced' / 'miss'), 조회하지 않았으면 None
+        self._stack = []  # [단계, 시작 시각, 안쪽 단계 시간]
+
+    def start(self, stage):
+        self._stack.append([stage, time.perf_counter(), 0.0])
+
+    def stop(self):
+        stage, started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.seconds[stage] += elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def count_page(self, products):
+        self.pages += 1
+        self.products += len(products)
+
+    @contextmanager
+    def activate(self):
+        """이 블록 안의 StageTimer를 이 객체에 누적 (이전에 수집 중이던 객체는 끝나면 복원)"""
+        previous = _current_timings.get()
+        _current_timings.set(self)
+        try:
+            yield self
+        finally:
+            _current_timings.set(previous)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        """응답의 timings 블록: 단계별 ms + 측정되지 않은 나머지(other) + 전체(total)"""
+        total = self.elapsed()
+        timings = {stage: round(seconds * 1000, 3) for stage, seconds in self.seconds.items()}
+        timings['other'] = round(max(total - sum(self.seconds.values()), 0.0) * 1000, 3)
+        timings['total'] = round(total * 1000, 3)
+        return timings
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (예: 'open;dur=1.2, chars;dur=30.5, ..., total;dur=40.1')"""
+        return ', '.join(f'{stage};dur={ms}' for stage, ms in self.as_dict().items())
+
+_current_timings = contextvars.ContextVar('stage_timings', default=None)
+
+def current_timings():
+    """지금 수집 중인 StageTimings (요청 밖이면 None)"""
+    return _current_timings.get()
+
+class StageTimer:
+    """
+    with StageTimer('rows'): 블록 시간을 현재 요청의 StageTimings에 누적
+    수집 중이 아니면 (예열, 벤치마크, 프로세스 풀 워커) 아무것도 하지 않음
+    """
+    __slots__ = ('stage', 'timings')
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.timings = None
+
+    def __enter__(self):
+        self.timings = _current_timings.get()
+        if self.timings is not None:
+            self.timings.start(self.stage)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.stop()
+        return False
+
+# 제품 행 탐지 파라미터
+Y_TOLERANCE = 2  # Y 위치 허용 오차 (픽셀) - 더 엄격하게
+ROW_SPACING_THRESHOLD = 30  # 제품 행 간 최소 간격 (픽셀) - 더 크게
+
+def load_page_chars(page):
+    """
+    페이지 문자를 struct-of-arrays 형태로 로드
+
+    pdfplumber의 top은 PDF 좌표계에서 위쪽 값 (큰 값)
+    템플릿의 y0, y1도 같은 좌표계를 사용하므로 변환 불필요
+
+    필요한 값만 복사한 뒤 pdfplumber가 페이지에 캐시해 둔 레이아웃/객체를 버림
+    (버리지 않으면 PDF를 닫을 때까지 모든 페이지의 파싱 결과가 메모리에 남음)
+    """
+    with StageTimer('chars'):
+        chars = page.chars
+        page_chars = PageChars(
+            texts=[c['text'] for c in chars],
+            xs=array('d', (c['x0'] for c in chars)),
+            ys=array('d', (c['top'] for c in chars)),
+        )
+        page.flush_cache()
+    return page_chars
+
+def load_page_chars_lean(page):
+    """
+    load_page_chars와 같은 PageChars를 pdfplumber 문자 객체 없이 로드
+
+    pdfminer 인터프리터로 페이지 내용을 실행하면서 글자를 그릴 때마다 LTChar와 같은 식으로
+    x0와 top만 계산해서 배열에 바로 넣음 (LTChar, 문자 dict, 선/사각형 레이아웃 객체를 만들지 않음)
+    """
+    from pdfminer.pdfinterp import PDFPageInterpreter  # pdfplumber를 열 때 이미 import됨
     
-    # 템플릿의 첫 제품 기준 Y 위치 계산 (JavaScript 좌표계, 위가 큰값)
-    first_product_top_js = max(f['bbox']['y0'] for f in fields_template)
+    with StageTimer('chars'):
+        rsrcmgr = page.pdf.rsrcmgr
+        device = _lean_char_device_class()(rsrcmgr, page.height)
+        PDFPageInterpreter(rsrcmgr, device).process_page(page.page_obj)
+    return PageChars(texts=device.texts, xs=device.xs, ys=device.ys)
+
+_lean_char_device = None
+
+def _lean_char_device_class():
+    """
+    글자 좌표만 모으는 pdfminer 텍스트 장치 클래스 (pdfminer는 pdfplumber와 함께 처음 쓸 때 import)
+    """
+    global _lean_char_device
+    if _lean_char_device is not None:
+        return _lean_char_device
     
-    # 필드 정보 저장 (템플릿 기준, 패턴 포함)
-    field_configs = {}
-    for field_info in fields_template:
-        field_name = field_info['field']
-        bbox = field_info['bbox']
-        # 첫 제품의 top에서의 오프셋 (JavaScript 좌표계)
-        offset = first_product_top_js - bbox['y0']
-        field_configs[field_name] = {
-            'offset': offset,
-            'x0': min(bbox['x0'], bbox['x1']),
-            'x1': max(bbox['x0'], bbox['x1']),
-            'y0_template': bbox['y0'],  # 템플릿에서의 Y 위치
-            'y1_template': bbox['y1'],
-            'height': abs(bbox['y0'] - bbox['y1']),
-            'type': field_info.get('type', 'text'),
-            'pattern': field_info.get('pattern')  # 텍스트 패턴 저장
-        }
+    from pdfminer.pdfdevice import PDFTextDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            page_height = page.height
-            
-            # 모든 문자 추출 및 JavaScript 좌표계로 변환
-            chars = page.chars
-            if not chars:
-                continue
-            
-            chars_with_js_y = []
-            for char in chars:
-                # pdfplumber의 top은 PDF 좌표계에서 위쪽 값 (큰 값)
-                # 템플릿의 y0, y1도 같은 좌표계를 사용하므로 변환 불필요
-                chars_with_js_y.append({
-                    'text': char['text'],
-                    'x': char['x0'],
-                    'y': char['top']  # PDF 좌표계 그대로 사용 (위가 큰 값)
-                })
-            
-            # Y 좌표 기준 정렬 (위에서 아래로, 큰 값부터)
-            chars_with_js_y.sort(key=lambda c: -c['y'])
-            
-            # 제품 행 찾기: 템플릿의 첫 제품 기준 Y 위치와 정확히 일치하는 패턴 찾기
-            product_row_y_positions = []
-            y_tolerance = 2  # Y 위치 허용 오차 (픽셀) - 더 엄격하게
-            row_spacing_threshold = 30  # 제품 행 간 최소 간격 (픽셀) - 더 크게
-            
-            # 템플릿의 첫 제품 기준 Y 위치 주변에서만 제품 행 찾기
-            # 실제 제품 행은 첫 제품 기준 Y 위치와 유사한 위치여야 함
-            template_y_range = (first_product_top_js - 5, first_product_top_js + 5)  # 첫 제품 Y ±5픽셀
-            
-            # 각 Y 위치에서 제품 행 패턴 확인 (템플릿 Y 위치와 유사한 위치만)
-            unique_y_positions = sorted(set(round(c['y'] / y_tolerance) * y_tolerance for c in chars_with_js_y), reverse=True)
-            
-            for test_y in unique_y_positions:
-                # 이미 추가된 제품 행과 너무 가까우면 스킵
-                if product_row_y_positions and min(abs(test_y - py) for py in product_row_y_positions) < row_spacing_threshold:
-                    continue
-                
-                # 이 Y 위치가 제품 행인지 확인 (패턴 매칭 사용)
-                all_fields_matched = True
-                matched_fields_count = 0
-                
-                for field_name, field_config in field_configs.items():
-                    # 이 제품 행에서 필드의 예상 Y 위치 계산
-                    expected_field_y0 = test_y - field_config['offset']
-                    expected_field_y1 = expected_field_y0 - field_config['height']
-                    
-                    x0, x1 = field_config['x0'], field_config['x1']
-                    
-                    # 필드 영역(X AND Y) 내의 텍스트 추출
-                    field_chars = []
-                    for char_data in chars_with_js_y:
-                        char_y = char_data['y']
-                        char_x = char_data['x']
-                        if (x0 <= char_x <= x1) and (expected_field_y1 <= char_y <= expected_field_y0):
-                            field_chars.append(char_data)
-                    
-                    if not field_chars:
-                        all_fields_matched = False
-                        break
-                    
-                    # 텍스트 추출
-                    field_text = ''.join(c['text'] for c in sorted(field_chars, key=lambda c: (c['y'], c['x']))).strip()
-                    
-                    # 패턴 매칭 (패턴이 있으면 사용)
-                    pattern = field_config.get('pattern')
-                    if pattern:
-                        if field_config['type'] == 'table' and field_name == 'size_grid':
-                            # 사이즈 그리드는 별도 처리 (나중에)
-                            matched_fields_count += 1
-                        else:
-                            # 일반 텍스트 필드: 정규식 패턴 매칭
-                            import re
-                            regex_str = pattern.get('regex')
-                            if regex_str:
-                                # 정규식 문자열을 컴파일
-                                try:
-                                    pattern_obj = re.compile(regex_str)
-                                    if pattern_obj.search(field_text):
-                                        matched_fields_count += 1
-                                    else:
-                                        # 패턴 불일치 시에도 텍스트가 있으면 매칭으로 간주 (유연성)
-                                        if field_text:
-                                            matched_fields_count += 1
-                                except:
-                                    # 정규식 오류 시 텍스트만 확인
-                                    if field_text:
-                                        matched_fields_count += 1
-                            else:
-                                # 패턴이 없으면 텍스트만 확인
-                                if field_text:
-                                    matched_fields_count += 1
-                    else:
-                        # 패턴이 없으면 텍스트만 확인
-                        if field_text:
-                            matched_fields_count += 1
-                
-                # 모든 필드가 매칭되고, 적어도 3개 이상의 필드가 있어야 제품 행으로 인식
-                if all_fields_matched and matched_fields_count >= min(3, len(field_configs)):
-                    product_row_y_positions.append(test_y)
-            
-            # 제품 행별로 데이터 추출
-            for product_base_y in sorted(product_row_y_positions, reverse=True):
-                product_data = {}
-                
-                for field_name, field_config in field_configs.items():
-                    # 이 제품 행에서 필드의 Y 위치 계산
-                    field_y0 = product_base_y - field_config['offset']
-                    field_y1 = field_y0 - field_config['height']
-                    
-                    x0, x1 = field_config['x0'], field_config['x1']
-                    
-                    # 필드 영역(X 범위 AND Y 범위) 내의 문자만 수집
-                    field_chars = []
-                    for char_data in chars_with_js_y:
-                        char_y = char_data['y']  # PDF 좌표계 (위가 큰 값)
-                        char_x = char_data['x']
-                        char_text = char_data['text'].strip()
-                        
-                        if not char_text:
-                            continue
-                        
-                        # X 범위와 Y 범위 모두 정확히 체크
-                        # field_y0가 위쪽 (큰 값), field_y1이 아래쪽 (작은 값)
-                        if (x0 <= char_x <= x1) and (field_y1 <= char_y <= field_y0):
-                            field_chars.append((char_y, char_x, char_text))
-                    
-                    # 사이즈 그리드 특별 처리
-                    if field_name == 'size_grid' and field_config['type'] == 'table':
-                        pattern = field_config.get('pattern')
-                        product_data[field_name] = parse_size_grid(field_chars, pattern)
-                    else:
-                        # 텍스트 추출: 같은 Y 위치의 문자들을 X 좌표 순으로 정렬하여 합치기
-                        if field_chars:
-                            # Y 위치별로 그룹화
-                            y_groups = {}
-                            for char_y, char_x, char_text in field_chars:
-                                y_rounded = round(char_y)  # Y 좌표 반올림
-                                if y_rounded not in y_groups:
-                                    y_groups[y_rounded] = []
-                                y_groups[y_rounded].append((char_x, char_text))
-                            
-                            # 각 Y 그룹을 처리
-                            text_lines = []
-                            for y_pos in sorted(y_groups.keys(), reverse=True):
-                                chars_in_line = y_groups[y_pos]
-                                chars_in_line.sort(key=lambda c: c[0])  # X 좌표 순 정렬
-                                
-                                # 문자들을 합쳐서 단어 만들기
-                                line_text = ''.join(c[1] for c in chars_in_line).strip()
-                                if line_text:
-                                    text_lines.append(line_text)
-                            
-                            # 여러 줄을 공백으로 합치기
-                            product_data[field_name] = ' '.join(text_lines).strip() if text_lines else None
-                        else:
-                            product_data[field_name] = None
-                
-                # 모든 필드가 채워진 경우에만 제품으로 추가
-                if all(v for v in product_data.values() if v):
-                    all_products.append(product_data)
+    class LeanCharDevice(PDFTextDevice):
+        def __init__(self, rsrcmgr, page_height):
+            super().__init__(rsrcmgr)
+            self.page_height = page_height
+            self.texts = []
+            self.xs = array('d')
+            self.ys = array('d')
         
-        return all_products
+        def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+            # pdfminer PDFLayoutAnalyzer.render_char + LTChar.__init__과 같은 연산 순서 (좌표가 비트 단위로 같음)
+            try:
+                text = font.to_unichr(cid)
+            except PDFUnicodeNotDefined:
+                text = '(cid:%d)' % cid
+            adv = font.char_width(cid) * fontsize * scaling
+            if font.is_vertical():
+                vx, vy = font.char_disp(cid)
+                vx = fontsize * 0.5 if vx is None else vx * fontsize * 0.001
+                vy = (1000 - vy) * fontsize * 0.001
+                lower_left = (-vx, vy + rise + adv)
+                upper_right = (-vx + fontsize, vy + rise)
+            else:
+                descent = font.get_descent() * fontsize
+                lower_left = (0, descent + rise)
+                upper_right = (adv, descent + rise + fontsize)
+            a, b, c, d, e, f = matrix
+            x0 = a * lower_left[0] + c * lower_left[1] + e
+            x1 = a * upper_right[0] + c * upper_right[1] + e
+            y0 = b * lower_left[0] + d * lower_left[1] + f
+            y1 = b * upper_right[0] + d * upper_right[1] + f
+            self.texts.append(text)
+            self.xs.append(min(x0, x1))
+            self.ys.append(self.page_height - max(y0, y1))  # pdfplumber top
+            return adv
+    
+    _lean_char_device = LeanCharDevice
+    return _lean_char_device
 
-@app.route('/extract', methods=['POST'])
-def extract():
+def current_rss_bytes():
+    """현재 프로세스 RSS (Linux /proc 기준, 확인할 수 없으면 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def check_memory_limit():
     """
-    PDF 파일과 bbox 정보를 받아서 데이터 추출
-    Y축 스캔 모드 또는 단일 위치 추출 모드 지원
-    
-    Request:
-        - pdf: PDF 파일 (multipart/form-data)
-        - template: JSON 문자열 (템플릿 정보)
-          - pattern_extraction: true면 Y축 스캔, false면 단일 위치 추출
+    RSS가 EXTRACT_MEMORY_LIMIT_MB를 넘으면 캐시를 비워 보고, 그래도 넘으면 MemoryLimitExceeded
+
+    OOM으로 워커가 통째로 죽는 대신 해당 요청만 실패시키기 위해 페이지마다 호출
     """
-    try:
-        if 'pdf' not in request.files:
-            return jsonify({'error': 'PDF 파일이 없습니다'}), 400
-        
-        pdf_file = request.files['pdf']
-        template_str = request.form.get('template')
-        
-        if not template_str:
-            return jsonify({'error': '템플릿이 없습니다'}), 400
-        
-        template = json.loads(template_str)
-        use_pattern_extraction = template.get('pattern_extraction', False)
+    if EXTRACT_MEMORY_LIMIT_MB <= 0:
+        return
+    limit = EXTRACT_MEMORY_LIMIT_MB * 1024 * 1024
+    rss = current_rss_bytes()
+    if rss is None or rss <= limit:
+        return
+    page_char_cache.clear_memory()
+    incremental_scan_cache.clear()
+    gc.collect()
+    rss = current_rss_bytes()
+    if rss > limit:
+        raise MemoryLimitExceeded(
+            f'메모리 사용량이 상한을 넘었습니다 ({rss // (1024 * 1024)}MB > {EXTRACT_MEMORY_LIMIT_MB}MB)'
+        )
+
+@contextmanager
+def open_pdf(pdf_source):
+    """
+    pdfplumber로 PDF 열기
+
+    Args:
+        pdf_source: 파일 경로 (mmap으로 매핑해서 읽음) 또는 바이너리 스트림 (BytesIO, mmap)
+    """
+    with ExitStack() as stack:
+        with StageTimer('open'):
+            if isinstance(pdf_source, (str, os.PathLike)):
+                source = stack.enter_context(open(pdf_source, 'rb'))
+                # 빈 파일은 mmap할 수 없으므로 그대로 넘김 (pdfplumber가 형식 오류를 냄)
+                if os.fstat(source.fileno()).st_size > 0:
+                    source = stack.enter_context(mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                pdf_source.seek(0)
+                source = pdf_source
+            pdf = stack.enter_context(pdfplumber.open(source))
+            pdf.pages  # 페이지 트리 읽기까지 열기 시간에 포함
+        yield pdf
+
+def pdf_sha256(pdf_source):
+    """PDF 내용의 SHA-256 (페이지 문자 캐시 키). 경로 또는 바이너리 스트림"""
+    with StageTimer('hash'):
+        if isinstance(pdf_source, io.BytesIO):
+            return hashlib.sha256(pdf_source.getbuffer()).hexdigest()
+        if isinstance(pdf_source, mmap.mmap):
+            return hashlib.sha256(pdf_source).hexdigest()
+        digest = hashlib.sha256()
+        with open(pdf_source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+class UploadedPDF:
+    """
+    업로드된 PDF를 이름 있는 임시 파일 없이 보관
+
+    UPLOAD_SPOOL_MAX_BYTES 이하는 메모리 버퍼를 그대로 사용하고, 그보다 크면
+    익명 임시 파일(프로세스가 죽어도 자동 삭제)에 두고 mmap으로 읽는다.
+    Werkzeug가 이미 디스크에 받아둔 업로드는 복사하지 않고 그 파일을 매핑한다.
+    """
+    def __init__(self, file_storage):
+        stream = file_storage.stream
+        self.filename = file_storage.filename or ''
+        stream.seek(0, os.SEEK_END)
+        self.size = stream.tell()
+        stream.seek(0)
+        self._spill_file = None
+        self._mapped = None
         
-        # 임시 파일로 PDF 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            pdf_file.save(tmp_file.name)
-            tmp_path = tmp_file.name
+        if self.size <= UPLOAD_SPOOL_MAX_BYTES or self.size == 0:
+            self.source = stream if isinstance(stream, io.BytesIO) else io.BytesIO(stream.read())
+            return
         
         try:
-            if use_pattern_extraction:
-                # Y축 스캔 방식
-                products = extract_with_y_scan(tmp_path, template)
-                
-                # 필드별 배열로 변환
-                extracted_data = {}
-                for field_info in template.get('fields', []):
-                    field_name = field_info['field']
-                    extracted_data[field_name] = [p.get(field_name) for p in products]
-                
-                return jsonify({'success': True, 'data': extracted_data, 'products': products})
-            else:
-                # 기존 방식 (단일 위치 추출)
-                extracted_data = {}
-                
-                with pdfplumber.open(tmp_path) as pdf:
-                    for field_info in template.get('fields', []):
-                        field_name = field_info['field']
-                        bbox = field_info['bbox']
-                        field_type = field_info.get('type', 'text')
-                        page_num = bbox['page']
-                        
-                        if page_num >= len(pdf.pages):
-                            extracted_data[field_name] = None
-                            continue
-                        
-                        page = pdf.pages[page_num]
-                        
-                        # PDF 좌표계 변환
-                        x_left = min(bbox['x0'], bbox['x1'])
-                        x_right = max(bbox['x0'], bbox['x1'])
-                        y_bottom = page.height - bbox['y0']
-                        y_top = page.height - bbox['y1']
-                        crop_box = (x_left, y_bottom, x_right, y_top)
-                        
-                        crop = page.crop(crop_box)
-                        
-                        if field_type == 'table' or field_name == 'size_grid':
-                            tables = crop.extract_tables()
-                            if tables and len(tables) > 0:
-                                df = pd.DataFrame(tables[0])
-                                df = df.fillna('')
-                                for col in df.columns:
-                                    try:
-                                        numeric_series = pd.to_numeric(df[col], errors='coerce')
-                                        df[col] = numeric_series.where(pd.notna(numeric_series), df[col])
-                                    except:
-                                        pass
-                                records = df.to_dict('records')
-                                for record in records:
-                                    for key, value in record.items():
-                                        if pd.isna(value) or (isinstance(value, (float, int)) and np.isnan(value)):
-                                            record[key] = None
-                                extracted_data[field_name] = records
-                            else:
-                                extracted_data[field_name] = []
-                        else:
-                            text = crop.extract_text()
-                            extracted_data[field_name] = text.strip() if text else ''
-                
-                return jsonify({'success': True, 'data': extracted_data})
-            
-        finally:
-            # 임시 파일 삭제
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-                
-    except json.JSONDecodeError as e:
-        return jsonify({'error': f'템플릿 JSON 파싱 오류: {str(e)}'}), 400
-    except Exception as e:
-        import traceback
-        return jsonify({'error': f'추출 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+            fileno = stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self._spill_file = tempfile.TemporaryFile()
+            shutil.copyfileobj(stream, self._spill_file)
+            self._spill_file.flush()
+            fileno = self._spill_file.fileno()
+        self._mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        self.source = self._mapped
 
-@app.route('/health', methods=['GET'])
+    @property
+    def in_memory(self):
+        return self._mapped is None
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+class PageCharCache:
+    """
+    PDF 내용 해시 + 페이지 번호 → PageChars 캐시
+    메모리 LRU (바이트 예산) + 선택적 디스크 계층
+    같은 PDF를 다시 추출하면 pdfplumber 파싱을 건너뜀
+    """
+    VERSION = 1  # PageChars 형식이 바뀌면 올려서 디스크 캐시 무효화
+
+    def __init__(self, max_bytes, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = os.path.join(disk_dir, f'v{self.VERSION}') if disk_dir else None
+        self._entries = OrderedDict()  # (pdf_hash, page_num) -> (PageChars, nbytes)
+        self._page_counts = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 or self.disk_dir is not None
+
+    @staticmethod
+    def _sizeof(page_chars):
+        """메모리 사용량 추정 (문자열 객체 + 좌표 배열)"""
+        text_bytes = sys.getsizeof(page_chars.texts) + sum(sys.getsizeof(t) for t in page_chars.texts)
+        return text_bytes + page_chars.xs.itemsize * len(page_chars.xs) + page_chars.ys.itemsize * len(page_chars.ys)
+
+    def _disk_path(self, pdf_hash, name):
+        return os.path.join(self.disk_dir, pdf_hash[:2], pdf_hash, name)
+
+    def _write_disk(self, pdf_hash, name, obj):
+        path = self._disk_path(pdf_hash, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 워커가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _read_disk(self, pdf_hash, name):
+        try:
+            with open(self._disk_path(pdf_hash, name), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _remember(self, key, page_chars):
+        nbytes = self._sizeof(page_chars)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (page_chars, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+
+    def get(self, pdf_hash, page_num):
+        key = (pdf_hash, page_num)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        if self.disk_dir is None:
+            return None
+        page_chars = self._read_disk(pdf_hash, f'{page_num}.pkl')
+        if page_chars is not None:
+            page_chars = PageChars(*page_chars)
+            self._remember(key, page_chars)
+        return page_chars
+
+    def put(self, pdf_hash, page_num, page_chars, memory=True):
+        """memory=False면 디스크 계층에만 저장 (저메모리 모드)"""
+        if memory:
+            self._remember((pdf_hash, page_num), page_chars)
+        if self.disk_dir is not None:
+            self._write_disk(pdf_hash, f'{page_num}.pkl', tuple(page_chars))
+
+    def get_page_count(self, pdf_hash):
+        page_count = self._page_counts.get(pdf_hash)
+        if page_count is None and self.disk_dir is not None:
+            page_count = self._read_disk(pdf_hash, 'page_count.pkl')
+            if page_count is not None:
+                self._page_counts[pdf_hash] = page_count
+        return page_count
+
+    def put_page_count(self, pdf_hash, page_count):
+        self._page_counts[pdf_hash] = page_count
+        if self.disk_dir is not None:
+            self._write_disk(pdf_hash, 'page_count.pkl', page_count)
+
+    def clear_memory(self):
+        """메모리 계층 비우기 (디스크 계층은 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+# 페이지 문자 캐시 설정 (환경변수)
+# PAGE_CACHE_MAX_BYTES=0 이고 PAGE_CACHE_DIR이 없으면 캐시 비활성화
+page_char_cache = PageCharCache(
+    max_bytes=int(os.environ.get('PAGE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    disk_dir=os.environ.get('PAGE_CACHE_DIR') or None,
+)
+
+def iter_page_chars(pdf_source, pdf_hash=None, start=0, end=None, low_memory=False, char_loader='pdfplumber'):
+    """
+    [start, end) 페이지의 PageChars를 순서대로 반환
+
+    pdf_hash가 있으면 페이지 문자 캐시를 먼저 확인하고,
+    캐시에 없는 페이지가 있을 때만 PDF를 연다
+
+    Args:
+        pdf_source: PDF 파일 경로 또는 바이너리 스트림
+        low_memory: True면 새로 읽은 페이지를 메모리 캐시에 두지 않음 (디스크 계층만 사용)
+        char_loader: 캐시에 없는 페이지를 읽는 방식 ('pdfplumber', 'lean'. 결과는 같음)
+
+    Yields:
+        (page_num, PageChars)
+    """
+    use_cache = pdf_hash is not None and page_char_cache.enabled
+    load = load_page_chars_lean if char_loader == 'lean' else load_page_chars
+    page_count = page_char_cache.get_page_count(pdf_hash) if use_cache else None
+    with ExitStack() as stack:
+        pdf = None
+        if page_count is None:
+            pdf = stack.enter_context(open_pdf(pdf_source))
+            page_count = len(pdf.pages)
+            if use_cache:
+                page_char_cache.put_page_count(pdf_hash, page_count)
+        
+        end = page_count if end is None else min(end, page_count)
+        for page_num in range(start, end):
+            check_memory_limit()
+            with StageTimer('chars'):
+                page_chars = page_char_cache.get(pdf_hash, page_num) if use_cache else None
+                if page_chars is None:
+                    if pdf is None:
+                        pdf = stack.enter_context(open_pdf(pdf_source))
+                    page_chars = load(pdf.pages[page_num])
+                    if use_cache:
+                        page_char_cache.put(pdf_hash, page_num, page_chars, memory=not low_memory)
+            yield page_num, page_chars
+
+def get_page_count(pdf_source, pdf_hash=None):
+    """PDF 페이지 수 (캐시에 있으면 PDF를 열지 않음)"""
+    if pdf_hash is not None and page_char_cache.enabled:
+        page_count = page_char_cache.get_page_count(pdf_hash)
+        if page_count is not None:
+            return page_count
+    with open_pdf(pdf_source) as pdf:
+        page_count = len(pdf.pages)
+    if pdf_hash is not None and page_char_cache.enabled:
+        page_char_cache.put_page_count(pdf_hash, page_count)
+    return page_count
+
+# 컴파일된 템플릿 필드 (Y축 스캔 핫 루프에서 쓰는 값만 미리 계산)
+CompiledField = namedtuple('CompiledField', [
+    'name',           # 필드 이름
+    'offset',         # 첫 제품 top에서의 오프셋 (JavaScript 좌표계)
+    'x0', 'x1',       # 정규화된 X 범위 (x0 <= x1)
+    'height',         # 필드 높이
+    'type',           # 'text' / 'table'
+    'pattern',        # 저장된 패턴 (사이즈 그리드 파싱용)
+    'regex',          # 미리 컴파일한 정규식 (없거나 오류면 None)
+    'is_size_grid',   # 사이즈 그리드 특별 처리 여부
+    'matches_empty',  # 행 탐지에서 공백 문자만 있는 영역(field_text == '')도 매칭으로 인정하는지
+])
+
+CompiledTemplate = namedtuple('CompiledTemplate', ['template_hash', 'fields'])
+
+# 템플릿 내용 해시 → CompiledTemplate (템플릿 편집 중 같은 템플릿 재사용)
+COMPILED_TEMPLATE_CACHE_SIZE = 128
+_compiled_templates = OrderedDict()
+_compiled_templates_lock = threading.Lock()
+
+def template_hash(fields_template):
+    """필드 목록의 내용 해시 (키 순서와 무관)"""
+    canonical = json.dumps(fields_template, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _compile_field(field_info, first_product_top_js):
+    field_name = field_info['field']
+    bbox = field_info['bbox']
+    field_type = field_info.get('type', 'text')
+    pattern = field_info.get('pattern')  # 텍스트 패턴 저장
+    is_size_grid = field_type == 'table' and field_name == 'size_grid'
+    
+    # 정규식 문자열을 한 번만 컴파일 (오류 시 텍스트만 확인)
+    regex = None
+    regex_str = pattern.get('regex') if isinstance(pattern, dict) else None
+    if regex_str:
+        try:
+            regex = re.compile(regex_str)
+        except re.error:
+            regex = None
+    
+    # 행 탐지 매칭 규칙: 공백 아닌 문자가 있으면 (패턴 불일치여도 유연하게) 항상 매칭
+    # 공백 문자만 있으면 사이즈 그리드 패턴이거나 정규식이 빈 문자열과 매칭될 때만 인정
+    if not pattern:
+        matches_empty = False
+    elif is_size_grid:
+        matches_empty = True
+    else:
+        matches_empty = regex is not None and regex.search('') is not None
+    
+    return CompiledField(
+        name=field_name,
+        offset=first_product_top_js - bbox['y0'],
+        x0=min(bbox['x0'], bbox['x1']),
+        x1=max(bbox['x0'], bbox['x1']),
+        height=abs(bbox['y0'] - bbox['y1']),
+        type=field_type,
+        pattern=pattern,
+        regex=regex,
+        is_size_grid=is_size_grid,
+        matches_empty=matches_empty,
+    )
+
+def compile_template(template):
+    """
+    템플릿을 Y축 스캔용으로 컴파일 (필드 목록 내용 해시로 메모이즈)
+
+    Returns:
+        CompiledTemplate: fields는 템플릿 필드 순서대로 (같은 이름은 마지막 정의가 우선)
+    """
+    fields_template = template.get('fields', [])
+    key = template_hash(fields_template)
+    with _compiled_templates_lock:
+        compiled = _compiled_templates.get(key)
+        if compiled is not None:
+            _compiled_templates.move_to_end(key)
+            return compiled
+    
+    fields = {}
+    if fields_template:
+        # 템플릿의 첫 제품 기준 Y 위치 계산 (JavaScript 좌표계, 위가 큰값)
+        first_product_top_js = max(f['bbox']['y0'] for f in fields_template)
+        for field_info in fields_template:
+            fields[field_info['field']] = _compile_field(field_info, first_product_top_js)
+    compiled = CompiledTemplate(template_hash=key, fields=tuple(fields.values()))
+    
+    with _compiled_templates_lock:
+        _compiled_templates[key] = compiled
+        while len(_compiled_templates) > COMPILED_TEMPLATE_CACHE_SIZE:
+            _compiled_templates.popitem(last=False)
+    return compiled
+
+def _field_value(field, field_chars):
+    """필드 영역의 문자 [(y, x, text), ...]로부터 필드 값 계산"""
+    # 사이즈 그리드 특별 처리
+    if field.is_size_grid:
+        return parse_size_grid(field_chars, field.pattern)
+    
+    # 텍스트 추출: 같은 Y 위치의 문자들을 X 좌표 순으로 정렬하여 합치기
+    if not field_chars:
+        return None
+    
+    # Y 위치별로 그룹화
+    y_groups = {}
+    for char_y, char_x, char_text in field_chars:
+        y_rounded = round(char_y)  # Y 좌표 반올림
+        if y_rounded not in y_groups:
+            y_groups[y_rounded] = []
+        y_groups[y_rounded].append((char_x, char_text))
+    
+    # 각 Y 그룹을 처리
+    text_lines = []
+    for y_pos in sorted(y_groups.keys(), reverse=True):
+        chars_in_line = y_groups[y_pos]
+        chars_in_line.sort(key=lambda c: c[0])  # X 좌표 순 정렬
+        
+        # 문자들을 합쳐서 단어 만들기
+        line_text = ''.join(c[1] for c in chars_in_line).strip()
+        if line_text:
+            text_lines.append(line_text)
+    
+    # 여러 줄을 공백으로 합치기
+    return ' '.join(text_lines).strip() if text_lines else None
+
+def _build_products(product_row_y_positions, fields, field_chars):
+    """
+    제품 행별 필드 값 계산 (사이즈 그리드는 페이지의 모든 행을 한 번에 파싱)
+
+    Args:
+        product_row_y_positions: 제품 행 Y 위치
+        fields: CompiledTemplate.fields
+        field_chars: (field, product_base_y) -> 필드 영역의 [(y, x, text), ...]
+
+    Returns:
+        list: 위에서 아래 순서의 제품 dict (모든 필드가 채워진 행만)
+    """
+    row_ys = sorted(product_row_y_positions, reverse=True)
+    columns = [_field_column(field, row_ys, field_chars) for field in fields]
+    return _products_from_columns(row_ys, fields, columns)
+
+def _field_column(field, row_ys, field_chars):
+    """필드 하나의 행별 값 (사이즈 그리드는 모든 행을 한 번에 파싱)"""
+    with StageTimer('size_grid' if field.is_size_grid else 'fields'):
+        chars_per_row = [field_chars(field, product_base_y) for product_base_y in row_ys]
+        if field.is_size_grid:
+            return parse_size_grids(chars_per_row, field.pattern)
+        return [_field_value(field, chars) for chars in chars_per_row]
+
+def _products_from_columns(row_ys, fields, columns):
+    """필드별 값 열을 제품 dict로 합치기 (모든 필드가 채워진 행만)"""
+    products = []
+    for row in range(len(row_ys)):
+        product_data = {field.name: column[row] for field, column in zip(fields, columns)}
+        
+        # 모든 필드가 채워진 경우에만 제품으로 추가
+        if all(v for v in product_data.values() if v):
+            products.append(product_data)
+    
+    return products
+
+def _anchor_field(fields):
+    """
+    행 후보를 거를 앵커 필드 (문자를 보지 않고 템플릿의 필드 영역과 패턴으로만 선택)
+
+    제품 행은 모든 필드 영역에 문자가 있어야 하므로 어느 필드로 걸러도 결과는 같음.
+    정규식 패턴이 있는 텍스트 필드(품번 등)는 제품 행마다 있고 그 밖에는 드물어서 우선 사용하고,
+    그중 영역이 가장 작은 필드가 X 열 문자가 적어 후보를 가장 많이 걸러냄
+
+    Args:
+        fields: CompiledTemplate.fields
+
+    Returns:
+        CompiledField
+    """
+    return min(fields, key=lambda f: (f.regex is None or f.is_size_grid, (f.x1 - f.x0) * f.height, f.matches_empty))
+
+def _anchor_candidates(page_chars, anchor, y_positions):
+    """
+    앵커 영역에 문자가 있는 후보 Y 위치만 남김
+
+    페이지 문자를 한 번 훑어 앵커 X 범위 문자의 Y만 모은 뒤 후보마다 bisect로 확인
+    (행 탐지와 같은 식으로 영역을 계산하므로 남은 후보만 전체 필드로 검사해도 결과는 같음)
+
+    Args:
+        page_chars: PageChars
+        anchor: _anchor_field()가 고른 필드
+        y_positions: 후보 Y 위치 (내림차순)
+
+    Returns:
+        list: 앵커 영역에 문자가 있는 후보 Y 위치 (내림차순)
+    """
+    x0, x1 = anchor.x0, anchor.x1
+    anchor_ys = sorted(y for x, y in zip(page_chars.xs, page_chars.ys) if x0 <= x <= x1)
+    
+    candidates = []
+    for test_y in y_positions:
+        field_y0 = test_y - anchor.offset
+        field_y1 = field_y0 - anchor.height
+        if bisect_right(anchor_ys, field_y0) > bisect_left(anchor_ys, field_y1):
+            candidates.append(test_y)
+    return candidates
+
+def _page_char_dicts(page_chars):
+    """dict 기반 문자 인덱스용 문자 목록 (Y 좌표 기준 정렬: 위에서 아래로, 큰 값부터)"""
+    chars_with_js_y = [
+        {'text': text, 'x': x, 'y': y}
+        for text, x, y in zip(page_chars.texts, page_chars.xs, page_chars.ys)
+    ]
+    chars_with_js_y.sort(key=lambda c: -c['y'])
+    return chars_with_js_y
+
+def _index_field_chars(char_index):
+    """dict 기반 문자 인덱스로 (field, product_base_y) -> 필드 영역의 [(y, x, text), ...] 함수 만들기"""
+    def field_chars(field, product_base_y):
+        # 이 제품 행에서 필드의 Y 위치 계산
+        # field_y0가 위쪽 (큰 값), field_y1이 아래쪽 (작은 값)
+        field_y0 = product_base_y - field.offset
+        field_y1 = field_y0 - field.height
+        
+        # 필드 영역(X 범위 AND Y 범위) 내의 문자만 수집
+        chars = []
+        for char_data in char_index.query(field.x0, field.x1, field_y1, field_y0):
+            char_text = char_data['text'].strip()
+            if char_text:
+                chars.append((char_data['y'], char_data['x'], char_text))
+        return chars
+    
+    return field_chars
+
+def _scan_page_with_index(page_chars, fields, char_index_class, row_detection='scan'):
+    """dict 기반 문자 인덱스('index', 'linear')로 한 페이지의 제품 추출"""
+    chars_with_js_y = _page_char_dicts(page_chars)
+    char_index = char_index_class(chars_with_js_y)
+    
+    # 제품 행 찾기: 템플릿의 첫 제품 기준 Y 위치와 정확히 일치하는 패턴 찾기
+    product_row_y_positions = []
+    min_matched_fields = min(3, len(fields))
+    
+    # 각 Y 위치에서 제품 행 패턴 확인
+    unique_y_positions = sorted(set(round(c['y'] / Y_TOLERANCE) * Y_TOLERANCE for c in chars_with_js_y), reverse=True)
+    if row_detection == 'anchor':
+        # 앵커 영역이 빈 후보는 제품 행일 수 없으므로 전체 필드 검사에서 제외
+        unique_y_positions = _anchor_candidates(page_chars, _anchor_field(fields), unique_y_positions)
+    
+    for test_y in unique_y_positions:
+        # 이미 추가된 제품 행과 너무 가까우면 스킵
+        if product_row_y_positions and min(abs(test_y - py) for py in product_row_y_positions) < ROW_SPACING_THRESHOLD:
+            continue
+        
+        # 이 Y 위치가 제품 행인지 확인 (패턴 매칭 사용)
+        all_fields_matched = True
+        matched_fields_count = 0
+        
+        for field in fields:
+            # 이 제품 행에서 필드의 예상 Y 위치 계산
+            expected_field_y0 = test_y - field.offset
+            expected_field_y1 = expected_field_y0 - field.height
+            
+            # 필드 영역(X AND Y) 내의 텍스트 추출
+            field_chars = char_index.query(field.x0, field.x1, expected_field_y1, expected_field_y0)
+            
+            if not field_chars:
+                all_fields_matched = False
+                break
+            
+            # 텍스트가 있으면 매칭, 공백뿐이면 컴파일 시 계산한 규칙 적용
+            if field.matches_empty or any(c['text'].strip() for c in field_chars):
+                matched_fields_count += 1
+        
+        # 모든 필드가 매칭되고, 적어도 3개 이상의 필드가 있어야 제품 행으로 인식
+        if all_fields_matched and matched_fields_count >= min_matched_fields:
+            product_row_y_positions.append(test_y)
+    
+    return _build_products(product_row_y_positions, fields, _index_field_chars(char_index))
+
+def _scan_page_numpy(page_chars, fields, row_detection='scan'):
+    """NumpyPageScanner로 한 페이지의 제품 추출 ('index' 엔진과 같은 결과)"""
+    scanner = NumpyPageScanner(page_chars)
+    candidates = scanner.unique_y_positions(Y_TOLERANCE)
+    
+    if row_detection == 'anchor':
+        # 앵커 영역에 문자가 있는 후보만 남긴 뒤 나머지 필드 검사
+        anchor = _anchor_field(fields)
+        y_tops = candidates - anchor.offset
+        any_chars, _ = scanner.probe(anchor.x0, anchor.x1, y_tops - anchor.height, y_tops)
+        candidates = candidates[any_chars]
+    
+    # 후보 행 × 필드 검사를 필드 단위 배치로 계산
+    all_fields_matched = np.ones(len(candidates), dtype=bool)
+    matched_fields_count = np.zeros(len(candidates), dtype=np.int64)
+    for field in fields:
+        y_tops = candidates - field.offset
+        y_bottoms = y_tops - field.height
+        any_chars, any_nonblank = scanner.probe(field.x0, field.x1, y_bottoms, y_tops)
+        all_fields_matched &= any_chars
+        matched_fields_count += any_chars if field.matches_empty else any_nonblank
+    
+    qualified = all_fields_matched & (matched_fields_count >= min(3, len(fields)))
+    
+    # 행 간격 조건은 앞서 채택된 행에만 의존하므로 순차 처리
+    product_row_y_positions = []
+    for test_y, ok in zip(candidates.tolist(), qualified.tolist()):
+        if not ok:
+            continue
+        if product_row_y_positions and min(abs(test_y - py) for py in product_row_y_positions) < ROW_SPACING_THRESHOLD:
+            continue
+        product_row_y_positions.append(test_y)
+    
+    def field_chars(field, product_base_y):
+        field_y0 = product_base_y - field.offset
+        field_y1 = field_y0 - field.height
+        return scanner.field_chars(field.x0, field.x1, field_y1, field_y0)
+    
+    return _build_products(product_row_y_positions, fields, field_chars)
+
+def scan_page(page_chars, fields, engine='index', row_detection='scan'):
+    """
+    한 페이지의 문자 데이터에서 제품 행을 찾아 추출
+
+    Args:
+        page_chars: PageChars
+        fields: CompiledTemplate.fields
+        engine: 추출 엔진 ('index', 'linear', 'numpy')
+        row_detection: 제품 행 탐지 방식 ('scan', 'anchor')
+    """
+    if not page_chars.texts:
+        return []
+    if engine == 'numpy':
+        return _scan_page_numpy(page_chars, fields, row_detection)
+    return _scan_page_with_index(page_chars, fields, CHAR_ENGINES[engine], row_detection)
+
+class IncrementalPageState:
+    """
+    증분 추출용 한 페이지의 중간 결과 (템플릿 bbox를 조정하며 같은 PDF를 반복 추출할 때 재사용)
+
+    - probes: 필드 영역 (x0, x1, offset, height) -> 후보 Y마다 영역에 문자가 있는지 / 공백 아닌 문자가 있는지
+    - rows:   행 탐지에 쓰인 필드 키들 -> 제품 행 Y 위치
+    - values: 필드 값 키 -> {제품 행 Y: 값}
+    필드 키는 컴파일된 필드 기준이라 이름만 바뀐 필드도 그대로 재사용
+    nbytes는 메모리 사용량 추정이며, 항목이 바뀔 때마다 on_resize(증감)로 캐시에 알림
+    """
+    def __init__(self, page_chars):
+        self.lock = threading.Lock()
+        self.candidates = sorted(set(round(y / Y_TOLERANCE) * Y_TOLERANCE for y in page_chars.ys), reverse=True)
+        # X 정렬 순서: 바뀐 필드의 X 열 문자를 페이지 전체를 훑지 않고 bisect로 찾기 위함
+        self.x_order = sorted(range(len(page_chars.xs)), key=page_chars.xs.__getitem__)
+        self.x_sorted = [page_chars.xs[i] for i in self.x_order]
+        self.probes = OrderedDict()
+        self.rows = OrderedDict()
+        self.values = OrderedDict()
+        self._item_bytes = {}  # (항목 캐시, 키) -> 추정 크기
+        self.on_resize = None
+        # 목록 + float 객체 (후보 Y, X 좌표) + int 객체 (문자 번호)
+        self.nbytes = (sys.getsizeof(self.candidates) + sys.getsizeof(self.x_order) + sys.getsizeof(self.x_sorted)
+                       + 24 * (len(self.candidates) + len(self.x_sorted)) + 28 * len(self.x_order))
+
+    def column(self, field):
+        """필드 X 범위 [x0, x1]에 있는 문자 번호 (페이지 문자 순서)"""
+        start = bisect_left(self.x_sorted, field.x0)
+        end = bisect_right(self.x_sorted, field.x1)
+        return sorted(self.x_order[start:end])
+
+    @staticmethod
+    def _sizeof(value):
+        """항목 메모리 사용량 추정: (bytearray, bytearray) / [Y, ...] / {Y: 값}"""
+        if isinstance(value, tuple):
+            return sum(sys.getsizeof(v) for v in value)
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+        return sys.getsizeof(value) + 24 * len(value)
+
+    def remember(self, cache, key, value):
+        """필드 키별 캐시에 저장 (페이지마다 최근 INCREMENTAL_FIELD_KEYS개만 유지)"""
+        cache[key] = value
+        cache.move_to_end(key)
+        nbytes = self._sizeof(value)
+        delta = nbytes - self._item_bytes.get((id(cache), key), 0)
+        self._item_bytes[(id(cache), key)] = nbytes
+        while len(cache) > INCREMENTAL_FIELD_KEYS:
+            evicted_key, _ = cache.popitem(last=False)
+            delta -= self._item_bytes.pop((id(cache), evicted_key))
+        self.nbytes += delta
+        if self.on_resize is not None:
+            self.on_resize(delta)
+
+class IncrementalScanCache:
+    """(PDF 내용 해시, 페이지 번호) -> IncrementalPageState 메모리 LRU (페이지 수 + 바이트 예산)"""
+    def __init__(self, max_pages, max_bytes):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self._pages = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def page_state(self, pdf_hash, page_num, page_chars):
+        """페이지의 중간 결과 (없으면 새로 만듦. 예산을 넘는 페이지는 이번 추출에만 쓰고 보관하지 않음)"""
+        key = (pdf_hash, page_num)
+        with self._lock:
+            state = self._pages.get(key)
+            if state is None:
+                state = IncrementalPageState(page_chars)
+                if state.nbytes > self.max_bytes:
+                    return state
+                state.on_resize = lambda delta: self._resize(key, state, delta)
+                self._pages[key] = state
+                self._bytes += state.nbytes
+            self._pages.move_to_end(key)
+            self._evict()
+            return state
+
+    def _resize(self, key, state, delta):
+        """보관 중인 페이지의 중간 결과가 늘거나 줄었을 때 예산 반영 (이미 밀려난 페이지는 무시)"""
+        with self._lock:
+            if self._pages.get(key) is state:
+                self._bytes += delta
+                self._evict()
+
+    def _evict(self):
+        while self._pages and (len(self._pages) > self.max_pages or self._bytes > self.max_bytes):
+            _, evicted = self._pages.popitem(last=False)
+            evicted.on_resize = None
+            self._bytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            for state in self._pages.values():
+                state.on_resize = None
+            self._pages.clear()
+            self._bytes = 0
+
+incremental_scan_cache = IncrementalScanCache(INCREMENTAL_CACHE_PAGES, INCREMENTAL_CACHE_MAX_BYTES)
+
+def _probe_key(field):
+    return (field.x0, field.x1, field.offset, field.height)
+
+def _value_key(field):
+    """필드 값이 의존하는 것: 영역과 (사이즈 그리드면) 패턴"""
+    pattern = json.dumps(field.pattern, sort_keys=True) if field.is_size_grid else None
+    return _probe_key(field) + (field.is_size_grid, pattern)
+
+def _probe_field(page_chars, state, field):
+    """
+    후보 Y 위치마다 필드 영역에 문자가 있는지 검사 (X 열 문자만 모아서 bisect, 행 탐지와 같은 영역 계산)
+
+    Returns:
+        (any_chars, any_nonblank): 후보 순서의 bytearray (1이면 있음)
+    """
+    texts, ys = page_chars.texts, page_chars.ys
+    indices = state.column(field)
+    column = sorted(ys[i] for i in indices)
+    nonblank_column = sorted(ys[i] for i in indices if texts[i].strip())
+    
+    candidates = state.candidates
+    any_chars = bytearray(len(candidates))
+    any_nonblank = bytearray(len(candidates))
+    for i, test_y in enumerate(candidates):
+        field_y0 = test_y - field.offset
+        field_y1 = field_y0 - field.height
+        if bisect_right(column, field_y0) > bisect_left(column, field_y1):
+            any_chars[i] = 1
+            if bisect_right(nonblank_column, field_y0) > bisect_left(nonblank_column, field_y1):
+                any_nonblank[i] = 1
+    return any_chars, any_nonblank
+
+def _column_field_chars(page_chars, state, field):
+    """
+    필드 X 범위의 공백 아닌 문자만으로 (field, product_base_y) -> [(y, x, text), ...] 함수 만들기
+    페이지 문자 순서에서 Y 내림차순 안정 정렬이라 페이지 전체 문자 인덱스를 query한 결과와 순서까지 같음
+    """
+    chars = [
+        (page_chars.ys[i], page_chars.xs[i], page_chars.texts[i].strip())
+        for i in state.column(field)
+        if page_chars.texts[i].strip()
+    ]
+    chars.sort(key=lambda c: -c[0])
+    neg_y = [-c[0] for c in chars]
+    
+    def field_chars(field, product_base_y):
+        field_y0 = product_base_y - field.offset
+        field_y1 = field_y0 - field.height
+        return chars[bisect_left(neg_y, -field_y0):bisect_right(neg_y, -field_y1)]
+    
+    return field_chars
+
+def _incremental_rows(state, page_chars, fields):
+    """캐시된 필드 검사 결과를 합쳐서 제품 행 Y 위치 계산 (바뀐 필드 영역만 새로 검사)"""
+    rows_key = tuple(sorted(_probe_key(field) + (field.matches_empty,) for field in fields))
+    rows = state.rows.get(rows_key)
+    if rows is not None:
+        state.rows.move_to_end(rows_key)
+        return rows
+    
+    probes = []
+    for field in fields:
+        key = _probe_key(field)
+        probe = state.probes.get(key)
+        if probe is None:
+            probe = _probe_field(page_chars, state, field)
+        state.remember(state.probes, key, probe)
+        any_chars, any_nonblank = probe
+        probes.append((any_chars, any_chars if field.matches_empty else any_nonblank))
+    
+    # 행 탐지 규칙은 scan_page와 동일: 모든 필드 영역에 문자가 있고, 매칭 필드가 min(3, 필드 수) 이상
+    rows = []
+    min_matched_fields = min(3, len(fields))
+    for i, test_y in enumerate(state.candidates):
+        if rows and min(abs(test_y - py) for py in rows) < ROW_SPACING_THRESHOLD:
+            continue
+        if all(any_chars[i] for any_chars, _ in probes) and sum(matched[i] for _, matched in probes) >= min_matched_fields:
+            rows.append(test_y)
+    
+    state.remember(state.rows, rows_key, rows)
+    return rows
+
+def scan_page_incremental(page_chars, fields, state):
+    """
+    scan_page와 같은 결과를 페이지 중간 결과 캐시로 계산
+
+    템플릿에서 필드 하나의 bbox만 바뀌면 그 필드 영역 검사와 값 계산만 새로 하고,
+    제품 행이 그대로면 나머지 필드 값은 캐시에서 가져옴
+    (가장 위쪽 필드의 y0가 바뀌면 모든 필드의 offset이 바뀌므로 전체를 다시 계산)
+    필드 X 열의 문자만 보므로 추출 엔진과 무관 (결과는 모든 엔진과 같음)
+
+    Args:
+        page_chars: PageChars
+        fields: CompiledTemplate.fields
+        state: 이 페이지의 IncrementalPageState
+    """
+    if not page_chars.texts:
+        return []
+    with state.lock:
+        row_ys = sorted(_incremental_rows(state, page_chars, fields), reverse=True)
+        
+        columns = []
+        for field in fields:
+            key = _value_key(field)
+            cached = state.values.get(key, {})
+            missing = [y for y in row_ys if y not in cached]
+            if missing:
+                cached = dict(cached)
+                cached.update(zip(missing, _field_column(field, missing, _column_field_chars(page_chars, state, field))))
+            state.remember(state.values, key, cached)
+            columns.append([cached[y] for y in row_ys])
+        
+        return _products_from_columns(row_ys, fields, columns)
+
+def _scan_page_range(pdf_path, pdf_hash, fields, engine, row_detection, low_memory, char_loader, start, end):
+    """
+    프로세스 풀 워커: PDF를 직접 열어서 [start, end) 페이지 추출
+    (워커 프로세스마다 페이지 문자 캐시를 따로 가지며, 디스크 계층은 공유)
+
+    Returns:
+        list: 페이지별 제품 리스트 [[product, ...], ...]
+    """
+    return [
+        scan_page(page_chars, fields, engine, row_detection)
+        for _, page_chars in iter_page_chars(pdf_path, pdf_hash, start, end, low_memory, char_loader)
+    ]
+
+def get_process_pool():
+    """요청 간에 재사용하는 프로세스 풀 (gunicorn 워커마다 처음 사용할 때 생성)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+        return _process_pool
+
+def _reset_process_pool():
+    """워커가 죽어서 깨진 풀을 버리고 다음 요청에서 새로 만들도록 함"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+def _iter_pages_parallel(pdf_path, pdf_hash, fields, engine, row_detection, low_memory, char_loader, page_count):
+    """페이지 범위를 프로세스 풀에 나눠 맡기고 페이지 순서대로 결과 반환"""
+    # 워커 수의 2배로 나눠서 페이지별 처리 시간 편차를 흡수
+    chunk_count = min(page_count, EXTRACT_WORKERS * 2)
+    chunk_size = -(-page_count // chunk_count)
+    pool = get_process_pool()
+    try:
+        futures = [
+            pool.submit(_scan_page_range, pdf_path, pdf_hash, fields, engine, row_detection, low_memory, char_loader,
+                        start, min(start + chunk_size, page_count))
+            for start in range(0, page_count, chunk_size)
+        ]
+        page_num = 0
+        for future in futures:
+            with StageTimer('parallel'):  # 워커 프로세스의 단계별 시간은 합쳐서 대기 시간으로만 보임
+                page_results = future.result()
+            for products in page_results:
+                yield page_num, products
+                page_num += 1
+    except BrokenProcessPool:
+        _reset_process_pool()
+        raise
+
+@contextmanager
+def _worker_pdf_path(pdf_source):
+    """프로세스 풀 워커가 열 수 있는 파일 경로 (스트림이면 요청 동안만 임시 파일로 씀)"""
+    if isinstance(pdf_source, (str, os.PathLike)):
+        yield pdf_source
+        return
+    pdf_source.seek(0)
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as tmp_file:
+        shutil.copyfileobj(pdf_source, tmp_file)
+        tmp_file.flush()
+        yield tmp_file.name
+
+def iter_y_scan_pages(pdf_source, template, engine=None, parallel=False, row_detection=None, low_memory=None,
+                      incremental=None, char_loader=None):
+    """
+    Y축 스캔 결과를 페이지 단위로 반환하는 제너레이터
+
+    Args:
+        pdf_source: PDF 파일 경로 또는 바이너리 스트림 (BytesIO, mmap)
+        template: 템플릿 정보
+        engine: 추출 엔진 ('index' 기본, 'linear', 'numpy'). 없으면 template['engine'] 사용
+        parallel: True면 페이지 범위를 프로세스 풀에 나눠서 처리
+        row_detection: 제품 행 탐지 방식 ('scan' 기본, 'anchor'). 없으면 template['row_detection'] 사용
+        low_memory: True면 읽은 페이지 문자를 메모리 캐시에 두지 않음. 없으면 template['low_memory'] 또는 LOW_MEMORY
+        incremental: True면 페이지별 중간 결과(필드 영역 검사, 제품 행, 필드 값)를 캐시해서
+                     템플릿 일부만 바뀐 재추출에서 바뀐 필드만 다시 계산 (순차 처리). 없으면 template['incremental']
+        char_loader: 페이지 문자 로더 ('pdfplumber', 'lean'). 없으면 template['char_loader'] 또는 CHAR_LOADER
+
+    Yields:
+        (page_num, products): 페이지 순서대로
+    """
+    timings = current_timings()
+    for page_num, products in _iter_y_scan_pages(pdf_source, template, engine, parallel, row_detection, low_memory,
+                                                 incremental, char_loader):
+        if timings is not None:
+            timings.count_page(products)  # 지표: 처리한 페이지 / 추출한 제품 수
+        yield page_num, products
+
+def _iter_y_scan_pages(pdf_source, template, engine, parallel, row_detection, low_memory, incremental, char_loader):
+    """iter_y_scan_pages 본체"""
+    fields_template = template.get('fields', [])
+    if not fields_template:
+        return
+    
+    engine = engine or template.get('engine', 'index')
+    if engine not in CHAR_ENGINES:
+        raise ValueError(f'알 수 없는 추출 엔진: {engine}')
+    
+    row_detection = row_detection or template.get('row_detection', 'scan')
+    if row_detection not in ROW_DETECTION_MODES:
+        raise ValueError(f'알 수 없는 행 탐지 방식: {row_detection}')
+    
+    char_loader = char_loader or template.get('char_loader', CHAR_LOADER)
+    if char_loader not in CHAR_LOADERS:
+        raise ValueError(f'알 수 없는 문자 로더: {char_loader}')
+    
+    if low_memory is None:
+        low_memory = bool(template.get('low_memory', LOW_MEMORY))
+    if incremental is None:
+        incremental = bool(template.get('incremental', False))
+    
+    fields = compile_template(template).fields
+    
+    if incremental:
+        # 증분 모드: 중간 결과 캐시가 이 프로세스에 있으므로 병렬 처리하지 않음 (엔진, 행 탐지 방식과 무관하게 같은 결과)
+        pdf_hash = pdf_sha256(pdf_source)
+        for page_num, page_chars in iter_page_chars(pdf_source, pdf_hash, low_memory=low_memory, char_loader=char_loader):
+            with StageTimer('rows'):
+                state = incremental_scan_cache.page_state(pdf_hash, page_num, page_chars)
+                products = scan_page_incremental(page_chars, fields, state)
+            yield page_num, products
+        return
+    
+    # 페이지 문자 캐시 키 (내용 기반이라 같은 PDF를 다시 올려도 적중)
+    pdf_hash = pdf_sha256(pdf_source) if page_char_cache.enabled else None
+    
+    if parallel and EXTRACT_WORKERS > 1:
+        page_count = get_page_count(pdf_source, pdf_hash)
+        if page_count >= PARALLEL_MIN_PAGES:
+            # 병렬 모드: 각 워커가 PDF를 직접 열어서 처리 (메모리 업로드는 이때만 파일로 씀)
+            with _worker_pdf_path(pdf_source) as pdf_path:
+                yield from _iter_pages_parallel(pdf_path, pdf_hash, fields, engine, row_detection, low_memory, char_loader,
+                                                page_count)
+            return
+    
+    for page_num, page_chars in iter_page_chars(pdf_source, pdf_hash, low_memory=low_memory, char_loader=char_loader):
+        with StageTimer('rows'):  # 행 탐지 (안쪽의 필드 값 / 사이즈 그리드 계산은 따로 집계)
+            products = scan_page(page_chars, fields, engine, row_detection)
+        yield page_num, products
+
+def extract_with_y_scan(pdf_source, template, engine=None, parallel=False, row_detection=None, low_memory=None,
+                        incremental=None, char_loader=None):
+    """
+    Y축 스캔 방식으로 반복 제품 추출
+    필드 영역(X 범위 AND Y 범위) 내의 텍스트만 정확히 수집
+    
+    Args:
+        pdf_source: PDF 파일 경로 또는 바이너리 스트림
+        template: 템플릿 정보
+        engine: 추출 엔진 ('index' 기본, 'linear', 'numpy'). 없으면 template['engine'] 사용
+        parallel: True면 멀티코어 페이지 병렬 처리 (결과 순서는 동일)
+        row_detection: 제품 행 탐지 방식 ('scan' 기본, 'anchor'). 없으면 template['row_detection'] 사용
+        low_memory: True면 페이지 문자를 메모리 캐시에 두지 않음
+        incremental: True면 페이지별 중간 결과를 캐시해서 템플릿에서 바뀐 필드만 다시 계산
+        char_loader: 페이지 문자 로더 ('pdfplumber' 기본, 'lean'). 없으면 template['char_loader'] 사용
+    """
+    all_products = []
+    for _, products in iter_y_scan_pages(pdf_source, template, engine=engine, parallel=parallel,
+                                         row_detection=row_detection, low_memory=low_memory,
+                                         incremental=incremental, char_loader=char_loader):
+        all_products.extend(products)
+    return all_products
+
+def products_to_field_arrays(template, products):
+    """제품 리스트를 필드별 배열로 변환 (응답의 data)"""
+    extracted_data = {}
+    for field_info in template.get('fields', []):
+        field_name = field_info['field']
+        extracted_data[field_name] = [p.get(field_name) for p in products]
+    return extracted_data
+
+class PageCropIndex:
+    """
+    단일 위치 추출용 페이지 문자 인덱스
+    페이지 문자를 top 기준으로 한 번 정렬해 두고, 필드 bbox마다 page.crop()과 같은 문자만 잘라냄
+    (필드마다 전체 객체를 자르는 CroppedPage를 만들지 않음)
+    """
+    def __init__(self, page):
+        self.page = page
+        self.chars = page.chars
+        self.order = sorted(range(len(self.chars)), key=lambda i: self.chars[i]['top'])
+        self.tops = [self.chars[i]['top'] for i in self.order]
+        # bbox 위쪽에 걸친 문자까지 찾기 위한 여유 (가장 큰 문자 높이 + 1)
+        self.max_height = max((c['bottom'] - c['top'] for c in self.chars), default=0) + 1
+
+    def crop_chars(self, crop_box):
+        """crop_box (x0, top, x1, bottom)와 겹치는 문자를 잘라서 원래 순서대로 반환 (page.crop(crop_box).chars와 동일)"""
+        _, top, _, bottom = crop_box
+        start = bisect_left(self.tops, top - self.max_height)
+        end = bisect_right(self.tops, bottom)
+        candidates = [self.chars[i] for i in sorted(self.order[start:end])]
+        return pdfplumber.utils.crop_to_bbox(candidates, crop_box)
+
+    def extract_text(self, crop_box):
+        """page.crop(crop_box).extract_text()와 같은 결과"""
+        pdfplumber.page.test_proposed_bbox(crop_box, self.page.bbox)
+        x0, top, x1, bottom = crop_box
+        textmap = pdfplumber.utils.chars_to_textmap(
+            self.crop_chars(crop_box),
+            x_shift=x0,
+            y_shift=top,
+            layout_width=x1 - x0,
+            layout_height=bottom - top,
+        )
+        return textmap.as_string
+
+# pd.to_numeric이 숫자로 읽는 문자열 (pandas 파서와 같은 문법: ASCII 공백, 부호, 소수점, 지수)
+TABLE_NUMBER_RE = re.compile(r'[ \t\n\v\f\r]*([+-]?)([0-9]*)(\.?)([0-9]*)(?:[eE]([+-]?[0-9]+))?[ \t\n\v\f\r]*')
+TABLE_INF_RE = re.compile(r'[+-]?inf(?:inity)?', re.IGNORECASE)
+TABLE_EXACT_DIGITS = 15  # 가수 자릿수가 이 이하이고
+TABLE_EXACT_EXPONENT = 22  # 10의 지수가 이 이하이면 pandas의 float 변환과 비트 단위로 같음
+
+def _parse_table_number(text):
+    """
+    표 셀 문자열 하나를 pd.to_numeric(errors='coerce')처럼 숫자로 변환
+
+    Returns:
+        (value, is_int, exact): value는 float, 숫자가 아니면 None
+                                is_int는 소수점/지수 없는 정수 표기인지 (열 전체가 정수면 int로 변환)
+                                exact가 False면 pandas 결과와 같다고 보장할 수 없음 (inf, 긴 가수, 큰 지수 등)
+    """
+    match = TABLE_NUMBER_RE.fullmatch(text)
+    if match is None:
+        return None, False, '\x00' not in text and TABLE_INF_RE.fullmatch(text) is None
+    sign, int_digits, point, frac_digits, exponent = match.groups()
+    digits = int_digits + frac_digits
+    if not digits:
+        return None, False, True
+    if len(digits) > TABLE_EXACT_DIGITS or (exponent is not None and len(exponent.lstrip('+-')) > 3):
+        return None, False, False
+    
+    # pandas와 같이 정수 가수에 10의 거듭제곱을 곱하거나 나눔 (둘 다 정확한 값이라 한 번만 반올림)
+    scale = (int(exponent) if exponent is not None else 0) - len(frac_digits)
+    if abs(scale) > TABLE_EXACT_EXPONENT:
+        return None, False, False
+    mantissa = float(int(digits))
+    value = mantissa * float(10 ** scale) if scale >= 0 else mantissa / float(10 ** -scale)
+    return (-value if sign == '-' else value), not point and exponent is None, True
+
+def _fast_table_records(table):
+    """
+    pandas 없이 표를 레코드로 변환 (_table_records_pandas와 같은 결과)
+    열마다 모두 정수면 int, 숫자가 아닌 값이나 실수가 섞이면 숫자는 float, 숫자가 아닌 값은 원래 문자열
+
+    Returns:
+        list: 레코드 리스트, 결과가 pandas와 같다고 보장할 수 없는 셀이 있으면 None
+    """
+    rows = [list(row) for row in table]
+    width = max((len(row) for row in rows), default=0)
+    if width == 0:
+        return []  # 열이 없는 DataFrame은 레코드도 없음
+    columns = []
+    for col in range(width):
+        texts = ['' if col >= len(row) or row[col] is None else row[col] for row in rows]
+        values = []
+        all_int = True
+        for text in texts:
+            if not isinstance(text, str):
+                return None
+            value, is_int, exact = _parse_table_number(text)
+            if not exact:
+                return None
+            all_int = all_int and is_int
+            values.append(value)
+        columns.append([
+            text if value is None else (int(value) if all_int else value)
+            for text, value in zip(texts, values)
+        ])
+    
+    return [{col: columns[col][i] for col in range(width)} for i in range(len(rows))]
+
+def _table_records_pandas(table):
+    """DataFrame + pd.to_numeric으로 표를 레코드로 변환 (_fast_table_records가 처리하지 못하는 표용)"""
+    df = pd.DataFrame(table)
+    df = df.fillna('')
+    for col in df.columns:
+        try:
+            numeric_series = pd.to_numeric(df[col], errors='coerce')
+            df[col] = numeric_series.where(pd.notna(numeric_series), df[col])
+        except:
+            pass
+    records = df.to_dict('records')
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value) or (isinstance(value, (float, int)) and np.isnan(value)):
+                record[key] = None
+    return records
+
+def _table_records(table):
+    """extract_tables() 결과 표 하나를 레코드 리스트로 변환 (숫자로 바꿀 수 있는 값은 숫자로)"""
+    records = _fast_table_records(table)
+    if records is None:
+        records = _table_records_pandas(table)
+    return records
+
+def extract_single_location(pdf_source, template):
+    """
+    단일 위치 추출: 각 필드의 bbox 영역을 지정된 페이지에서 한 번씩 추출
+
+    필드를 페이지별로 묶어서 페이지마다 문자를 한 번만 읽고 정렬한 뒤 텍스트 필드에 나눠줌
+    표 필드(type 'table' 또는 size_grid)만 선/사각형이 필요하므로 crop + extract_tables 사용
+
+    Args:
+        pdf_source: PDF 파일 경로 또는 바이너리 스트림
+
+    Returns:
+        dict: {field_name: text 또는 records}
+    """
+    fields_template = template.get('fields', [])
+    values = [None] * len(fields_template)
+    
+    # 페이지 번호 → 필드 인덱스 목록 (템플릿 순서 유지)
+    fields_by_page = defaultdict(list)
+    for i, field_info in enumerate(fields_template):
+        fields_by_page[field_info['bbox']['page']].append(i)
+    
+    with open_pdf(pdf_source) as pdf, StageTimer('fields'):
+        for page_num, field_indices in fields_by_page.items():
+            if page_num >= len(pdf.pages):
+                continue  # 페이지가 없으면 None
+            
+            page = pdf.pages[page_num]
+            crop_index = None
+            
+            for i in field_indices:
+                field_info = fields_template[i]
+                field_name = field_info['field']
+                bbox = field_info['bbox']
+                field_type = field_info.get('type', 'text')
+                
+                # PDF 좌표계 변환
+                x_left = min(bbox['x0'], bbox['x1'])
+                x_right = max(bbox['x0'], bbox['x1'])
+                y_bottom = page.height - bbox['y0']
+                y_top = page.height - bbox['y1']
+                crop_box = (x_left, y_bottom, x_right, y_top)
+                
+                if field_type == 'table' or field_name == 'size_grid':
+                    tables = page.crop(crop_box).extract_tables()
+                    values[i] = _table_records(tables[0]) if tables else []
+                else:
+                    if crop_index is None:
+                        crop_index = PageCropIndex(page)
+                    text = crop_index.extract_text(crop_box)
+                    values[i] = text.strip() if text else ''
+            
+            # 다음 페이지로 넘어가기 전에 이 페이지의 파싱 결과 해제
+            crop_index = None
+            page.flush_cache()
+            check_memory_limit()
+    
+    # 응답 키 순서와 같은 이름 필드의 우선순위는 템플릿 순서 그대로
+    extracted_data = {}
+    for field_info, value in zip(fields_template, values):
+        extracted_data[field_info['field']] = value
+    return extracted_data
+
+def page_tokens(page_chars):
+    """
+    페이지 문자를 줄(top) 단위로 묶고 X 간격으로 나눈 텍스트 토큰 (segment_cells와 같은 셀 단위)
+    숫자는 '#'로 바꿔서 형태만 비교 ('PAGE 1'과 'PAGE 2', 날짜, 송장 번호가 문서마다 달라도 같은 토큰)
+
+    Returns:
+        list: [(text, x, y), ...] 위에서 아래, 왼쪽에서 오른쪽 순서 (x는 토큰 시작 X, 연속 공백은 하나로)
+    """
+    lines = defaultdict(list)
+    for text, x, y in zip(page_chars.texts, page_chars.xs, page_chars.ys):
+        lines[round(y)].append((x, text))
+    
+    tokens = []
+    for y in sorted(lines):
+        for text, _, x_start, _ in segment_cells(lines[y]):
+            tokens.append((DIGITS_RE.sub('#', ' '.join(text.split())), x_start, y))
+    return tokens
+
+def build_fingerprint(page_chars, template=None, max_tokens=FINGERPRINT_MAX_TOKENS):
+    """
+    업체 지문: 첫 페이지에서 라벨/헤더로 보이는 토큰과 그 위치
+    글자가 있고 페이지에 한 번만 나오는 토큰만 사용
+    (제품 행마다 반복되는 품번/수량 형태나 숫자뿐인 값은 기준으로 쓰지 않음)
+    Y축 스캔 템플릿을 주면 첫 제품 행(템플릿 필드 영역)보다 위에 있는 토큰만 사용
+    (한 번만 나온 제품 값이 지문에 들어가면 같은 업체의 다른 문서와 맞지 않음)
+
+    Args:
+        page_chars: 샘플 PDF 첫 페이지 PageChars
+        template: 이 샘플로 만든 템플릿 (필드 bbox는 샘플 첫 제품 행 기준)
+
+    Returns:
+        dict: {'tokens': [[text, x, y], ...]} 위쪽 토큰부터 max_tokens개
+    """
+    tokens = page_tokens(page_chars)
+    if template and template.get('pattern_extraction') and template.get('fields'):
+        first_row_top = min(min(f['bbox']['y0'], f['bbox']['y1']) for f in template['fields'])
+        tokens = [token for token in tokens if token[2] < first_row_top]
+    counts = Counter(text for text, _, _ in tokens)
+    anchors = [
+        [text, round(x, 1), y]
+        for text, x, y in tokens
+        if counts[text] == 1 and any(c.isalpha() for c in text)
+    ]
+    return {'tokens': anchors[:max_tokens]}
+
+def load_first_page_chars(pdf_source):
+    """첫 페이지 PageChars (페이지 문자 캐시 사용: 감지 후 같은 PDF를 추출하면 첫 페이지는 다시 읽지 않음)"""
+    pdf_hash = pdf_sha256(pdf_source) if page_char_cache.enabled else None
+    for _, page_chars in iter_page_chars(pdf_source, pdf_hash, end=1):
+        return page_chars
+    return PageChars(texts=[], xs=array('d'), ys=array('d'))
+
+class TemplateLibrary:
+    """
+    서버 쪽 업체 템플릿 라이브러리 (JSON 파일)
+
+    app.js '템플릿 내보내기' 형식에 업체별 지문을 더한 형태:
+        {업체명: {'fields': [...], ..., 'fingerprint': {'tokens': [[text, x, y], ...]}}}
+    다른 워커가 파일을 바꾸면 다음 조회 때 다시 읽는다.
+    지문 토큰 텍스트 → (업체, 토큰 번호, x, y) 역색인을 만들어 두고
+    페이지 토큰을 한 번만 훑으면서 모든 업체의 점수를 함께 계산한다.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = None
+        self._templates = {}
+        self._index = {}
+        self._token_counts = {}
+
+    def _file_version(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        """파일이 바뀌었으면 다시 읽기 (self._lock 안에서 호출)"""
+        version = self._file_version()
+        if version == self._version:
+            return
+        templates = {}
+        if version is not None:
+            with open(self.path, encoding='utf-8') as f:
+                templates = json.load(f)
+        self._set(templates, version)
+
+    def _set(self, templates, version):
+        index = defaultdict(list)
+        token_counts = {}
+        for vendor, template in templates.items():
+            tokens = (template.get('fingerprint') or {}).get('tokens') or []
+            if tokens:
+                token_counts[vendor] = len(tokens)
+            for i, (text, x, y) in enumerate(tokens):
+                index[text].append((vendor, i, x, y))
+        self._templates = templates
+        self._index = dict(index)
+        self._token_counts = token_counts
+        self._version = version
+
+    def vendors(self):
+        """업체 목록 [{vendor, fields, fingerprint_tokens}, ...]"""
+        with self._lock:
+            self._refresh()
+            return [
+                {'vendor': vendor, 'fields': len(template.get('fields', [])), 'fingerprint_tokens': self._token_counts.get(vendor, 0)}
+                for vendor, template in self._templates.items()
+            ]
+
+    def get(self, vendor):
+        """추출에 쓸 템플릿 (지문을 뺀 복사본 + vendor). 없으면 None"""
+        with self._lock:
+            self._refresh()
+            template = self._templates.get(vendor)
+        if template is None:
+            return None
+        template = {key: value for key, value in template.items() if key != 'fingerprint'}
+        template['vendor'] = vendor
+        return template
+
+    @contextmanager
+    def _update(self):
+        """
+        다른 워커 프로세스와 겹치지 않게 파일을 잠그고 최신 내용의 복사본을 넘겨줌
+        with 블록이 끝나면 복사본을 임시 파일에 쓰고 원자적으로 교체
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + '.lock', 'w') as lock_file, self._lock:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            templates = dict(self._templates)
+            yield templates
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(templates, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._set(templates, self._file_version())
+
+    def save(self, vendor, template):
+        with self._update() as templates:
+            templates[vendor] = template
+
+    def delete(self, vendor):
+        """업체 템플릿 삭제. 없으면 False"""
+        with self._update() as templates:
+            return templates.pop(vendor, None) is not None
+
+    def score(self, tokens, tolerance=FINGERPRINT_POSITION_TOLERANCE):
+        """
+        페이지 토큰을 모든 업체 지문과 한 번에 비교
+
+        Args:
+            tokens: page_tokens() 결과
+            tolerance: 지문 토큰과 같은 위치로 보는 X, Y 차이
+
+        Returns:
+            list: [{vendor, score, matched, tokens}, ...] 점수 높은 순
+                  score = 위치까지 일치한 지문 토큰 수 / 지문 토큰 수
+        """
+        with self._lock:
+            self._refresh()
+            index, token_counts = self._index, self._token_counts
+        
+        matched = defaultdict(set)
+        for text, x, y in tokens:
+            for vendor, i, anchor_x, anchor_y in index.get(text, ()):
+                if abs(x - anchor_x) <= tolerance and abs(y - anchor_y) <= tolerance:
+                    matched[vendor].add(i)
+        
+        scores = [
+            {'vendor': vendor, 'score': round(len(matched[vendor]) / count, 4), 'matched': len(matched[vendor]), 'tokens': count}
+            for vendor, count in token_counts.items()
+        ]
+        scores.sort(key=lambda s: (-s['score'], -s['matched'], s['vendor']))
+        return scores
+
+template_library = TemplateLibrary(TEMPLATE_LIBRARY_PATH)
+
+def detect_template(pdf_source):
+    """
+    PDF 첫 페이지를 라이브러리의 모든 업체 지문과 비교
+
+    Returns:
+        dict: {'vendor': 최고 점수 업체 (DETECT_MIN_SCORE 미만이면 None), 'score': 최고 점수, 'candidates': 상위 후보}
+    """
+    page_chars = load_first_page_chars(pdf_source)
+    with StageTimer('detect'):
+        scores = template_library.score(page_tokens(page_chars))
+    best = scores[0] if scores else None
+    return {
+        'vendor': best['vendor'] if best and best['score'] >= DETECT_MIN_SCORE else None,
+        'score': best['score'] if best else 0.0,
+        'candidates': scores[:DETECT_CANDIDATES],
+    }
+
+def detected_template(pdf_source):
+    """
+    업체를 자동 감지해서 추출할 템플릿 결정
+
+    Returns:
+        (template, detection)
+
+    Raises:
+        TemplateNotDetected: 일치하는 업체가 없음
+    """
+    detection = detect_template(pdf_source)
+    template = template_library.get(detection['vendor']) if detection['vendor'] else None
+    if template is None:
+        raise TemplateNotDetected(
+            f'일치하는 업체 템플릿이 없습니다 (최고 점수 {detection["score"]:.2f}, 기준 {DETECT_MIN_SCORE})', detection)
+    template.setdefault('pattern_extraction', True)  # app.js 추출과 같이 Y축 스캔이 기본
+    return template, detection
+
+# Prometheus 지표: 이름 -> (형식, 설명)
+METRIC_DEFINITIONS = {
+    'packing_list_request_duration_seconds': ('histogram', '요청 처리 시간 (스트리밍 응답은 마지막 줄까지)'),
+    'packing_list_stage_duration_seconds': ('histogram', '요청(배치는 파일, 작업은 작업 하나)별 단계 시간 (안쪽 단계 제외)'),
+    'packing_list_pages_processed_total': ('counter', 'Y축 스캔으로 처리한 페이지 수'),
+    'packing_list_products_extracted_total': ('counter', 'Y축 스캔으로 추출한 제품 수'),
+    'packing_list_result_cache_total': ('counter', '추출 결과 캐시 조회 (hit: 저장된 결과, coalesced: 진행 중인 추출을 기다림, miss: 직접 추출)'),
+}
+
+class MetricsRegistry:
+    """
+    프로세스별 요청 지표 (카운터, 히스토그램)
+
+    gunicorn 워커, 프로세스 풀 워커, 작업 워커가 기록할 때마다 자기 값을 METRICS_DIR/<pid>.json에 저장하고
+    /metrics는 모든 프로세스 파일을 합쳐서 Prometheus 텍스트 형식으로 보여줌
+    (끝난 프로세스의 파일도 남겨 둬서 워커가 재시작해도 카운터가 줄지 않음)
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._counters = {}    # (이름, 라벨) -> 값
+        self._histograms = {}  # (이름, 라벨) -> [버킷별 개수..., +Inf 개수, 합계]
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    @staticmethod
+    def _read(path):
+        """지표 파일 → (counters, histograms). 없거나 깨졌으면 빈 값"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            counters = {(name, tuple(map(tuple, labels))): value for name, labels, value in snapshot['counters']}
+            histograms = {(name, tuple(map(tuple, labels))): values for name, labels, values in snapshot['histograms']}
+            return counters, histograms
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}, {}
+
+    def _ensure_process(self):
+        """fork된 자식이면 부모 값을 버리고 시작 (같은 PID였던 이전 프로세스의 파일이 있으면 이어서 누적)"""
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._counters, self._histograms = self._read(self._path(pid))
+
+    def _write(self):
+        snapshot = {
+            'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+            'histograms': [[name, labels, values] for (name, labels), values in self._histograms.items()],
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self._path(self._pid)}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self._path(self._pid))
+        except OSError:
+            pass  # 파일에 못 써도 이 프로세스 값은 /metrics에 그대로 보임
+
+    def _observe(self, name, labels, seconds):
+        values = self._histograms.get((name, labels))
+        if values is None:
+            values = self._histograms[(name, labels)] = [0] * (len(LATENCY_BUCKETS) + 2)
+        values[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        values[-1] += seconds
+
+    def _inc(self, name, labels, amount):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def record(self, endpoint, timings, status=None):
+        """
+        StageTimings 하나를 지표에 반영하고 파일에 저장
+
+        Args:
+            endpoint: 'extract', 'detect', 'batch', 'job'
+            status: 응답 상태 코드 (작업이면 'done' / 'failed'). 없으면 요청 시간은 기록하지 않음 (배치의 파일별 기록)
+        """
+        with self._lock:
+            self._ensure_process()
+            if status is not None:
+                self._observe('packing_list_request_duration_seconds',
+                              (('endpoint', endpoint), ('status', str(status))), timings.elapsed())
+            for stage, seconds in timings.seconds.items():
+                self._observe('packing_list_stage_duration_seconds', (('endpoint', endpoint), ('stage', stage)), seconds)
+            self._inc('packing_list_pages_processed_total', (('endpoint', endpoint),), timings.pages)
+            self._inc('packing_list_products_extracted_total', (('endpoint', endpoint),), timings.products)
+            if timings.cache is not None:
+                self._inc('packing_list_result_cache_total', (('endpoint', endpoint), ('result', timings.cache)), 1)
+            self._write()
+
+    def collect(self):
+        """이 프로세스 값 + METRICS_DIR의 다른 프로세스 파일 합계 → (counters, histograms)"""
+        with self._lock:
+            self._ensure_process()
+            counters = dict(self._counters)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith('.json') or name == f'{self._pid}.json':
+                continue
+            other_counters, other_histograms = self._read(os.path.join(self.directory, name))
+            for key, value in other_counters.items():
+                counters[key] = counters.get(key, 0) + value
+            for key, values in other_histograms.items():
+                merged = histograms.setdefault(key, [0] * len(values))
+                for i, value in enumerate(values):
+                    merged[i] += value
+        return counters, histograms
+
+    def render(self):
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (metric_type, description) in METRIC_DEFINITIONS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), values):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {values[-1]}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+def _format_labels(labels):
+    """Prometheus 라벨 {key="value",...} (값의 역슬래시, 따옴표, 줄바꿈 이스케이프)"""
+    def escape(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels) + '}'
+
+metrics = MetricsRegistry(METRICS_DIR)
+
+def _instrumented_stream(chunks, timings, endpoint, status):
+    """스트리밍 응답을 한 덩어리씩 내보내며 그 사이 단계 시간을 timings에 수집, 끝나면 (클라이언트가 끊어도) 지표 기록"""
+    iterator = iter(chunks)
+    done = object()
+    try:
+        while True:
+            with timings.activate():
+                chunk = next(iterator, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+        metrics.record(endpoint, timings, status)
+
+def instrumented(endpoint):
+    """
+    뷰 데코레이터: 요청 단계별 시간 수집 → Server-Timing 헤더 + 지표 기록
+    스트리밍 응답은 헤더를 보낼 때까지의 단계만 헤더에 담기고, 지표는 스트림이 끝날 때 기록
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return view(*args, **kwargs)
+            timings = StageTimings()
+            with timings.activate():
+                response = app.make_response(view(*args, **kwargs))
+            response.headers['Server-Timing'] = timings.server_timing()
+            if response.is_streamed and not response.direct_passthrough:
+                response.response = _instrumented_stream(response.response, timings, endpoint, response.status_code)
+            else:
+                metrics.record(endpoint, timings, response.status_code)
+            return response
+        return wrapper
+    return decorator
+
+def _timings_block(requested):
+    """timings 옵션이 켜져 있으면 응답에 붙일 {'timings': {단계: ms, ...}} (응답 인코딩 시간은 Server-Timing에만 있음)"""
+    timings = current_timings()
+    return {'timings': timings.as_dict()} if requested and timings is not None else {}
+
+def _request_option(template, key, default=None):
+    """요청 옵션 조회: 폼/쿼리 파라미터가 템플릿 값보다 우선"""
+    value = request.values.get(key)
+    if value is not None and value != '':
+        return value
+    return template.get(key, default)
+
+def _request_flag(template, key, default=False):
+    """불리언 요청 옵션 조회 ('true', '1', 'yes', 'on' 문자열도 허용)"""
+    value = _request_option(template, key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'on')
+    return bool(value)
+
+def _stream_y_scan_ndjson(upload, template, page_results, detection=None, include_timings=False):
+    """
+    Y축 스캔 결과를 NDJSON으로 스트리밍
+    페이지가 끝날 때마다 그 페이지 제품을 한 줄씩 내보내고 마지막 줄에 요약 레코드를 붙임
+    업체 자동 감지 결과가 있으면 첫 줄에 감지 레코드를 붙임
+    include_timings면 요약 레코드에 단계별 시간(timings)을 붙임
+    스트림이 끝나면 (클라이언트가 끊어도) 업로드 버퍼 해제
+
+    Args:
+        page_results: (page_num, products) 이터러블 (iter_y_scan_pages 또는 캐시된 결과)
+    """
+    product_count = 0
+    page_count = 0
+    try:
+        if detection is not None:
+            yield json.dumps({'type': 'detection', 'fields': [f['field'] for f in template.get('fields', [])], **detection},
+                             ensure_ascii=False) + '\n'
+        for page_num, products in page_results:
+            page_count = page_num + 1
+            product_count += len(products)
+            with StageTimer('encode'):
+                lines = ''.join(
+                    json.dumps({'type': 'product', 'page': page_num, 'product': product}, ensure_ascii=False) + '\n'
+                    for product in products
+                )
+            if lines:
+                yield lines
+        yield json.dumps({'type': 'summary', 'success': True, 'pages': page_count, 'products': product_count,
+                          **_timings_block(include_timings)}) + '\n'
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'error': f'추출 오류: {str(e)}'}, ensure_ascii=False) + '\n'
+    finally:
+        close = getattr(page_results, 'close', None)
+        if close is not None:
+            close()  # 끊긴 스트림의 추출 제너레이터 정리 (결과 캐시에 맡은 추출 해제)
+        upload.close()
+
+# 파일 내보내기 형식: (mimetype, 확장자, 필요한 선택 패키지)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', None),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx', 'openpyxl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', 'pyarrow'),
+}
+EXPORT_BATCH_ROWS = 4096  # parquet row group 크기 (이만큼씩만 메모리에 모아서 기록)
+
+ExportColumn = namedtuple('ExportColumn', [
+    'header',  # 열 이름
+    'field',   # 제품 필드 이름 (page 열은 None)
+    'size',    # 사이즈 그리드 열이면 사이즈, 아니면 None
+])
+
+def _spool_products(page_results):
+    """
+    Y축 스캔 제품을 페이지가 끝날 때마다 익명 임시 파일에 한 줄씩 기록 (제품 전체를 메모리에 두지 않음)
+    사이즈 열은 모든 제품을 봐야 정해지므로 처음 나온 순서대로 모아 둠
+
+    Args:
+        page_results: (page_num, products) 이터러블
+
+    Returns:
+        (spool, sizes, product_count): spool은 처음으로 되감은 임시 파일 (줄마다 JSON [page, product]),
+        sizes는 사이즈 그리드에 나온 사이즈 목록
+    """
+    spool = tempfile.TemporaryFile()
+    sizes = {}
+    product_count = 0
+    try:
+        for page_num, products in page_results:
+            for product in products:
+                for value in product.values():
+                    if isinstance(value, dict):
+                        sizes.update(dict.fromkeys(value))
+                spool.write(json.dumps([page_num, product], ensure_ascii=False).encode('utf-8') + b'\n')
+                product_count += 1
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, list(sizes), product_count
+
+def _export_columns(template, sizes):
+    """
+    내보낼 열: page + 템플릿 필드 순서 (사이즈 그리드 필드는 사이즈마다 한 열로 펼침)
+    사이즈가 다른 열 이름과 겹치면 '<필드>.<사이즈>'로 구분
+    """
+    fields = compile_template(template).fields
+    taken = {'page'} | {field.name for field in fields}
+    columns = [ExportColumn('page', None, None)]
+    for field in fields:
+        if not field.is_size_grid:
+            columns.append(ExportColumn(field.name, field.name, None))
+            continue
+        for size in sizes:
+            header = f'{field.name}.{size}' if size in taken else size
+            columns.append(ExportColumn(header, field.name, size))
+    return columns
+
+def _export_rows(spool, columns):
+    """임시 파일의 제품을 열 순서의 행으로 (page는 1부터, 없는 사이즈는 None)"""
+    for line in spool:
+        page_num, product = json.loads(line)
+        row = []
+        for column in columns:
+            if column.field is None:
+                row.append(page_num + 1)
+            elif column.size is None:
+                row.append(product.get(column.field))
+            else:
+                grid = product.get(column.field)
+                row.append(grid.get(column.size) if isinstance(grid, dict) else None)
+        yield row
+
+def _write_csv(out, columns, rows):
+    # Excel에서 한글이 깨지지 않도록 BOM 포함
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow([column.header for column in columns])
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+def _write_xlsx(out, columns, rows):
+    openpyxl = importlib.import_module('openpyxl')
+    illegal_characters = importlib.import_module('openpyxl.cell.cell').ILLEGAL_CHARACTERS_RE
+    # write_only: 행을 바로 임시 XML로 내보내고 셀 객체를 메모리에 두지 않음
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('products')
+    sheet.append([column.header for column in columns])
+    for row in rows:
+        # PDF 텍스트의 제어 문자는 XML에 쓸 수 없으므로 제거
+        sheet.append([illegal_characters.sub('', value) if isinstance(value, str) else value for value in row])
+    workbook.save(out)
+
+def _write_parquet(out, columns, rows):
+    pa = importlib.import_module('pyarrow')
+    pq = importlib.import_module('pyarrow.parquet')
+    schema = pa.schema([
+        (column.header, pa.string() if column.field is not None and column.size is None else pa.int64())
+        for column in columns
+    ])
+    with pq.ParquetWriter(out, schema) as writer:
+        while True:
+            batch = list(islice(rows, EXPORT_BATCH_ROWS))
+            if not batch:
+                break
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array([row[i] for row in batch], type=schema.field(i).type) for i in range(len(columns))],
+                schema=schema,
+            ))
+
+EXPORT_WRITERS = {'csv': _write_csv, 'xlsx': _write_xlsx, 'parquet': _write_parquet}
+
+def export_module_missing(output_format):
+    """내보내기 형식에 필요한 선택 패키지가 설치되어 있지 않으면 그 이름, 아니면 None"""
+    module_name = EXPORT_FORMATS[output_format][2]
+    if module_name is None:
+        return None
+    try:
+        importlib.import_module(module_name)
+    except ImportError:
+        return module_name
+    return None
+
+def export_pages(page_results, template, output_format):
+    """
+    페이지별 제품을 CSV / XLSX / Parquet 파일로 기록
+    제품은 페이지마다 임시 파일에 쌓고, 사이즈 열이 정해진 뒤 형식별 스트리밍 writer로 한 행씩 옮김
+
+    Args:
+        page_results: (page_num, products) 이터러블 (iter_y_scan_pages 또는 캐시된 결과)
+        output_format: EXPORT_FORMATS의 키
+
+    Returns:
+        (out, product_count): out은 처음으로 되감은 익명 임시 파일
+    """
+    spool, sizes, product_count = _spool_products(page_results)
+    with spool:
+        columns = _export_columns(template, sizes)
+        out = tempfile.TemporaryFile()
+        try:
+            with StageTimer('encode'):
+                EXPORT_WRITERS[output_format](out, columns, _export_rows(spool, columns))
+            out.seek(0)
+        except BaseException:
+            out.close()
+            raise
+    return out, product_count
+
+def export_y_scan(pdf_source, template, output_format, **scan_options):
+    """
+    Y축 스캔 제품을 CSV / XLSX / Parquet 파일로 기록 (export_pages 참고)
+
+    Args:
+        output_format: EXPORT_FORMATS의 키
+        scan_options: iter_y_scan_pages 옵션 (engine, parallel, row_detection, low_memory, incremental, char_loader)
+
+    Returns:
+        (out, product_count): out은 처음으로 되감은 익명 임시 파일
+    """
+    return export_pages(iter_y_scan_pages(pdf_source, template, **scan_options), template, output_format)
+
+# /extract 응답 형식
+class ResultCache:
+    """
+    추출 결과 캐시: PDF 내용 해시 + 템플릿 내용 → 추출 결과
+    (Y축 스캔은 {'data', 'products', 'product_pages', 'pages'}로 json / ndjson / 파일 내보내기가 공유,
+    단일 위치 추출은 {'data'})
+
+    gunicorn 워커들이 같은 SQLite 파일(WAL)을 공유하고, 압축한 결과 크기의 합이 max_bytes를 넘으면
+    가장 오래 쓰이지 않은 결과부터 지움. 같은 키를 다른 요청(다른 워커 포함)이 추출하는 중이면
+    inflight 행을 보고 그 결과가 저장될 때까지 기다려서 같은 추출을 두 번 하지 않음
+    """
+    VERSION = 2  # 결과 형식이 바뀌면 올려서 이전 결과 무효화
+    # 결과에 영향을 주지 않는 템플릿 옵션 (키에서 제외: 엔진/행 탐지 방식/실행 방식과 관계없이 결과가 같음)
+    EXECUTION_OPTIONS = ('engine', 'row_detection', 'parallel', 'low_memory', 'incremental', 'char_loader', 'format', 'timings',
+                         'cache')
+    TOUCH_INTERVAL = 60  # 적중할 때마다 쓰지 않도록 accessed_at 갱신 간격 (초)
+
+    def __init__(self, path, max_bytes, wait_seconds):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.wait_seconds = wait_seconds
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _conn(self):
+        """스레드별 SQLite 연결 (fork된 자식은 부모 연결을 쓰지 않고 새로 연결). 테이블이 없으면 생성"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # 캐시라서 전원이 나갈 때 마지막 결과를 잃어도 됨
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,            -- zlib 압축한 결과 JSON
+                nbytes INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS inflight (
+                key TEXT PRIMARY KEY,
+                pid INTEGER NOT NULL,          -- 추출 중인 프로세스
+                started_at REAL NOT NULL
+            )
+        ''')
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def key(self, pdf_hash, template):
+        """캐시 키: 결과 형식 버전 + PDF 내용 해시 + 실행 옵션을 뺀 템플릿 내용 해시"""
+        options = {name: value for name, value in template.items() if name not in self.EXECUTION_OPTIONS}
+        return f'v{self.VERSION}:{pdf_hash}:{template_hash(options)}'
+
+    def _read(self, conn, key, now):
+        """
+        저장된 결과와 진행 중인 추출 조회 (읽기만 함)
+
+        Returns:
+            (압축된 결과 또는 None, 결과의 accessed_at, 다른 프로세스가 추출 중인지)
+        """
+        row = conn.execute('SELECT body, accessed_at FROM results WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            return row[0], row[1], False
+        # 추출 중인 프로세스가 살아 있으면 기다림 (죽었거나 너무 오래되면 이어받음)
+        owner = conn.execute('SELECT pid, started_at FROM inflight WHERE key = ?', (key,)).fetchone()
+        busy = owner is not None and _pid_alive(owner[0]) and now - owner[1] < self.wait_seconds
+        return None, None, busy
+
+    def _lookup_or_claim(self, key):
+        """
+        저장된 결과를 찾고, 없으면 (아무도 추출 중이 아닐 때) 이 요청이 추출을 맡음
+
+        조회와 대기 중 확인은 쓰기 잠금 없이 읽기만 하고, 추출을 맡을 때만 쓰기 잠금을 잡고 다시 확인.
+        적중한 결과의 accessed_at(LRU 순서)은 TOUCH_INTERVAL보다 오래됐을 때만 갱신
+
+        Returns:
+            (압축된 결과 또는 None, 추출을 맡았는지)
+        """
+        now = time.time()
+        conn = self._conn()
+        body, accessed_at, busy = self._read(conn, key, now)
+        if body is not None:
+            if now - accessed_at > self.TOUCH_INTERVAL:
+                conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+            return body, False
+        if busy:
+            return None, False
+        
+        with self._transaction() as conn:
+            # 읽은 뒤 다른 프로세스가 먼저 저장했거나 맡았을 수 있음
+            body, _, busy = self._read(conn, key, now)
+            if body is not None or busy:
+                return body, False
+            conn.execute('INSERT OR REPLACE INTO inflight (key, pid, started_at) VALUES (?, ?, ?)', (key, os.getpid(), now))
+            return None, True
+
+    def _finish(self, key, body, claimed):
+        """결과 저장 (body가 None이면 추출 실패) + 맡은 추출 표시 해제 + 크기 상한을 넘으면 오래된 결과부터 삭제"""
+        with self._transaction() as conn:
+            if body is not None and len(body) <= self.max_bytes:
+                conn.execute('INSERT OR REPLACE INTO results (key, body, nbytes, accessed_at) VALUES (?, ?, ?, ?)',
+                             (key, body, len(body), time.time()))
+                total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM results').fetchone()[0]
+                if total > self.max_bytes:
+                    for old_key, nbytes in conn.execute('SELECT key, nbytes FROM results ORDER BY accessed_at').fetchall():
+                        conn.execute('DELETE FROM results WHERE key = ?', (old_key,))
+                        total -= nbytes
+                        if total <= self.max_bytes:
+                            break
+            if claimed:
+                conn.execute('DELETE FROM inflight WHERE key = ? AND pid = ?', (key, os.getpid()))
+
+    def lookup(self, key):
+        """
+        key의 저장된 결과 조회
+
+        같은 키를 다른 요청이 추출 중이면 그 결과가 저장될 때까지 기다림. 그 추출이 실패했거나
+        프로세스가 죽었으면 이 요청이 추출을 맡고, wait_seconds가 지나면 기다리지 않고 직접 추출.
+        결과가 없으면 호출한 쪽이 추출해서 store()로 저장 (추출을 맡았으면 실패 시 release())
+
+        Returns:
+            (결과 또는 None, 추출을 맡았는지, 'hit' / 'coalesced' / 'miss')
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        claimed = False
+        try:
+            while True:
+                with StageTimer('cache'):
+                    body, claimed = self._lookup_or_claim(key)
+                if body is not None:
+                    with StageTimer('cache'):
+                        result = json.loads(zlib.decompress(body))
+                    status = 'coalesced' if waited else 'hit'
+                    self._report(status)
+                    return result, False, status
+                if claimed or time.monotonic() >= deadline:
+                    break
+                waited = True
+                with StageTimer('wait'):
+                    time.sleep(RESULT_CACHE_POLL_INTERVAL)
+        except sqlite3.Error:
+            claimed = False  # SQLite 오류가 나면 캐시 없이 추출
+        self._report('miss')
+        return None, claimed, 'miss'
+
+    def store(self, key, result, claimed):
+        """추출한 결과 저장 + 맡은 추출 표시 해제 (저장하지 못해도 이 요청의 결과는 그대로 응답)"""
+        with StageTimer('cache'):
+            body = zlib.compress(json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 1)
+            try:
+                self._finish(key, body, claimed)
+            except sqlite3.Error:
+                pass  # 기다리던 요청은 이어받아 추출
+
+    def release(self, key):
+        """맡은 추출이 실패했을 때 표시만 해제 (기다리던 요청이 이어받음)"""
+        try:
+            self._finish(key, None, True)
+        except sqlite3.Error:
+            pass
+
+    def get_or_compute(self, key, compute):
+        """
+        key의 결과를 반환. 없으면 compute()로 추출해서 저장 (lookup + store)
+
+        Returns:
+            (결과, 'hit' / 'coalesced' / 'miss')
+        """
+        result, claimed, status = self.lookup(key)
+        if result is not None:
+            return result, status
+        
+        try:
+            result = compute()
+        except BaseException:
+            if claimed:
+                self.release(key)
+            raise
+        
+        self.store(key, result, claimed)
+        return result, 'miss'
+
+    @staticmethod
+    def _report(status):
+        """조회 결과를 현재 요청의 StageTimings에 남김 (지표 packing_list_result_cache_total)"""
+        timings = current_timings()
+        if timings is not None:
+            timings.cache = status
+
+
+result_cache = ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_WAIT_SECONDS)
+
+OUTPUT_FORMATS = ('json', 'ndjson') + tuple(EXPORT_FORMATS)
+
+def _y_scan_cache_result(template, page_results):
+    """
+    페이지별 제품을 결과 캐시 형식으로: json 응답의 data / products + ndjson / 파일 내보내기를
+    다시 만들기 위한 제품별 페이지 번호(product_pages)와 페이지 수(pages)
+    """
+    products = []
+    product_pages = []
+    page_count = 0
+    for page_num, page_products in page_results:
+        page_count = page_num + 1
+        products.extend(page_products)
+        product_pages.extend([page_num] * len(page_products))
+    return {'data': products_to_field_arrays(template, products), 'products': products,
+            'product_pages': product_pages, 'pages': page_count}
+
+def _cached_page_results(result):
+    """캐시된 Y축 스캔 결과를 iter_y_scan_pages처럼 (page_num, products)로 (제품이 없는 페이지 포함)"""
+    pages = [[] for _ in range(result['pages'])]
+    for page_num, product in zip(result['product_pages'], result['products']):
+        pages[page_num].append(product)
+    return enumerate(pages)
+
+def _cache_page_results(cache_key, claimed, template, page_results):
+    """
+    페이지 결과를 그대로 넘기면서 모아 두었다가 마지막 페이지까지 나오면 결과 캐시에 저장
+    (중간에 실패하거나 스트림이 끊기면 저장하지 않고 맡은 추출만 해제)
+    """
+    recorded = []
+    stored = False
+    try:
+        for page_num, products in page_results:
+            recorded.append((page_num, products))
+            yield page_num, products
+        result_cache.store(cache_key, _y_scan_cache_result(template, recorded), claimed)
+        stored = True
+    finally:
+        if not stored and claimed:
+            result_cache.release(cache_key)
+
+def _extract_response(upload, template, detection=None):
+    """
+    업로드 PDF를 템플릿으로 추출해서 응답 생성 (/extract, /detect 공용)
+    업로드 버퍼는 여기서 해제 (NDJSON 스트리밍이면 스트림이 끝날 때 해제)
+
+    Args:
+        upload: UploadedPDF
+        template: 템플릿 정보
+        detection: 업체 자동 감지 결과 (있으면 응답에 'detection'으로 포함)
+    """
+    try:
+        use_pattern_extraction = template.get('pattern_extraction', False)
+        
+        output_format = _request_option(template, 'format', 'json')
+        if output_format not in OUTPUT_FORMATS:
+            return jsonify({'error': f'지원하지 않는 응답 형식: {output_format}'}), 400
+        if output_format == 'ndjson' and not use_pattern_extraction:
+            return jsonify({'error': 'ndjson 스트리밍은 Y축 스캔 모드에서만 지원합니다'}), 400
+        if output_format in EXPORT_FORMATS:
+            if not use_pattern_extraction:
+                return jsonify({'error': f'{output_format} 내보내기는 Y축 스캔 모드에서만 지원합니다'}), 400
+            missing = export_module_missing(output_format)
+            if missing:
+                return jsonify({'error': f'{output_format} 내보내기에는 {missing} 패키지가 필요합니다'}), 501
+        
+        extra = {} if detection is None else {'detection': detection}
+        include_timings = _request_flag(template, 'timings')
+        
+        # 같은 PDF + 같은 템플릿 결과는 워커 간 공유 캐시에서 (같은 추출이 진행 중이면 그 결과를 기다림)
+        # json / ndjson / 파일 내보내기가 같은 결과를 공유
+        cache_key = None
+        if result_cache.enabled and _request_flag(template, 'cache', True):
+            cache_key = result_cache.key(pdf_sha256(upload.source), template)
+        
+        if use_pattern_extraction:
+            # Y축 스캔 방식
+            def page_results():
+                return iter_y_scan_pages(upload.source, template,
+                                         engine=_request_option(template, 'engine'),
+                                         parallel=_request_flag(template, 'parallel'),
+                                         row_detection=_request_option(template, 'row_detection'),
+                                         low_memory=_request_flag(template, 'low_memory', LOW_MEMORY),
+                                         incremental=_request_flag(template, 'incremental'),
+                                         char_loader=_request_option(template, 'char_loader'))
+            
+            if output_format != 'json':
+                # 캐시에 있으면 저장된 제품을 다시 내보내고, 없으면 추출하면서 모아 두었다가 끝나면 저장
+                cache_status = None
+                if cache_key is None:
+                    pages = page_results()
+                else:
+                    cached, claimed, cache_status = result_cache.lookup(cache_key)
+                    if cached is not None:
+                        pages = _cached_page_results(cached)
+                    else:
+                        pages = _cache_page_results(cache_key, claimed, template, page_results())
+                
+                if output_format == 'ndjson':
+                    # 스트리밍: 업로드 해제는 스트림 제너레이터가 담당
+                    # (업로드 버퍼가 요청 종료 시 닫히지 않도록 요청 컨텍스트 유지)
+                    stream = stream_with_context(_stream_y_scan_ndjson(upload, template, pages, detection=detection,
+                                                                 include_timings=include_timings))
+                    upload = None
+                    response = Response(stream, mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+                else:
+                    # 파일 내보내기: 결과 파일을 그대로 응답 (send_file이 다 보낸 뒤 닫음)
+                    try:
+                        out, product_count = export_pages(pages, template, output_format)
+                    finally:
+                        if hasattr(pages, 'close'):
+                            pages.close()  # 추출이 실패했으면 결과 캐시에 맡은 추출 해제
+                    mimetype, extension, _ = EXPORT_FORMATS[output_format]
+                    stem = os.path.splitext(os.path.basename(upload.filename))[0] or 'products'
+                    response = send_file(out, mimetype=mimetype, as_attachment=True,
+                                         download_name=f'{stem}.{extension}', max_age=0)
+                    response.headers['X-Product-Count'] = str(product_count)
+                if cache_status is not None:
+                    response.headers['X-Result-Cache'] = cache_status
+                return response
+        
+        def extract_result():
+            if use_pattern_extraction:
+                return _y_scan_cache_result(template, page_results())
+            # 기존 방식 (단일 위치 추출)
+            return {'data': extract_single_location(upload.source, template)}
+        
+        cache_status = None
+        if cache_key is not None:
+            result, cache_status = result_cache.get_or_compute(cache_key, extract_result)
+        else:
+            result = extract_result()
+        
+        # product_pages / pages는 ndjson / 파일 내보내기용 (json 응답에는 넣지 않음)
+        data = {name: result[name] for name in ('data', 'products') if name in result}
+        body = {'success': True, **data, **extra, **_timings_block(include_timings)}
+        with StageTimer('encode'):
+            response = jsonify(body)
+        if cache_status is not None:
+            response.headers['X-Result-Cache'] = cache_status
+        return response
+        
+    finally:
+        if upload is not None:
+            upload.close()
+
+@app.route('/extract', methods=['POST'])
+@instrumented('extract')
+def extract():
+    """
+    PDF 파일과 bbox 정보를 받아서 데이터 추출
+    Y축 스캔 모드 또는 단일 위치 추출 모드 지원
+    
+    Request:
+        - pdf: PDF 파일 (multipart/form-data)
+        - template: JSON 문자열 (템플릿 정보)
+          - pattern_extraction: true면 Y축 스캔, false면 단일 위치 추출
+        - engine: (선택) Y축 스캔 추출 엔진 ('index', 'linear', 'numpy'), 템플릿 값보다 우선
+        - parallel: (선택) true면 페이지 병렬 추출, 템플릿 값보다 우선
+        - row_detection: (선택) 제품 행 탐지 방식 ('scan', 'anchor'), 템플릿 값보다 우선
+        - low_memory: (선택) true면 페이지 문자를 메모리 캐시에 두지 않음, 템플릿 값보다 우선
+        - incremental: (선택) true면 페이지별 중간 결과를 캐시해서 템플릿 편집 후 재추출 시 바뀐 필드만 계산
+        - char_loader: (선택) 페이지 문자 로더 ('pdfplumber', 'lean'), 템플릿 값보다 우선
+        - format: (선택) 'json' (기본), 'ndjson' (Y축 스캔 결과를 제품 단위로 스트리밍),
+          'csv' / 'xlsx' / 'parquet' (Y축 스캔 결과를 파일로 다운로드, 사이즈 그리드는 사이즈별 열)
+        - timings: (선택) true면 응답에 단계별 처리 시간(ms) 'timings' 포함 (ndjson은 요약 레코드에)
+        - cache: (선택) false면 추출 결과 캐시를 쓰지 않음 (json / ndjson / 파일 내보내기가 같은 결과를 공유)
+    
+    Response 헤더:
+        - Server-Timing: 단계별 처리 시간 (upload, hash, open, chars, rows, fields, size_grid, encode, ...)
+        - X-Result-Cache: 추출 결과 캐시 조회 결과 ('hit', 'coalesced', 'miss')
+    """
+    try:
+        with StageTimer('upload'):
+            files = request.files  # multipart 본문 수신 / 파싱
+        if 'pdf' not in files:
+            return jsonify({'error': 'PDF 파일이 없습니다'}), 400
+        
+        pdf_file = files['pdf']
+        template_str = request.form.get('template')
+        
+        if not template_str:
+            return jsonify({'error': '템플릿이 없습니다'}), 400
+        
+        template = json.loads(template_str)
+        
+        # 업로드를 메모리 버퍼로 (큰 파일은 익명 임시 파일 + mmap) 보관
+        with StageTimer('upload'):
+            upload = UploadedPDF(pdf_file)
+        return _extract_response(upload, template)
+                
+    except json.JSONDecodeError as e:
+        return jsonify({'error': f'템플릿 JSON 파싱 오류: {str(e)}'}), 400
+    except MemoryLimitExceeded as e:
+        return jsonify({'error': f'추출 오류: {str(e)}'}), 503
+    except Exception as e:
+        import traceback
+        return jsonify({'error': f'추출 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+
+@app.route('/detect', methods=['POST'])
+@instrumented('detect')
+def detect():
+    """
+    업체 자동 감지 후 추출: 첫 페이지를 템플릿 라이브러리의 모든 업체 지문과 비교해서
+    가장 잘 맞는 업체 템플릿으로 추출 (업체를 고르지 않는 무인 일괄 처리용)
+    
+    Request:
+        - pdf: PDF 파일 (multipart/form-data)
+        - extract: (선택) false면 감지 결과만 반환
+        - pattern_extraction, engine, parallel, row_detection, low_memory, char_loader, format, timings: (선택) /extract와 같음, 템플릿 값보다 우선
+    
+    Response:
+        - /extract 응답 + detection: {vendor, score, candidates: [{vendor, score, matched, tokens}, ...]}
+          (ndjson이면 첫 줄이 {'type': 'detection', 'fields': [...], ...})
+        - 일치하는 업체가 없으면 422 + detection
+    """
+    upload = None
+    try:
+        with StageTimer('upload'):
+            files = request.files  # multipart 본문 수신 / 파싱
+        if 'pdf' not in files:
+            return jsonify({'error': 'PDF 파일이 없습니다'}), 400
+        
+        with StageTimer('upload'):
+            upload = UploadedPDF(files['pdf'])
+        try:
+            template, detection = detected_template(upload.source)
+        except TemplateNotDetected as e:
+            return jsonify({'error': str(e), 'detection': e.detection}), 422
+        
+        if not _request_flag({}, 'extract', True):
+            return jsonify({'success': True, 'detection': detection})
+        
+        if request.values.get('pattern_extraction'):
+            template['pattern_extraction'] = _request_flag(template, 'pattern_extraction')
+        # 이제 업로드 해제는 _extract_response가 담당
+        pending, upload = upload, None
+        return _extract_response(pending, template, detection)
+    
+    except MemoryLimitExceeded as e:
+        return jsonify({'error': f'추출 오류: {str(e)}'}), 503
+    except Exception as e:
+        import traceback
+        return jsonify({'error': f'감지/추출 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+    finally:
+        if upload is not None:
+            upload.close()
+
+@app.route('/templates', methods=['GET'])
+def list_templates():
+    """템플릿 라이브러리의 업체 목록 (필드 수, 지문 토큰 수)"""
+    return jsonify({'templates': template_library.vendors()})
+
+def template_admin_required(view):
+    """
+    뷰 데코레이터: 템플릿 라이브러리 변경(등록/삭제)은 Authorization: Bearer <TEMPLATE_ADMIN_TOKEN> 요청만 허용
+    TEMPLATE_ADMIN_TOKEN이 없으면 라이브러리는 읽기 전용 (403)
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not TEMPLATE_ADMIN_TOKEN:
+            return jsonify({'error': '템플릿 라이브러리는 읽기 전용입니다 (TEMPLATE_ADMIN_TOKEN 미설정)'}), 403
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(), TEMPLATE_ADMIN_TOKEN.encode()):
+            response = jsonify({'error': '템플릿 관리 토큰이 없거나 올바르지 않습니다'})
+            response.headers['WWW-Authenticate'] = 'Bearer'
+            return response, 401
+        return view(*args, **kwargs)
+    
+    return wrapper
+
+@app.route('/templates', methods=['POST'])
+@template_admin_required
+def save_template():
+    """
+    업체 템플릿을 라이브러리에 등록 (같은 업체명이면 교체)
+    
+    Request:
+        - Authorization: Bearer <TEMPLATE_ADMIN_TOKEN>
+        - vendor: 업체명
+        - template: JSON 문자열 (app.js 템플릿 형식, fields 필수)
+        - pdf: 지문을 만들 이 업체의 샘플 PDF (template에 fingerprint가 있으면 생략 가능)
+    """
+    try:
+        vendor = (request.form.get('vendor') or '').strip()
+        if not vendor:
+            return jsonify({'error': '업체명이 없습니다'}), 400
+        
+        template_str = request.form.get('template')
+        if not template_str:
+            return jsonify({'error': '템플릿이 없습니다'}), 400
+        template = json.loads(template_str)
+        if not isinstance(template, dict) or not template.get('fields'):
+            return jsonify({'error': '템플릿에 필드가 없습니다'}), 400
+        
+        if 'pdf' in request.files:
+            upload = UploadedPDF(request.files['pdf'])
+            try:
+                template['fingerprint'] = build_fingerprint(load_first_page_chars(upload.source), template)
+            finally:
+                upload.close()
+        
+        token_count = len((template.get('fingerprint') or {}).get('tokens') or [])
+        if token_count == 0:
+            return jsonify({'error': '지문을 만들 샘플 PDF가 없거나, 샘플 첫 페이지에서 기준 토큰을 찾지 못했습니다'}), 400
+        
+        template_library.save(vendor, template)
+        return jsonify({'success': True, 'vendor': vendor, 'fingerprint_tokens': token_count}), 201
+    
+    except json.JSONDecodeError as e:
+        return jsonify({'error': f'템플릿 JSON 파싱 오류: {str(e)}'}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({'error': f'템플릿 등록 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+
+@app.route('/templates/<vendor>', methods=['DELETE'])
+@template_admin_required
+def delete_template(vendor):
+    """라이브러리에서 업체 템플릿 삭제 (Authorization: Bearer <TEMPLATE_ADMIN_TOKEN>)"""
+    if not template_library.delete(vendor):
+        return jsonify({'error': '템플릿을 찾을 수 없습니다'}), 404
+    return jsonify({'success': True})
+
+def _extract_file(pdf_path, template, engine=None, char_loader=None):
+    """
+    배치 워커: 파일 하나를 템플릿 모드(Y축 스캔 / 단일 위치)에 맞게 추출 (템플릿이 None이면 업체 자동 감지)
+    파일별 단계 시간과 처리량은 이 워커 프로세스가 지표에 기록
+    """
+    result = {}
+    timings = StageTimings()
+    try:
+        with timings.activate():
+            if template is None:
+                template, result['detection'] = detected_template(pdf_path)
+            if template.get('pattern_extraction', False):
+                result['products'] = extract_with_y_scan(pdf_path, template, engine=engine, char_loader=char_loader)
+            else:
+                result['data'] = extract_single_location(pdf_path, template)
+        return result
+    finally:
+        if METRICS_ENABLED:
+            metrics.record('batch', timings)
+
+class BatchTooLarge(ValueError):
+    """/extract/batch 파일 수 또는 zip 압축 해제 크기가 상한을 넘음"""
+
+def _save_batch_uploads(tmp_dir):
+    """
+    요청의 PDF 파일들(pdfs / pdf 여러 개)과 zip 안의 PDF를 임시 디렉터리에 저장
+
+    파일 수(BATCH_MAX_FILES)와 zip 압축 해제 크기 합(BATCH_MAX_BYTES)은 디스크에 쓰기 전에 확인
+    (zip의 압축 해제 크기는 중앙 디렉터리 값으로 계산. zipfile이 그 크기까지만 읽으므로 실제로도 넘지 않음)
+
+    Returns:
+        list: [(원래 파일명, 임시 경로), ...] 업로드 순서대로
+
+    Raises:
+        BatchTooLarge: 파일 수 또는 압축 해제 크기가 상한을 넘음
+        zipfile.BadZipFile: zip 형식 오류
+    """
+    files = request.files.getlist('pdfs') + request.files.getlist('pdf')
+    zip_file = request.files.get('zip')
+    archive = zipfile.ZipFile(zip_file.stream) if zip_file else None
+    
+    with archive or nullcontext():
+        members = []
+        if archive is not None:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and info.filename.lower().endswith('.pdf') and not info.filename.startswith('__MACOSX/')
+            ]
+        if len(files) + len(members) > BATCH_MAX_FILES:
+            raise BatchTooLarge(f'한 번에 최대 {BATCH_MAX_FILES}개 파일까지 처리할 수 있습니다')
+        if sum(info.file_size for info in members) > BATCH_MAX_BYTES:
+            raise BatchTooLarge(f'zip 압축 해제 크기가 최대 {BATCH_MAX_BYTES // (1024 * 1024)}MB를 넘습니다')
+        
+        uploads = []
+        
+        def next_path():
+            # 원래 파일명은 경로에 쓰지 않음 (zip 경로 조작 방지)
+            return os.path.join(tmp_dir, f'{len(uploads)}.pdf')
+        
+        for file_storage in files:
+            path = next_path()
+            file_storage.save(path)
+            uploads.append((file_storage.filename or os.path.basename(path), path))
+        
+        for info in members:
+            path = next_path()
+            with archive.open(info) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            uploads.append((info.filename, path))
+    
+    return uploads
+
+def _run_batch(uploads, template, engine=None, char_loader=None):
+    """
+    업로드 파일들을 프로세스 풀에서 동시에 추출 (파일별 오류는 해당 파일에만 기록)
+
+    워커가 죽어서 풀이 깨지면 같이 실패한 파일들을 새 풀에서 하나씩 다시 실행해서
+    문제 파일만 실패로 남김
+
+    Returns:
+        list: 업로드 순서대로 ('ok', result) 또는 ('error', message)
+    """
+    outcomes = [None] * len(uploads)
+    
+    def run(indices, concurrent):
+        retry = []
+        pool = get_process_pool()
+        futures = {}
+        for i in indices:
+            futures[i] = pool.submit(_extract_file, uploads[i][1], template, engine, char_loader)
+            if not concurrent:
+                futures[i].exception()  # 하나씩 실행
+        for i, future in futures.items():
+            try:
+                outcomes[i] = ('ok', future.result())
+            except BrokenProcessPool:
+                retry.append(i)
+            except Exception as e:
+                outcomes[i] = ('error', f'추출 오류: {str(e)}')
+        if retry:
+            _reset_process_pool()
+        return retry
+    
+    retry = run(range(len(uploads)), concurrent=True)
+    for i in retry:
+        if run([i], concurrent=False):
+            outcomes[i] = ('error', '추출 오류: 워커 프로세스가 비정상 종료되었습니다')
+    return outcomes
+
+@app.route('/extract/batch', methods=['POST'])
+@instrumented('batch')
+def extract_batch():
+    """
+    여러 PDF를 하나의 템플릿으로 동시에 추출
+    
+    Request:
+        - pdfs: PDF 파일 여러 개 (multipart/form-data, 같은 이름으로 반복)
+        - zip: (선택) PDF들을 담은 zip 파일
+        - template: (선택) JSON 문자열 (템플릿 정보, /extract와 동일)
+          없으면 파일마다 템플릿 라이브러리에서 업체를 자동 감지 (/detect와 동일)
+        - engine: (선택) Y축 스캔 추출 엔진
+        - char_loader: (선택) 페이지 문자 로더 ('pdfplumber', 'lean')
+    
+    Response:
+        - files: 파일별 결과 [{filename, success, products | data | error, detection}, ...]
+        - products: Y축 스캔 모드일 때 모든 파일의 제품을 합친 테이블 (각 제품에 file, 자동 감지면 vendor 추가)
+    """
+    try:
+        template_str = request.form.get('template')
+        template = json.loads(template_str) if template_str else None
+        engine = _request_option(template or {}, 'engine')
+        char_loader = _request_option(template or {}, 'char_loader')
+        
+        tmp_dir = tempfile.mkdtemp(prefix='batch_')
+        try:
+            try:
+                with StageTimer('upload'):
+                    uploads = _save_batch_uploads(tmp_dir)
+            except zipfile.BadZipFile:
+                return jsonify({'error': 'zip 파일 형식이 올바르지 않습니다'}), 400
+            except BatchTooLarge as e:
+                return jsonify({'error': str(e)}), 400
+            
+            if not uploads:
+                return jsonify({'error': 'PDF 파일이 없습니다'}), 400
+            
+            with StageTimer('parallel'):  # 파일별 단계 시간은 프로세스 풀 워커가 따로 기록
+                outcomes = _run_batch(uploads, template, engine, char_loader)
+            
+            files = []
+            merged_products = []
+            for (filename, _), (status, result) in zip(uploads, outcomes):
+                if status == 'error':
+                    files.append({'filename': filename, 'success': False, 'error': result})
+                    continue
+                file_result = {'filename': filename, 'success': True}
+                file_result.update(result)
+                if 'products' in result:
+                    file_result['product_count'] = len(result['products'])
+                    source = {'file': filename}
+                    if 'detection' in result:
+                        source['vendor'] = result['detection']['vendor']
+                    merged_products.extend({**source, **product} for product in result['products'])
+                files.append(file_result)
+            
+            response = {
+                'success': True,
+                'file_count': len(files),
+                'failed_count': sum(1 for f in files if not f['success']),
+                'files': files,
+            }
+            if template is None or template.get('pattern_extraction', False):
+                response['products'] = merged_products
+            with StageTimer('encode'):
+                return jsonify(response)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    except json.JSONDecodeError as e:
+        return jsonify({'error': f'템플릿 JSON 파싱 오류: {str(e)}'}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({'error': f'배치 추출 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+
+def _jobs_db():
+    """작업 저장소 (SQLite, WAL) 연결. 테이블이 없으면 생성"""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(JOBS_DIR, 'jobs.db'), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,          -- queued / running / done / failed
+            template TEXT NOT NULL,
+            pdf_path TEXT NOT NULL,
+            pages_done INTEGER NOT NULL DEFAULT 0,
+            pages_total INTEGER,
+            result TEXT,
+            error TEXT,
+            worker_pid INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0,  -- 실행을 시작한 횟수
+            options TEXT,                  -- Y축 스캔 실행 옵션 JSON (engine, row_detection, char_loader, low_memory)
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+    if 'attempts' not in columns:
+        # attempts 열이 생기기 전에 만든 DB
+        conn.execute('ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+    if 'options' not in columns:
+        # options 열이 생기기 전에 만든 DB (옵션 없음 = 템플릿 값 / 기본값 사용)
+        conn.execute('ALTER TABLE jobs ADD COLUMN options TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)')
+    return conn
+
+def _update_job(conn, job_id, **columns):
+    columns['updated_at'] = time.time()
+    assignments = ', '.join(f'{name} = ?' for name in columns)
+    conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*columns.values(), job_id))
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _claim_job(conn):
+    """대기 중인 가장 오래된 작업을 원자적으로 가져와 running으로 표시 (실행 횟수 증가)"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        job = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+        if job is not None:
+            _update_job(conn, job['id'], status='running', worker_pid=os.getpid(), attempts=job['attempts'] + 1)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return job
+
+def _requeue_orphaned_jobs(conn):
+    """
+    실행 중에 워커가 죽은 작업을 다시 대기열로 돌려놓음
+    JOB_MAX_ATTEMPTS번 실행해도 끝나지 않은 작업은 (워커를 죽이는 PDF일 수 있으므로) failed로 표시
+    """
+    now = time.time()
+    for job in conn.execute("SELECT id, worker_pid, attempts, pdf_path FROM jobs WHERE status = 'running'").fetchall():
+        if job['worker_pid'] is not None and _pid_alive(job['worker_pid']):
+            continue
+        if job['attempts'] >= JOB_MAX_ATTEMPTS:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, worker_pid = NULL, updated_at = ? WHERE id = ? AND status = 'running'",
+                (f'추출 오류: 작업 워커가 {job["attempts"]}번 비정상 종료되었습니다', now, job['id']),
+            )
+            if cursor.rowcount and os.path.exists(job['pdf_path']):
+                os.unlink(job['pdf_path'])
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', pages_done = 0, worker_pid = NULL WHERE id = ? AND status = 'running'",
+                (job['id'],),
+            )
+
+def _purge_expired_jobs(conn):
+    """JOB_TTL_SECONDS가 지난 완료/실패 작업 삭제"""
+    cutoff = time.time() - JOB_TTL_SECONDS
+    conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+
+def _run_job(conn, job):
+    """작업 하나 실행: 페이지가 끝날 때마다 진행 상황 기록 (단계 시간과 처리량은 작업 워커가 지표에 기록)"""
+    job_id = job['id']
+    pdf_path = job['pdf_path']
+    timings = StageTimings()
+    status = 'failed'
+    try:
+        with timings.activate():
+            template = json.loads(job['template'])
+            options = json.loads(job['options'] or '{}')
+            extra = {}
+            if template is None:
+                template, extra['detection'] = detected_template(pdf_path)
+            pages_total = get_page_count(pdf_path)
+            _update_job(conn, job_id, pages_total=pages_total, pages_done=0)
+            
+            if template.get('pattern_extraction', False):
+                # 작업 워커는 데몬 프로세스라 프로세스 풀을 만들 수 없으므로 순차 처리
+                products = []
+                for page_num, page_products in iter_y_scan_pages(pdf_path, template, **options):
+                    products.extend(page_products)
+                    _update_job(conn, job_id, pages_done=page_num + 1)
+                result = {'success': True, 'data': products_to_field_arrays(template, products), 'products': products, **extra}
+            else:
+                result = {'success': True, 'data': extract_single_location(pdf_path, template), **extra}
+                _update_job(conn, job_id, pages_done=pages_total)
+            
+            with StageTimer('encode'):
+                result_json = json.dumps(result, ensure_ascii=False)
+            _update_job(conn, job_id, status='done', result=result_json)
+        status = 'done'
+    except Exception as e:
+        _update_job(conn, job_id, status='failed', error=f'추출 오류: {str(e)}')
+    finally:
+        if os.path.exists(pdf_path):
+            os.unlink(pdf_path)
+        if METRICS_ENABLED:
+            metrics.record('job', timings, status)
+
+def run_job_worker(parent_pid=None):
+    """
+    작업 대기열을 계속 비우는 워커 루프 (별도 프로세스에서 실행)
+
+    Args:
+        parent_pid: 이 프로세스를 띄운 프로세스. 그 프로세스가 죽으면 (고아가 되면) 실행 중인 작업을 마치고 종료
+    """
+    # 감독 프로세스의 SIGTERM 처리를 물려받지 않음: 실행 중인 작업의 업로드를 지우지 않고 바로 종료해서 다시 대기열로
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    with closing(_jobs_db()) as conn:
+        last_sweep = 0
+        while parent_pid is None or os.getppid() == parent_pid:
+            # 시작할 때와 그 뒤 JOB_SWEEP_INTERVAL마다: 다른 워커가 실행 중에 죽은 작업 회수, 만료 작업 삭제
+            if time.time() - last_sweep > JOB_SWEEP_INTERVAL:
+                _requeue_orphaned_jobs(conn)
+                _purge_expired_jobs(conn)
+                last_sweep = time.time()
+            job = _claim_job(conn)
+            if job is not None:
+                _run_job(conn, job)
+                continue
+            time.sleep(JOB_POLL_INTERVAL)
+
+def supervise_job_workers(count, parent_pid=None):
+    """
+    작업 워커 프로세스 count개를 띄우고 죽으면 다시 띄움 (python app.py job-worker, gunicorn 마스터가 실행)
+    SIGTERM을 받거나 parent_pid 프로세스가 죽으면 워커를 멈추고 종료
+    (멈춘 워커가 실행하던 작업은 다른 워커가 다시 대기열로 돌려놓음)
+
+    Args:
+        count: 작업 워커 수
+        parent_pid: 감시할 부모 프로세스 (gunicorn 마스터). None이면 감시하지 않음
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    supervisor_pid = os.getpid()
+    workers = []
+    try:
+        while parent_pid is None or os.getppid() == parent_pid:
+            workers = [p for p in workers if p.is_alive()]
+            while len(workers) < count:
+                worker = multiprocessing.Process(target=run_job_worker, args=(supervisor_pid,), name='job-worker')
+                worker.start()
+                workers.append(worker)
+            time.sleep(1)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join(10)
+
+def ensure_job_workers():
+    """
+    이 웹 워커 프로세스에 딸린 작업 워커 프로세스가 JOB_WORKERS개 살아있도록 유지 (gunicorn 없이 실행할 때)
+    웹 워커가 강제 종료되어도 남지 않도록 작업 워커는 부모가 죽으면 종료
+    """
+    with _job_workers_lock:
+        _job_workers[:] = [p for p in _job_workers if p.is_alive()]
+        while len(_job_workers) < JOB_WORKERS:
+            worker = multiprocessing.Process(target=run_job_worker, args=(os.getpid(),), name='job-worker', daemon=True)
+            worker.start()
+            _job_workers.append(worker)
+
+def _job_response(job):
+    response = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'progress': {'pages_done': job['pages_done'], 'pages_total': job['pages_total']},
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+    }
+    if job['status'] == 'done':
+        response['result'] = json.loads(job['result'])
+    elif job['status'] == 'failed':
+        response['error'] = job['error']
+    return response
+
+def _job_options(template):
+    """
+    /jobs 요청의 Y축 스캔 옵션 (/extract와 같은 우선순위, 작업을 실행할 때 iter_y_scan_pages에 그대로 전달)
+
+    작업은 나중에 다른 프로세스에서 실행되므로 잘못된 값은 등록할 때 거부
+
+    Returns:
+        dict: engine, row_detection, char_loader, low_memory (없는 옵션은 실행할 때 감지된 템플릿 값 / 기본값 사용)
+
+    Raises:
+        ValueError: 알 수 없는 엔진 / 행 탐지 방식 / 문자 로더
+    """
+    options = {}
+    for key, choices, label in (('engine', CHAR_ENGINES, '추출 엔진'),
+                                ('row_detection', ROW_DETECTION_MODES, '행 탐지 방식'),
+                                ('char_loader', CHAR_LOADERS, '문자 로더')):
+        value = _request_option(template, key)
+        if value is None:
+            continue
+        if value not in choices:
+            raise ValueError(f'알 수 없는 {label}: {value}')
+        options[key] = value
+    if _request_option(template, 'low_memory') is not None:
+        options['low_memory'] = _request_flag(template, 'low_memory')
+    return options
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    비동기 추출 작업 등록: 업로드를 저장하고 작업 ID를 바로 반환
+    
+    Request:
+        - pdf: PDF 파일 (multipart/form-data)
+        - template: (선택) JSON 문자열 (템플릿 정보, /extract와 동일)
+          없으면 작업을 실행할 때 템플릿 라이브러리에서 업체를 자동 감지 (/detect와 동일)
+        - engine, row_detection, char_loader, low_memory: (선택) Y축 스캔 옵션, /extract와 같이 템플릿 값보다 우선
+    
+    Response (202):
+        - job_id, status, status_url
+    """
+    try:
+        if 'pdf' not in request.files:
+            return jsonify({'error': 'PDF 파일이 없습니다'}), 400
+        
+        template_str = request.form.get('template')
+        template = json.loads(template_str) if template_str else None  # None: 업체 자동 감지
+        options = _job_options(template or {})
+        
+        job_id = uuid.uuid4().hex
+        upload_dir = os.path.join(JOBS_DIR, 'uploads')
+        os.makedirs(upload_dir, exist_ok=True)
+        pdf_path = os.path.join(upload_dir, f'{job_id}.pdf')
+        request.files['pdf'].save(pdf_path)
+        
+        now = time.time()
+        with closing(_jobs_db()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, template, pdf_path, options, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(template, ensure_ascii=False), pdf_path, json.dumps(options), now, now),
+            )
+        
+        if JOB_WORKERS > 0 and not JOB_WORKERS_SUPERVISED:
+            ensure_job_workers()
+        
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/jobs/{job_id}'}), 202
+    
+    except json.JSONDecodeError as e:
+        return jsonify({'error': f'템플릿 JSON 파싱 오류: {str(e)}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        return jsonify({'error': f'작업 등록 오류: {str(e)}\n{traceback.format_exc()}'}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태, 진행 상황 (처리한 페이지 / 전체 페이지), 완료 시 결과 조회"""
+    with closing(_jobs_db()) as conn:
+        job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다'}), 404
+    return jsonify(_job_response(job))
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 지표 (METRICS_DIR에 기록한 모든 프로세스 합계)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/health', methods=['GET'])
 def health():
     """헬스 체크 엔드포인트"""
     return jsonify({'status': 'ok'})
 
+# 예열용 내장 PDF: 한 페이지에 'CODE1', 'BRAND', '1' 세 텍스트 (Helvetica 8pt, top ≈ 43.7)
+WARMUP_PDF = (
+    b'%PDF-1.4\n'
+    b'1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n'
+    b'2 0 obj\n<< /Type /Pages /Kids [4 0 R] /Count 1 >>\nendobj\n'
+    b'3 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n'
+    b'4 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 800] '
+    b'/Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>\nendobj\n'
+    b'5 0 obj\n<< /Length 105 >>\nstream\n'
+    b'BT /F1 8 Tf 30 750 Td (CODE1) Tj ET\n'
+    b'BT /F1 8 Tf 110 750 Td (BRAND) Tj ET\n'
+    b'BT /F1 8 Tf 170 750 Td (1) Tj ET\n'
+    b'endstream\nendobj\n'
+    b'xref\n0 6\n'
+    b'0000000000 65535 f \n'
+    b'0000000009 00000 n \n'
+    b'0000000058 00000 n \n'
+    b'0000000115 00000 n \n'
+    b'0000000185 00000 n \n'
+    b'0000000311 00000 n \n'
+    b'trailer\n<< /Size 6 /Root 1 0 R >>\nstartxref\n467\n%%EOF\n'
+)
+
+WARMUP_TEMPLATE = {
+    'pattern_extraction': True,
+    'fields': [
+        {'field': 'code', 'bbox': {'x0': 25, 'x1': 100, 'y0': 55, 'y1': 40, 'page': 0}, 'type': 'text'},
+        {'field': 'brand', 'bbox': {'x0': 105, 'x1': 165, 'y0': 55, 'y1': 40, 'page': 0}, 'type': 'text'},
+        {'field': 'qty', 'bbox': {'x0': 165, 'x1': 200, 'y0': 55, 'y1': 40, 'page': 0}, 'type': 'text'},
+    ],
+}
+
+# 예열 때 미리 import할 수 있는 모듈 → 이 모듈의 전역 이름
+_HEAVY_MODULE_GLOBALS = {'pdfplumber': 'pdfplumber', 'pandas': 'pd', 'numpy': 'np'}
+
+def warm_up(modules=()):
+    """
+    콜드 스타트 후 첫 요청 지연을 줄이기 위한 예열 (gunicorn.conf.py에서 호출)
+    내장 PDF를 한 번 파싱해서 pdfplumber/pdfminer import와 Y축 스캔 경로를 미리 실행
+    (페이지 문자 캐시는 사용하지 않음)
+
+    Args:
+        modules: 함께 미리 import할 모듈 이름 ('pandas', 'numpy')
+
+    Returns:
+        int: 내장 PDF에서 추출한 제품 수 (정상이면 1)
+    """
+    for module_name in modules:
+        placeholder = globals().get(_HEAVY_MODULE_GLOBALS.get(module_name, ''))
+        if isinstance(placeholder, _LazyModule):
+            placeholder.load()
+        else:
+            importlib.import_module(module_name)
+    
+    fields = compile_template(WARMUP_TEMPLATE).fields
+    with open_pdf(io.BytesIO(WARMUP_PDF)) as pdf:
+        page_chars = load_page_chars(pdf.pages[0])
+        load_page_chars_lean(pdf.pages[0])  # lean 로더 장치 클래스 생성 (요청마다 char_loader로 고를 수 있음)
+    products = scan_page(page_chars, fields)
+    if 'numpy' in modules:
+        scan_page(page_chars, fields, engine='numpy')
+    return len(products)
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    if len(sys.argv) > 1 and sys.argv[1] == 'job-worker':
+        # 웹 서버와 별도로 작업 워커 실행: python app.py job-worker [워커 수] [--watch-parent]
+        # (gunicorn.conf.py가 마스터에서 실행, JOB_WORKERS=0이면 직접 실행)
+        options = sys.argv[2:]
+        count = int(next((option for option in options if option.isdigit()), '1'))
+        supervise_job_workers(count, parent_pid=os.getppid() if '--watch-parent' in options else None)
+    else:
+        app.run(debug=True)
 
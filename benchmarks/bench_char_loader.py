@@ -0,0 +1,76 @@
+"""
+페이지 문자 로더 벤치마크 (pdfplumber page.chars vs pdfminer 직접 처리)
+
+합성 패킹리스트에서 다음 두 경우의 시간을 비교한다 (페이지 문자 캐시 없음, 매번 PDF를 새로 열기).
+
+- chars:    PDF를 열고 모든 페이지의 PageChars 로드 (load_page_chars vs load_page_chars_lean)
+- extract:  extract_with_y_scan 전체 (char_loader='pdfplumber' vs 'lean')
+
+모든 페이지의 PageChars(text, x0, top)와 추출 결과가 두 로더에서 같은지 확인한다.
+
+    python benchmarks/bench_char_loader.py --pages 5 20 --rows 12 --sizes 8 24
+"""
+import argparse
+import io
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+LOADERS = {'pdfplumber': app.load_page_chars, 'lean': app.load_page_chars_lean}
+
+
+def load_all(pdf_bytes, load):
+    with app.open_pdf(io.BytesIO(pdf_bytes)) as pdf:
+        return [load(page) for page in pdf.pages]
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 24])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app.page_char_cache.max_bytes = 0  # 매번 PDF에서 문자를 읽도록 (디스크 계층은 PAGE_CACHE_DIR이 없으면 꺼져 있음)
+    load_all(build_packing_list_pdf(pages=1, rows=1), app.load_page_chars)  # pdfplumber import는 측정에서 제외
+
+    print(f'{"pages":>5} {"sizes":>5} {"chars/page":>10} {"case":<8} {"pdfplumber ms":>14} {"lean ms":>9} {"speedup":>8}')
+    for pages, sizes in itertools.product(args.pages, args.sizes):
+        pdf_bytes = build_packing_list_pdf(pages=pages, rows=args.rows, size_count=sizes)
+        template = build_template(sizes)
+
+        chars = {name: best_of(lambda: load_all(pdf_bytes, load), args.repeat) for name, load in LOADERS.items()}
+        if chars['lean'][1] != chars['pdfplumber'][1]:
+            raise AssertionError('lean 로더의 PageChars가 page.chars와 다릅니다')
+        extract = {
+            name: best_of(lambda: app.extract_with_y_scan(io.BytesIO(pdf_bytes), template, char_loader=name), args.repeat)
+            for name in LOADERS
+        }
+        if extract['lean'][1] != extract['pdfplumber'][1]:
+            raise AssertionError('lean 로더의 추출 결과가 다릅니다')
+
+        char_count = sum(len(page_chars.texts) for page_chars in chars['pdfplumber'][1]) // pages
+        for case, timings in (('chars', chars), ('extract', extract)):
+            plumber, lean = timings['pdfplumber'][0], timings['lean'][0]
+            print(f'{pages:>5} {sizes:>5} {char_count:>10} {case:<8} {plumber * 1000:>14.1f} {lean * 1000:>9.1f} '
+                  f'{plumber / lean:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+업체 자동 감지 점수 계산 벤치마크
+
+라이브러리 업체 수별로 첫 페이지 토큰 하나를 모든 업체 지문과 비교하는 시간을 잰다.
+
+- per_vendor: 업체마다 지문 토큰을 페이지 토큰 전체와 비교 (업체 수 × 지문 × 페이지 토큰)
+- index:      TemplateLibrary.score. 지문 토큰 역색인으로 페이지 토큰을 한 번만 훑음
+
+합성 패킹리스트로 지문을 만든 업체 하나와 무작위 지문 업체들을 섞고, 두 방식의 점수가 같은지와
+합성 업체가 1등으로 감지되는지 확인한다. 같은 업체의 다른 문서(제품이 다른 합성 PDF)도
+DETECT_MIN_SCORE 이상으로 감지되는지 확인한다.
+
+    python benchmarks/bench_detect.py --vendors 10 100 1000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+WORDS = ['INVOICE', 'PACKING', 'LIST', 'STYLE', 'COLOR', 'SIZE', 'QTY', 'TOTAL', 'CARTON', 'NO.', 'DATE',
+         'SHIPPER', 'CONSIGNEE', 'ORIGIN', 'WEIGHT', 'NET', 'GROSS', 'PO', 'ITEM', 'DESCRIPTION']
+
+
+def random_fingerprint(rng, count):
+    tokens = []
+    for _ in range(count):
+        text = ' '.join(rng.sample(WORDS, rng.randint(1, 3)))
+        tokens.append([text, round(rng.uniform(20, 550), 1), rng.randint(20, 800)])
+    return {'tokens': tokens}
+
+
+def per_vendor_scores(library_templates, tokens, tolerance=app.FINGERPRINT_POSITION_TOLERANCE):
+    scores = []
+    for vendor, template in library_templates.items():
+        anchors = template['fingerprint']['tokens']
+        matched = sum(
+            1 for text, x, y in anchors
+            if any(t == text and abs(tx - x) <= tolerance and abs(ty - y) <= tolerance for t, tx, ty in tokens)
+        )
+        scores.append({'vendor': vendor, 'score': round(matched / len(anchors), 4), 'matched': matched, 'tokens': len(anchors)})
+    scores.sort(key=lambda s: (-s['score'], -s['matched'], s['vendor']))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vendors', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    page_chars = app.load_first_page_chars(io.BytesIO(build_packing_list_pdf(pages=1, rows=12, size_count=8)))
+    tokens = app.page_tokens(page_chars)
+    template = build_template(8)
+    fields = template['fields']
+    fingerprint = app.build_fingerprint(page_chars, template)
+    # 같은 업체의 다른 문서: 헤더는 같고 제품 행만 다름
+    other_chars = app.load_first_page_chars(io.BytesIO(build_packing_list_pdf(pages=1, rows=12, size_count=8, seed=1)))
+    other_tokens = app.page_tokens(other_chars)
+
+    print(f'page tokens: {len(tokens)}, fingerprint tokens: {len(fingerprint["tokens"])}')
+    print(f'{"vendors":>8} {"per_vendor ms":>14} {"index ms":>9} {"speedup":>8} {"other doc score":>16}')
+    for vendor_count in args.vendors:
+        templates = {'synthetic': {'fields': fields, 'fingerprint': fingerprint}}
+        for i in range(vendor_count - 1):
+            templates[f'vendor{i}'] = {'fields': fields, 'fingerprint': random_fingerprint(rng, app.FINGERPRINT_MAX_TOKENS)}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'templates.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(templates, f, ensure_ascii=False)
+            library = app.TemplateLibrary(path)
+            indexed = library.score(tokens)  # 파일 읽기와 역색인 생성은 측정에서 제외
+
+            timings = {}
+            for label, fn in (('per_vendor', lambda: per_vendor_scores(templates, tokens)), ('index', lambda: library.score(tokens))):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    scores = fn()
+                timings[label] = (time.perf_counter() - start) / args.repeat
+                if scores != indexed:
+                    raise AssertionError(f'{label} 점수가 다릅니다')
+            if indexed[0]['vendor'] != 'synthetic':
+                raise AssertionError(f'합성 업체가 감지되지 않았습니다: {indexed[:3]}')
+            other = library.score(other_tokens)
+            if other[0]['vendor'] != 'synthetic' or other[0]['score'] < app.DETECT_MIN_SCORE:
+                raise AssertionError(f'같은 업체의 다른 문서가 감지되지 않았습니다: {other[:3]}')
+
+        print(f'{vendor_count:>8} {timings["per_vendor"] * 1000:>14.2f} {timings["index"] * 1000:>9.2f} '
+              f'{timings["per_vendor"] / timings["index"]:>7.1f}x {other[0]["score"]:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+서버 측 파일 내보내기 벤치마크 (/extract format=json / csv / xlsx / parquet)
+
+합성 패킹리스트를 Flask 테스트 클라이언트로 추출하면서 형식별로 다음을 잰다 (페이지 문자 캐시는 모두 적중한 상태).
+
+- 응답 시간과 응답 크기
+- 요청 처리 중 파이썬 힙 최대 사용량 (tracemalloc). json은 data + products로 모든 값을 두 번 담은 응답 전체를 메모리에서 만들고,
+  파일 형식은 제품을 페이지마다 임시 파일에 쌓은 뒤 스트리밍 writer로 옮김
+
+내보낸 파일을 다시 읽어서 행 수와 값이 json 응답의 products와 같은지도 확인한다 (openpyxl / pyarrow가 없으면 그 형식은 건너뜀).
+
+    python benchmarks/bench_export.py --pages 50 200 --rows 12 --sizes 8
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+
+def read_rows(output_format, data):
+    """내보낸 파일 → [헤더, 행, ...] (값은 비교를 위해 문자열로)"""
+    if output_format == 'csv':
+        return list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+    if output_format == 'xlsx':
+        import openpyxl
+        sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True).active
+        return [['' if v is None else str(v) for v in row] for row in sheet.iter_rows(values_only=True)]
+    import pyarrow.parquet as pq
+    table = pq.read_table(io.BytesIO(data))
+    return [table.column_names] + [['' if v is None else str(v) for v in row.values()] for row in table.to_pylist()]
+
+
+def expected_rows(template, products, pages):
+    """json 응답 products → 내보내기와 같은 모양의 행 (사이즈는 처음 나온 순서)"""
+    columns = app._export_columns(template, list({size: None for p in products for size in (p.get('size_grid') or {})}))
+    rows = [[column.header for column in columns]]
+    for page_num, product in zip(pages, products):
+        row = []
+        for column in columns:
+            if column.field is None:
+                value = page_num + 1
+            elif column.size is None:
+                value = product.get(column.field)
+            else:
+                value = (product.get(column.field) or {}).get(column.size)
+            row.append('' if value is None else str(value))
+        rows.append(row)
+    return rows
+
+
+def request(client, pdf, template, output_format, trace=False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    response = client.post('/extract', data={
+        'pdf': (io.BytesIO(pdf), 'bench.pdf'), 'template': json.dumps(template), 'format': output_format,
+        'cache': 'false',  # json도 매번 추출 (결과 캐시 적중 제외)
+    })
+    data = response.get_data()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if response.status_code != 200:
+        raise AssertionError(f'{output_format}: {response.status_code} {data[:200]!r}')
+    return data, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    args = parser.parse_args()
+
+    template = dict(build_template(args.sizes), pattern_extraction=True)
+    client = app.app.test_client()
+    formats = ['json'] + [f for f in app.EXPORT_FORMATS if not app.export_module_missing(f)]
+    skipped = [f for f in app.EXPORT_FORMATS if f not in formats]
+    if skipped:
+        print(f'건너뜀 (패키지 없음): {", ".join(skipped)}')
+
+    print(f'{"pages":>6} {"format":<8} {"ms":>9} {"size KB":>9} {"peak heap MB":>13}')
+    for pages in args.pages:
+        pdf = build_packing_list_pdf(pages=pages, rows=args.rows, size_count=args.sizes)
+        app.extract_with_y_scan(io.BytesIO(pdf), template)  # 페이지 문자 캐시 채우기
+
+        reference = None
+        for output_format in formats:
+            # 첫 요청은 결과 확인 겸 writer 패키지 import, 시간과 힙 최대치는 따로 잼 (tracemalloc은 느려서)
+            data, _, _ = request(client, pdf, template, output_format)
+            _, elapsed, _ = request(client, pdf, template, output_format)
+            _, _, peak = request(client, pdf, template, output_format, trace=True)
+            if output_format == 'json':
+                products = json.loads(data)['products']
+                page_of = [page_num for page_num, page_products in app.iter_y_scan_pages(io.BytesIO(pdf), template)
+                           for _ in page_products]
+                reference = expected_rows(template, products, page_of)
+            elif read_rows(output_format, data) != reference:
+                raise AssertionError(f'{output_format} 내보내기 결과가 json products와 다릅니다')
+            print(f'{pages:>6} {output_format:<8} {elapsed * 1000:>9.1f} {len(data) / 1024:>9.1f} {peak / 2**20:>13.2f}')
+
+
+if __name__ == '__main__':
+    main()
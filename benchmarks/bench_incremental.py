@@ -0,0 +1,99 @@
+"""
+증분 재추출 벤치마크 (템플릿 bbox를 조정하며 같은 PDF를 반복 추출하는 편집 흐름)
+
+합성 패킹리스트에서 다음 경우의 추출 시간을 비교한다 (페이지 문자 캐시는 모두 적중한 상태).
+
+- full:         기존 추출 (incremental 없음). 편집할 때마다 모든 행 탐지 + 모든 필드 값 계산
+- cold:         증분 모드 첫 추출 (중간 결과 캐시가 빈 상태)
+- edit_x:       필드 하나(color)의 x1만 바꾼 뒤 재추출
+- edit_height:  필드 하나(price)의 y1만 바꾼 뒤 재추출
+- rename:       필드 이름만 바꾼 뒤 재추출
+- edit_top:     가장 위쪽 필드(size_grid)의 y0를 바꾼 뒤 재추출 (모든 offset이 바뀌어 전체 재계산)
+
+반복마다 조금씩 다른 값으로 편집해서 매번 바뀐 필드를 실제로 다시 계산하게 하고,
+모든 결과가 기존 추출과 같은지 확인한다.
+
+    python benchmarks/bench_incremental.py --pages 20 --rows 12 --sizes 8
+"""
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+
+def edited(template, name, key, delta, rename=None):
+    template = copy.deepcopy(template)
+    for field in template['fields']:
+        if field['field'] == name:
+            field['bbox'][key] += delta
+            if rename:
+                field['field'] = rename
+    return template
+
+
+EDITS = {
+    'edit_x': lambda t, k: edited(t, 'color', 'x1', -0.01 * (k + 1)),
+    'edit_height': lambda t, k: edited(t, 'price', 'y1', -0.01 * (k + 1)),
+    'rename': lambda t, k: edited(t, 'brand', 'x0', 0, rename=f'brand{k}'),
+    'edit_top': lambda t, k: edited(t, 'size_grid', 'y0', 0.01 * (k + 1)),
+}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for k in range(repeat):
+        fn(k)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    template = build_template(args.sizes)
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(build_packing_list_pdf(pages=args.pages, rows=args.rows, size_count=args.sizes))
+        pdf_path = tmp.name
+
+    try:
+        reference = app.extract_with_y_scan(pdf_path, template)  # 페이지 문자 캐시 채우기
+        print(f'pages={args.pages} rows/page={args.rows} sizes={args.sizes} products={len(reference)}')
+
+        def check(t):
+            result = app.extract_with_y_scan(pdf_path, t, incremental=True)
+            if result != app.extract_with_y_scan(pdf_path, t):
+                raise AssertionError('증분 추출 결과가 기존 추출과 다릅니다')
+
+        timings = {'full': timed(lambda k: app.extract_with_y_scan(pdf_path, EDITS['edit_x'](template, k)), args.repeat)}
+
+        def cold(k):
+            app.incremental_scan_cache.clear()
+            app.extract_with_y_scan(pdf_path, template, incremental=True)
+        timings['cold'] = timed(cold, args.repeat)
+
+        for label, edit in EDITS.items():
+            app.incremental_scan_cache.clear()
+            app.extract_with_y_scan(pdf_path, template, incremental=True)
+            timings[label] = timed(lambda k: app.extract_with_y_scan(pdf_path, edit(template, k), incremental=True), args.repeat)
+            check(edit(template, args.repeat))
+
+        print(f'{"mode":<12} {"ms/extract":>11} {"vs full":>8}')
+        for label, elapsed in timings.items():
+            print(f'{label:<12} {elapsed * 1000:>11.2f} {timings["full"] / elapsed:>7.1f}x')
+    finally:
+        os.unlink(pdf_path)
+
+
+if __name__ == '__main__':
+    main()
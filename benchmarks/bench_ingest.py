@@ -0,0 +1,90 @@
+"""
+업로드 PDF 수신 방식 비교 벤치마크
+
+업로드 크기별로 다음 두 방식의 지연 시간(업로드 보관 + PDF 열기 + 페이지 수 확인)을 비교한다.
+
+- tempfile: 기존 방식. NamedTemporaryFile에 저장 → 경로로 다시 열기 → 삭제
+- upload:   UploadedPDF. 작은 파일은 메모리 버퍼, UPLOAD_SPOOL_MAX_BYTES 초과는 mmap
+
+Werkzeug처럼 500KB 이하 업로드는 BytesIO, 그보다 크면 익명 임시 파일 스트림으로 흉내 낸다.
+
+    python benchmarks/bench_ingest.py --pages 1 10 50 200 --repeat 20
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf  # noqa: E402
+
+from werkzeug.datastructures import FileStorage  # noqa: E402
+
+WERKZEUG_MEMORY_LIMIT = 500 * 1024
+
+
+def make_file_storage(pdf_bytes):
+    if len(pdf_bytes) <= WERKZEUG_MEMORY_LIMIT:
+        stream = io.BytesIO(pdf_bytes)
+    else:
+        stream = tempfile.TemporaryFile()
+        stream.write(pdf_bytes)
+        stream.seek(0)
+    return FileStorage(stream=stream, filename='upload.pdf')
+
+
+def ingest_tempfile(file_storage):
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+        file_storage.save(tmp_file.name)
+        tmp_path = tmp_file.name
+    try:
+        with app.open_pdf(tmp_path) as pdf:
+            return len(pdf.pages)
+    finally:
+        os.unlink(tmp_path)
+
+
+def ingest_upload(file_storage):
+    upload = app.UploadedPDF(file_storage)
+    try:
+        with app.open_pdf(upload.source) as pdf:
+            return len(pdf.pages)
+    finally:
+        upload.close()
+
+
+def measure(fn, pdf_bytes, repeat):
+    samples = []
+    for _ in range(repeat):
+        file_storage = make_file_storage(pdf_bytes)
+        start = time.perf_counter()
+        fn(file_storage)
+        samples.append(time.perf_counter() - start)
+        file_storage.stream.close()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f'UPLOAD_SPOOL_MAX_BYTES={app.UPLOAD_SPOOL_MAX_BYTES}')
+    print(f'{"pages":>6} {"size":>10} {"mode":>8} {"tempfile ms":>12} {"upload ms":>10} {"change":>8}')
+    for pages in args.pages:
+        pdf_bytes = build_packing_list_pdf(pages=pages, rows=12, size_count=8)
+        old = measure(ingest_tempfile, pdf_bytes, args.repeat)
+        new = measure(ingest_upload, pdf_bytes, args.repeat)
+        mode = 'memory' if len(pdf_bytes) <= app.UPLOAD_SPOOL_MAX_BYTES else 'mmap'
+        change = (new - old) / old * 100
+        print(f'{pages:>6} {len(pdf_bytes) / 1024:>8.0f}KB {mode:>8} {old * 1000:>12.2f} {new * 1000:>10.2f} {change:>+7.1f}%')
+
+
+if __name__ == '__main__':
+    main()
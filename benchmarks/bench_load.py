@@ -0,0 +1,291 @@
+"""
+HTTP 부하 테스트 (gunicorn 워커 방식 / 개수 비교)
+
+워커 설정마다 gunicorn app:app을 새로 띄우고 (gunicorn.conf.py 예열 포함), 동시 클라이언트 수별로
+--duration초 동안 /extract를 쉬지 않고 보내면서 /health를 --health-interval초마다 따로 확인한다.
+엔드포인트별 처리량(req/s, /extract는 pages/s도), 지연 p50/p95/p99, 오류율(200이 아닌 응답, 연결 오류, 시간 초과)을 출력한다.
+
+워커 설정 (--configs):
+
+- sync:W         sync 워커 W개 (워커 하나가 요청 하나씩, gunicorn 기본)
+- gthread:WxT    gthread 워커 W개 × 스레드 T개
+- pool:WxT       gthread 워커 W개 × 스레드 T개 + 요청에 parallel=true
+                 (페이지 범위를 워커별 프로세스 풀 EXTRACT_WORKERS개에 나눠 처리)
+
+PDF 코퍼스는 --corpus 디렉터리의 *.pdf (템플릿은 --template), 없으면 --pages 페이지 수별 합성 패킹리스트.
+같은 PDF를 반복해서 보내므로 기본으로 페이지 문자 캐시와 추출 결과 캐시를 끄고 잰다 (--caches로 켬).
+부하 생성기도 같은 기계에서 돌기 때문에 CPU가 적으면 그만큼 서버 처리량이 낮게 나온다.
+
+    python benchmarks/bench_load.py --configs sync:2 gthread:2x4 pool:1x4 --concurrency 1 4 8 --duration 20
+    python benchmarks/bench_load.py --corpus samples/ --template template.json --json load.json
+"""
+import argparse
+import glob
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+WORKER_MODELS = ('sync', 'gthread', 'pool')
+
+ServerConfig = namedtuple('ServerConfig', ['spec', 'model', 'workers', 'threads'])
+CorpusFile = namedtuple('CorpusFile', ['name', 'pages', 'body', 'content_type'])
+
+
+def parse_config(spec):
+    """'sync:2' / 'gthread:2x4' / 'pool:1x4' → ServerConfig"""
+    model, _, counts = spec.partition(':')
+    if model not in WORKER_MODELS or not counts:
+        raise argparse.ArgumentTypeError(f'워커 설정 형식: sync:W, gthread:WxT, pool:WxT ({spec})')
+    workers, _, threads = counts.partition('x')
+    try:
+        workers, threads = int(workers), int(threads or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'워커/스레드 수는 정수여야 합니다: {spec}') from None
+    if model == 'sync' and threads != 1:
+        raise argparse.ArgumentTypeError(f'sync 워커는 스레드 수를 지정할 수 없습니다: {spec}')
+    return ServerConfig(spec, model, workers, threads)
+
+
+def multipart_body(fields, pdf_name, pdf_bytes):
+    """/extract 요청 본문 (multipart/form-data)을 미리 만들어 둠 (부하 생성기의 인코딩 비용 제외)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="pdf"; filename="{pdf_name}"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n'.encode('utf-8') + pdf_bytes + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def load_corpus(args):
+    """[(이름, 페이지 수, PDF 바이트)], 템플릿"""
+    if args.corpus:
+        import app
+        with open(args.template, encoding='utf-8') as f:
+            template = json.load(f)
+        files = []
+        for path in sorted(glob.glob(os.path.join(args.corpus, '*.pdf'))):
+            with open(path, 'rb') as f:
+                files.append((os.path.basename(path), app.get_page_count(path), f.read()))
+        if not files:
+            raise SystemExit(f'PDF가 없습니다: {args.corpus}')
+        return files, template
+
+    from synthetic import build_packing_list_pdf, build_template
+    files = [(f'synthetic-{pages}p.pdf', pages, build_packing_list_pdf(pages=pages, rows=args.rows, size_count=args.sizes))
+             for pages in args.pages]
+    return files, build_template(args.sizes)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """워커 설정 하나로 gunicorn을 띄우고 /health가 응답할 때까지 기다림 (with 블록이 끝나면 종료)"""
+    def __init__(self, config, args, log_dir):
+        self.config = config
+        self.port = free_port()
+        self.log_path = os.path.join(log_dir, f'{config.spec.replace(":", "-")}.log')
+        env = dict(os.environ, METRICS_DIR=os.path.join(log_dir, 'metrics'), JOB_WORKERS='0', GUNICORN_TIMEOUT=str(args.timeout))
+        if not args.caches:
+            env.update(PAGE_CACHE_MAX_BYTES='0', PAGE_CACHE_DIR='', RESULT_CACHE_MAX_BYTES='0')
+        if config.model == 'pool':
+            env['EXTRACT_WORKERS'] = str(args.pool_workers)
+        worker_class = 'sync' if config.model == 'sync' else 'gthread'
+        self.command = [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{self.port}',
+                        '--workers', str(config.workers), '--worker-class', worker_class,
+                        '--threads', str(config.threads), '--timeout', str(args.timeout), *args.gunicorn_args]
+        self.env = env
+        self.process = None
+
+    def __enter__(self):
+        self._log = open(self.log_path, 'wb')
+        self.process = subprocess.Popen(self.command, cwd=ROOT_DIR, env=self.env, stdout=self._log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if request(self.port, 'GET', '/health', timeout=1)[0] == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        with open(self.log_path, encoding='utf-8', errors='replace') as f:
+            raise SystemExit(f'gunicorn이 시작되지 않았습니다 ({self.config.spec}):\n{f.read()[-2000:]}')
+
+    def __exit__(self, *exc_info):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+        return False
+
+
+def request(port, method, path, body=None, content_type=None, timeout=60):
+    """요청 하나 (매번 새 연결: sync 워커는 keep-alive를 지원하지 않음) → (상태 코드, 지연 초)"""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers={'Content-Type': content_type} if content_type else {})
+        response = conn.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+class Recorder:
+    """측정 구간의 엔드포인트별 (지연, 성공 여부, 페이지 수) 기록"""
+    def __init__(self):
+        self.samples = {'extract': [], 'health': []}
+        self.recording = False
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, latency, ok, pages=0):
+        if self.recording:
+            with self._lock:
+                self.samples[endpoint].append((latency, ok, pages))
+
+
+def extract_client(port, corpus, offset, stop, recorder, timeout):
+    """닫힌 루프 클라이언트: 응답을 받자마자 다음 요청 (코퍼스 파일을 돌아가며)"""
+    i = offset
+    while not stop.is_set():
+        item = corpus[i % len(corpus)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            status, latency = request(port, 'POST', '/extract', item.body, item.content_type, timeout)
+            recorder.add('extract', latency, status == 200, item.pages)
+        except OSError:
+            recorder.add('extract', time.perf_counter() - start, False)
+
+
+def health_probe(port, interval, stop, recorder, timeout):
+    """/health를 일정 간격으로 확인 (추출 부하 중에도 헬스 체크가 제때 응답하는지)"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            status, latency = request(port, 'GET', '/health', timeout=timeout)
+            recorder.add('health', latency, status == 200)
+        except OSError:
+            recorder.add('health', time.perf_counter() - start, False)
+        stop.wait(max(interval - (time.perf_counter() - start), 0))
+
+
+def percentile(sorted_values, q):
+    """가장 가까운 순위 방식 백분위수"""
+    if not sorted_values:
+        return float('nan')
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, duration):
+    latencies = sorted(latency for latency, ok, _ in samples if ok)
+    errors = sum(1 for _, ok, _ in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'rps': len(latencies) / duration,
+        'pages_per_sec': sum(pages for _, ok, pages in samples if ok) / duration,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def run_load(port, corpus, concurrency, args):
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [threading.Thread(target=extract_client, args=(port, corpus, i, stop, recorder, args.timeout), daemon=True)
+               for i in range(concurrency)]
+    threads.append(threading.Thread(target=health_probe, args=(port, args.health_interval, stop, recorder, args.timeout),
+                                    daemon=True))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)  # 워커 예열 / 연결 안정화 구간은 기록하지 않음
+    recorder.recording = True
+    time.sleep(args.duration)
+    recorder.recording = False  # 측정 구간이 끝난 뒤 완료된 요청은 제외
+    stop.set()
+    for thread in threads:
+        thread.join(args.timeout + 5)
+    return {endpoint: summarize(samples, args.duration) for endpoint, samples in recorder.samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', type=parse_config, nargs='+',
+                        default=[parse_config(s) for s in ('sync:1', 'sync:2', 'gthread:2x4', 'pool:1x4')])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='동시 /extract 클라이언트 수')
+    parser.add_argument('--duration', type=float, default=10.0, help='측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='측정 전 부하 시간 (초)')
+    parser.add_argument('--health-interval', type=float, default=0.2, help='/health 확인 간격 (초)')
+    parser.add_argument('--timeout', type=int, default=60, help='요청 시간 초과 / gunicorn --timeout (초)')
+    parser.add_argument('--corpus', help='PDF 디렉터리 (*.pdf). 없으면 합성 패킹리스트')
+    parser.add_argument('--template', help='--corpus와 함께 쓸 템플릿 JSON 파일')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20], help='합성 패킹리스트 페이지 수')
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--pool-workers', type=int, default=max(os.cpu_count() or 1, 2), help='pool 설정의 EXTRACT_WORKERS')
+    parser.add_argument('--caches', action='store_true', help='페이지 문자 캐시 / 추출 결과 캐시를 켠 채로 측정')
+    parser.add_argument('--gunicorn-args', nargs=argparse.REMAINDER, default=[], help='gunicorn에 그대로 넘길 인자 (맨 뒤에)')
+    parser.add_argument('--json', metavar='PATH', help='결과를 JSON으로 저장')
+    args = parser.parse_args()
+    if args.corpus and not args.template:
+        parser.error('--corpus에는 --template이 필요합니다')
+
+    files, template = load_corpus(args)
+    print(f'corpus: {", ".join(f"{name} ({pages}p)" for name, pages, _ in files)}, {os.cpu_count()} CPU')
+    results = []
+    print(f'{"config":<12} {"conc":>4} {"endpoint":<8} {"req/s":>7} {"pages/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>7}')
+    with tempfile.TemporaryDirectory() as log_dir:
+        for config in args.configs:
+            fields = {'template': json.dumps(template, ensure_ascii=False)}
+            if config.model == 'pool':
+                fields['parallel'] = 'true'
+            corpus = [CorpusFile(name, pages, *multipart_body(fields, name, data)) for name, pages, data in files]
+            with Server(config, args, log_dir) as server:
+                for concurrency in args.concurrency:
+                    stats = run_load(server.port, corpus, concurrency, args)
+                    results.append({'config': config.spec, 'concurrency': concurrency, **stats})
+                    for endpoint, s in stats.items():
+                        pages = f'{s["pages_per_sec"]:>8.1f}' if endpoint == 'extract' else f'{"":>8}'
+                        print(f'{config.spec:<12} {concurrency:>4} {endpoint:<8} {s["rps"]:>7.1f} {pages} '
+                              f'{s["p50_ms"]:>8.1f} {s["p95_ms"]:>8.1f} {s["p99_ms"]:>8.1f} '
+                              f'{s["errors"]:>3}/{s["requests"]:<3}')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'corpus': [[name, pages] for name, pages, _ in files],
+                       'duration': args.duration, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f'\n저장: {args.json}')
+
+
+if __name__ == '__main__':
+    main()
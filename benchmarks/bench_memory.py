@@ -0,0 +1,90 @@
+"""
+긴 PDF 추출 시 최대 RSS 벤치마크
+
+페이지 수별로 합성 패킹리스트를 Y축 스캔으로 추출하면서 프로세스 최대 RSS를 잰다.
+측정마다 새 파이썬 프로세스를 띄워서 앞선 측정의 메모리가 섞이지 않게 한다.
+
+- unreleased: 기존 방식. 페이지 파싱 결과를 PDF를 닫을 때까지 유지
+- default:    페이지 문자만 복사하고 파싱 결과 해제, 페이지 문자는 메모리 캐시에 보관
+- low_memory: 파싱 결과 해제 + 메모리 캐시에도 두지 않음
+
+    python benchmarks/bench_memory.py --pages 25 100 300
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+MODES = ('unreleased', 'default', 'low_memory')
+
+
+def child(mode, pdf_path, size_count):
+    """측정용 자식 프로세스: 추출 후 최대 RSS(MB)와 제품 수를 JSON으로 출력"""
+    import app
+    from synthetic import build_template
+
+    template = build_template(size_count)
+    if mode == 'unreleased':
+        fields = app.compile_template(template).fields
+        product_count = 0
+        with app.open_pdf(pdf_path) as pdf:
+            for page in pdf.pages:
+                chars = page.chars
+                page_chars = app.PageChars(
+                    texts=[c['text'] for c in chars],
+                    xs=app.array('d', (c['x0'] for c in chars)),
+                    ys=app.array('d', (c['top'] for c in chars)),
+                )
+                product_count += len(app.scan_page(page_chars, fields))
+    else:
+        products = app.extract_with_y_scan(pdf_path, template, low_memory=(mode == 'low_memory'))
+        product_count = len(products)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB 단위
+    print(json.dumps({'peak_mb': peak_mb, 'products': product_count}))
+
+
+def measure(mode, pdf_path, size_count):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, pdf_path, str(size_count)],
+        cwd=BENCH_DIR,
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[25, 100, 300])
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'PDF', 'SIZES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, pdf_path, size_count = args.child
+        child(mode, pdf_path, int(size_count))
+        return
+
+    from synthetic import build_packing_list_pdf
+
+    print(f'{"pages":>6} ' + ' '.join(f'{mode + " MB":>14}' for mode in MODES))
+    for pages in args.pages:
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+            tmp.write(build_packing_list_pdf(pages=pages, rows=12, size_count=args.sizes))
+            pdf_path = tmp.name
+        try:
+            results = [measure(mode, pdf_path, args.sizes) for mode in MODES]
+            if len({r['products'] for r in results}) != 1:
+                raise AssertionError('모드별 추출 제품 수가 다릅니다')
+            print(f'{pages:>6} ' + ' '.join(f'{r["peak_mb"]:>14.1f}' for r in results))
+        finally:
+            os.unlink(pdf_path)
+
+
+if __name__ == '__main__':
+    main()
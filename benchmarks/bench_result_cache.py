@@ -0,0 +1,93 @@
+"""
+추출 결과 캐시 벤치마크 (여러 gunicorn 워커에 같은 PDF + 같은 템플릿 요청이 동시에 들어오는 경우)
+
+--clients개 프로세스가 동시에 같은 합성 패킹리스트를 추출할 때 전체 시간, 요청별 지연, 실제 추출 횟수를 비교한다.
+
+- off:    결과 캐시 없음. 프로세스마다 처음부터 추출
+- cold:   빈 결과 캐시. 한 프로세스만 추출하고 나머지는 그 결과를 기다림 (coalesced)
+- warm:   결과 캐시 적중 (먼저 저장된 결과를 SQLite에서 읽음)
+
+모든 결과가 캐시 없는 추출과 같은지 확인한다.
+
+    python benchmarks/bench_result_cache.py --pages 20 --rows 12 --sizes 8 --clients 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+
+def client(pdf_path, template, cache_path, barrier, extractions, queue):
+    """요청 하나: 다른 클라이언트와 동시에 시작해서 (지연, 캐시 조회 결과, 결과) 반환"""
+    cache = app.ResultCache(cache_path, 1 << 30, 300) if cache_path else None
+
+    def extract_result():
+        with extractions.get_lock():
+            extractions.value += 1
+        return {'products': app.extract_with_y_scan(pdf_path, template)}
+
+    barrier.wait()
+    start = time.perf_counter()
+    if cache is None:
+        result, status = extract_result(), 'off'
+    else:
+        result, status = cache.get_or_compute(cache.key(app.pdf_sha256(pdf_path), template), extract_result)
+    queue.put((time.perf_counter() - start, status, result))
+
+
+def run(pdf_path, template, cache_path, clients):
+    barrier = multiprocessing.Barrier(clients)
+    extractions = multiprocessing.Value('i', 0)
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client, args=(pdf_path, template, cache_path, barrier, extractions, queue))
+                 for _ in range(clients)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start, extractions.value, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--clients', type=int, default=4)
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method('fork')
+    app.page_char_cache.max_bytes = 0  # 프로세스마다 PDF를 처음부터 파싱 (워커 간 페이지 문자 캐시 공유 없음)
+    template = build_template(args.sizes)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'packing_list.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(build_packing_list_pdf(pages=args.pages, rows=args.rows, size_count=args.sizes))
+        reference = {'products': app.extract_with_y_scan(pdf_path, template)}  # pdfplumber import는 측정에서 제외
+        cache_path = os.path.join(tmp_dir, 'results.db')
+        print(f'pages={args.pages} rows/page={args.rows} sizes={args.sizes} products={len(reference["products"])} '
+              f'clients={args.clients}')
+
+        print(f'{"mode":<6} {"wall ms":>9} {"max ms":>9} {"extractions":>12}  statuses')
+        for mode, path in (('off', None), ('cold', cache_path), ('warm', cache_path)):
+            wall, extractions, results = run(pdf_path, template, path, args.clients)
+            for _, _, result in results:
+                if result != reference:
+                    raise AssertionError(f'{mode} 결과가 캐시 없는 추출과 다릅니다')
+            statuses = ', '.join(f'{s}={sum(1 for _, status, _ in results if status == s)}'
+                                 for s in sorted({status for _, status, _ in results}))
+            print(f'{mode:<6} {wall * 1000:>9.1f} {max(r[0] for r in results) * 1000:>9.1f} {extractions:>12}  {statuses}')
+
+
+if __name__ == '__main__':
+    main()
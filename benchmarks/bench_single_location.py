@@ -0,0 +1,90 @@
+"""
+단일 위치 추출 벤치마크
+
+필드마다 page.crop()을 만들던 기존 방식과, 필드를 페이지별로 묶어 문자를 한 번만
+정렬해서 나눠주는 현재 extract_single_location()의 결과가 같은지 확인하고 처리 시간을 비교한다.
+
+    python benchmarks/bench_single_location.py --pages 2 --rows 12 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber  # noqa: E402
+
+from app import _table_records, extract_single_location  # noqa: E402
+from synthetic import build_packing_list_pdf, build_single_location_template  # noqa: E402
+
+
+def extract_per_field_crop(pdf_path, template):
+    """기존 방식: 필드마다 페이지를 crop해서 extract_text / extract_tables"""
+    extracted_data = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        for field_info in template.get('fields', []):
+            field_name = field_info['field']
+            bbox = field_info['bbox']
+            page_num = bbox['page']
+            if page_num >= len(pdf.pages):
+                extracted_data[field_name] = None
+                continue
+            page = pdf.pages[page_num]
+            x_left = min(bbox['x0'], bbox['x1'])
+            x_right = max(bbox['x0'], bbox['x1'])
+            crop = page.crop((x_left, page.height - bbox['y0'], x_right, page.height - bbox['y1']))
+            if field_info.get('type', 'text') == 'table' or field_name == 'size_grid':
+                tables = crop.extract_tables()
+                extracted_data[field_name] = _table_records(tables[0]) if tables else []
+            else:
+                text = crop.extract_text()
+                extracted_data[field_name] = text.strip() if text else ''
+    return extracted_data
+
+
+def timed(fn, pdf_path, template, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(pdf_path, template)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(pages, rows, sizes, repeat, text_only=False):
+    template = build_single_location_template(pages=pages, rows=rows, size_count=sizes)
+    if text_only:
+        template['fields'] = [f for f in template['fields'] if f['type'] == 'text']
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(build_packing_list_pdf(pages=pages, rows=12, size_count=sizes))
+        pdf_path = tmp.name
+
+    try:
+        reference = extract_per_field_crop(pdf_path, template)
+        result = extract_single_location(pdf_path, template)
+        if result != reference or list(result) != list(reference):
+            raise AssertionError('페이지 묶음 추출 결과가 필드별 crop 결과와 다릅니다')
+
+        old = timed(extract_per_field_crop, pdf_path, template, repeat)
+        new = timed(extract_single_location, pdf_path, template, repeat)
+        label = '텍스트 필드만' if text_only else '텍스트 + 표 필드'
+        print(f'pages={pages} fields={len(template["fields"])} ({label})')
+        print(f'  per-field crop {old * 1000:9.1f} ms/run')
+        print(f'  page grouped   {new * 1000:9.1f} ms/run  ({old / new:.1f}x, 결과 일치)')
+    finally:
+        os.unlink(pdf_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=12, help='페이지당 템플릿에 넣을 제품 행 수 (행당 필드 6개)')
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.pages, args.rows, args.sizes, args.repeat, text_only=True)
+    run(args.pages, args.rows, args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+사이즈 그리드 파서 벤치마크
+
+사이즈 열 수별로 그리드 하나당 파싱 시간을 잰다 (패턴 없음 / 저장된 셀 패턴, 개별 / 배치).
+회귀 코퍼스 결과 일치는 tests/test_size_grid_equivalence.py에서 확인한다.
+
+    python benchmarks/bench_size_grid.py --sizes 8 24 60 --grids 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_size_grid, parse_size_grids  # noqa: E402
+
+
+def build_grids(size_count, grid_count, seed=0):
+    """size 행 + qty 행 그리드와, 첫 그리드로 만든 셀 패턴"""
+    rng = random.Random(seed)
+    grids = []
+    for _ in range(grid_count):
+        field_chars = []
+        for i in range(size_count):
+            x = 100 + i * 24 + rng.uniform(-2, 2)
+            field_chars += [(700.0, x + k * 4.45, ch) for k, ch in enumerate(str(30 + i))]
+            if rng.random() < 0.8:
+                field_chars += [(688.0, x + 2, str(rng.randint(1, 12)))]
+        grids.append(field_chars)
+
+    def cells(y):
+        xs = sorted(x for cy, x, _ in grids[0] if cy == y)
+        groups = [[xs[0]]]
+        for x in xs[1:]:
+            if x - groups[-1][-1] > 15:
+                groups.append([])
+            groups[-1].append(x)
+        return [{'text': '', 'xCenter': (g[0] + g[-1]) / 2} for g in groups]
+
+    pattern = {'size_row_y': 700, 'qty_row_y': 688, 'size_cells': cells(700.0), 'qty_cells': cells(688.0)}
+    return grids, pattern
+
+
+def bench(size_counts, grid_count, repeat):
+    print(f'{"sizes":>6} {"pattern":>8} {"single us/grid":>15} {"batch us/grid":>14}')
+    for size_count in size_counts:
+        grids, pattern = build_grids(size_count, grid_count)
+        for label, grid_pattern in (('none', None), ('cells', pattern)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for g in grids:
+                    parse_size_grid(g, grid_pattern)
+            single_time = (time.perf_counter() - start) / repeat / grid_count
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parse_size_grids(grids, grid_pattern)
+            batch_time = (time.perf_counter() - start) / repeat / grid_count
+            print(f'{size_count:>6} {label:>8} {single_time * 1e6:>15.1f} {batch_time * 1e6:>14.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 24, 60])
+    parser.add_argument('--grids', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    bench(args.sizes, args.grids, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
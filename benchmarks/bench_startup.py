@@ -0,0 +1,119 @@
+"""
+콜드 스타트 벤치마크 (python -X importtime 기반)
+
+LAZY_IMPORTS=0(모듈 로드 시 전부 import)과 LAZY_IMPORTS=1(기본, 쓰는 경로에서 import)에 대해
+새 파이썬 프로세스에서 다음을 잰다.
+
+- import app: -X importtime으로 잰 누적 시간과, app이 직접 가져오는 무거운 import 상위 목록
+- 첫 요청: import 후 /health, 그리고 내장 예열 PDF로 /extract (Y축 스캔)을 처음 처리하는 시간
+
+--max-import-ms를 주면 지연 import 모드의 import app 시간이 그보다 길거나,
+import 직후 pandas/numpy/pdfplumber가 로드되어 있으면 실패(exit 1)한다.
+
+    python benchmarks/bench_startup.py --repeat 3 --max-import-ms 600
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pdfplumber', 'pandas', 'numpy')
+
+FIRST_REQUEST_SCRIPT = '''
+import io, json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+loaded = [m for m in %r if m in sys.modules]
+client = app.app.test_client()
+client.get('/health')
+health = time.perf_counter()
+response = client.post('/extract', data={
+    'pdf': (io.BytesIO(app.WARMUP_PDF), 'warmup.pdf'),
+    'template': json.dumps(app.WARMUP_TEMPLATE),
+})
+assert response.status_code == 200, response.data
+extracted = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'health_ms': (health - imported) * 1000,
+    'extract_ms': (extracted - health) * 1000,
+    'loaded_after_import': loaded,
+}))
+''' % (HEAVY_MODULES,)
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → (app 누적 us, {최상위 패키지: 누적 us}) app 아래 한 단계 import를 패키지별로 합산"""
+    app_total = None
+    direct = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, _, cumulative_us, name = line.replace('import time:', '|', 1).split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        module = name.strip()
+        if module == 'app' and depth == 0:
+            app_total = int(cumulative_us)
+        elif depth == 1:
+            package = module.split('.')[0]
+            direct[package] = direct.get(package, 0) + int(cumulative_us)
+    return app_total, direct
+
+
+def run_importtime(lazy):
+    env = dict(os.environ, LAZY_IMPORTS='1' if lazy else '0', RESULT_CACHE_MAX_BYTES='0')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def run_first_request(lazy):
+    env = dict(os.environ, LAZY_IMPORTS='1' if lazy else '0', RESULT_CACHE_MAX_BYTES='0')
+    output = subprocess.check_output([sys.executable, '-c', FIRST_REQUEST_SCRIPT], cwd=ROOT_DIR, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help='표시할 무거운 import 개수')
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    failures = []
+    for lazy in (False, True):
+        label = 'lazy (LAZY_IMPORTS=1)' if lazy else 'eager (LAZY_IMPORTS=0)'
+        importtimes = [run_importtime(lazy) for _ in range(args.repeat)]
+        requests = [run_first_request(lazy) for _ in range(args.repeat)]
+
+        import_ms = statistics.median(total for total, _ in importtimes) / 1000
+        print(f'{label}')
+        print(f'  import app (importtime)  {import_ms:8.1f} ms')
+        for key, name in (('import_ms', 'import app (wall)'), ('health_ms', 'first /health'), ('extract_ms', 'first /extract')):
+            print(f'  {name:<24} {statistics.median(r[key] for r in requests):8.1f} ms')
+        print('  heaviest direct imports (패키지별):')
+        heaviest = sorted(((us, package) for package, us in importtimes[0][1].items()), reverse=True)
+        for cumulative_us, package in heaviest[:args.top]:
+            print(f'    {cumulative_us / 1000:8.1f} ms  {package}')
+
+        if lazy:
+            loaded = requests[0]['loaded_after_import']
+            if loaded:
+                failures.append(f'지연 import 모드인데 import app 직후 로드됨: {", ".join(loaded)}')
+            if args.max_import_ms is not None and import_ms > args.max_import_ms:
+                failures.append(f'import app {import_ms:.1f} ms > 허용 {args.max_import_ms:.1f} ms')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+추출 성능 벤치마크 모음 (기준값 저장 / 커밋 간 비교)
+
+합성 패킹리스트(페이지 수 × 페이지당 행 수 × 사이즈 열 수 조합)마다 다음 단계를 새 파이썬 프로세스에서 따로 실행해서
+처리량(pages/sec, products/sec)과 프로세스 최대 RSS를 잰다. 시간은 가장 빠른 반복의 값
+(최소 --repeat번, 짧은 단계는 합계가 --min-time초가 될 때까지 반복해서 잡음을 줄임).
+
+- y_scan:          extract_with_y_scan, 페이지 문자 캐시 없음 (PDF 파싱 포함)
+- y_scan_cached:   extract_with_y_scan, 페이지 문자 캐시 적중 (행 탐지 + 필드 값 계산만)
+- size_grid:       parse_size_grids, 제품 수만큼의 사이즈 그리드 (패턴 없음)
+- single_location: extract_single_location, 페이지마다 앞쪽 3개 행의 텍스트 필드 5개 + 사이즈 그리드 표
+
+--save로 결과를 JSON으로 저장하고 (기본: benchmarks/baselines/<커밋>.json), --compare로 저장해 둔 기준값과 비교한다.
+처리량이 --threshold 비율보다 많이 떨어지거나, 최대 RSS가 그만큼 늘거나, 제품 수가 달라지면 회귀로 보고 실패(exit 1)한다.
+기준값은 측정한 기계에 따라 다르므로 같은 기계에서 잰 값끼리 비교한다.
+
+    python benchmarks/bench_suite.py --pages 1 20 --rows 4 12 --sizes 8 24 --save
+    git checkout <다른 커밋> && python benchmarks/bench_suite.py --compare <기준 커밋>
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+sys.path.insert(0, ROOT_DIR)
+
+STAGES = ('y_scan', 'y_scan_cached', 'size_grid', 'single_location')
+SINGLE_LOCATION_ROWS = 3  # 단일 위치 추출 템플릿의 페이지당 행 수 (표 필드가 느려서 앞쪽 행만)
+
+
+def child(stage, pdf_path, pages, rows, sizes, repeat, min_time):
+    """측정용 자식 프로세스: 단계 하나를 반복 실행하고 가장 빠른 시간, 처리량, 최대 RSS를 JSON으로 출력"""
+    import app
+    from synthetic import build_single_location_template, build_template, rows_per_page
+
+    if stage == 'size_grid':
+        from bench_size_grid import build_grids
+        grids, _ = build_grids(sizes, pages * min(rows, rows_per_page()))
+        run = lambda: app.parse_size_grids(grids)  # noqa: E731
+        count = lambda result: sum(1 for grid in result if grid)  # noqa: E731
+    elif stage == 'single_location':
+        template = build_single_location_template(pages=pages, rows=SINGLE_LOCATION_ROWS, size_count=sizes)
+        run = lambda: app.extract_single_location(pdf_path, template)  # noqa: E731
+        count = lambda result: sum(1 for name, value in result.items() if name.startswith('code_') and value)  # noqa: E731
+    else:
+        template = build_template(sizes)
+        if stage == 'y_scan_cached':
+            app.extract_with_y_scan(pdf_path, template)  # 페이지 문자 캐시 채우기
+        run = lambda: app.extract_with_y_scan(pdf_path, template)  # noqa: E731
+        count = len
+
+    best = float('inf')
+    total = 0.0
+    runs = 0
+    while runs < repeat or total < min_time:
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+
+    print(json.dumps({
+        'seconds': best,
+        'pages_per_sec': pages / best,
+        'products_per_sec': count(result) / best,
+        'products': count(result),
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # Linux: KB 단위
+        'runs': runs,
+    }))
+
+
+def measure(stage, pdf_path, pages, rows, sizes, repeat, min_time):
+    # y_scan은 매번 PDF를 파싱하도록 페이지 문자 캐시를 끔 (디스크 캐시도 쓰지 않음)
+    env = dict(os.environ, PAGE_CACHE_MAX_BYTES='0' if stage == 'y_scan' else '67108864', PAGE_CACHE_DIR='',
+               METRICS_ENABLED='false')
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--child', stage, pdf_path, str(pages), str(rows), str(sizes),
+         str(repeat), str(min_time)],
+        cwd=BENCH_DIR, env=env,
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_commit():
+    """현재 커밋 (추적 중인 파일에 커밋하지 않은 변경이 있으면 '-dirty'), git이 없으면 'unknown'"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                                        text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def baseline_path(name):
+    """--compare 인자: 파일 경로 또는 benchmarks/baselines의 커밋 이름 (앞부분만 써도 됨)"""
+    if os.path.exists(name):
+        return name
+    matches = sorted(f for f in os.listdir(BASELINE_DIR) if f.startswith(name) and f.endswith('.json')) \
+        if os.path.isdir(BASELINE_DIR) else []
+    if len(matches) != 1:
+        raise SystemExit(f'기준값을 찾을 수 없습니다: {name} (후보: {", ".join(matches) or "없음"})')
+    return os.path.join(BASELINE_DIR, matches[0])
+
+
+def compare(results, baseline, threshold):
+    """기준값과 비교해서 회귀 목록 반환 (같은 case/stage만 비교)"""
+    regressions = []
+    print(f'\n기준값 비교: {baseline["commit"]} ({baseline["created"]}) → {results["commit"]}, 허용 {threshold:.0%}')
+    print(f'{"case":<14} {"stage":<16} {"pages/s":>10} {"peak MB":>10}')
+    for case, stages in results['cases'].items():
+        for stage, current in stages.items():
+            base = baseline['cases'].get(case, {}).get(stage)
+            if base is None:
+                continue
+            speed = current['pages_per_sec'] / base['pages_per_sec']
+            memory = current['peak_mb'] / base['peak_mb']
+            print(f'{case:<14} {stage:<16} {speed:>9.2f}x {memory:>9.2f}x')
+            if current['products'] != base['products']:
+                regressions.append(f'{case} {stage}: 제품 수 {base["products"]} → {current["products"]}')
+            if speed < 1 - threshold:
+                regressions.append(f'{case} {stage}: 처리량 {speed:.2f}배')
+            if memory > 1 + threshold:
+                regressions.append(f'{case} {stage}: 최대 RSS {memory:.2f}배')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 20])
+    parser.add_argument('--rows', type=int, nargs='+', default=[4, 12], help='페이지당 제품 행 수')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 24], help='사이즈 그리드 열 수')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3, help='최소 반복 횟수')
+    parser.add_argument('--min-time', type=float, default=1.0, help='단계별 최소 측정 시간 (초)')
+    parser.add_argument('--save', nargs='?', const='', default=None, metavar='PATH',
+                        help='결과 저장 (경로를 빼면 benchmarks/baselines/<커밋>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='비교할 기준값 파일 또는 커밋')
+    parser.add_argument('--threshold', type=float, default=0.15, help='회귀로 볼 처리량 감소 / 메모리 증가 비율')
+    args = parser.parse_args()
+
+    from synthetic import build_packing_list_pdf, rows_per_page
+
+    results = {
+        'commit': git_commit(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)',
+        'repeat': args.repeat,
+        'min_time': args.min_time,
+        'cases': {},
+    }
+    print(f'commit {results["commit"]}, python {results["python"]}, {results["machine"]}')
+    print(f'{"case":<14} {"stage":<16} {"ms":>9} {"pages/s":>9} {"products/s":>11} {"peak MB":>8}')
+    for pages, rows, sizes in itertools.product(args.pages, args.rows, args.sizes):
+        rows = min(rows, rows_per_page())
+        case = f'{pages}p-{rows}r-{sizes}s'
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+            tmp.write(build_packing_list_pdf(pages=pages, rows=rows, size_count=sizes))
+            pdf_path = tmp.name
+        try:
+            for stage in args.stages:
+                result = measure(stage, pdf_path, pages, rows, sizes, args.repeat, args.min_time)
+                results['cases'].setdefault(case, {})[stage] = result
+                print(f'{case:<14} {stage:<16} {result["seconds"] * 1000:>9.1f} {result["pages_per_sec"]:>9.1f} '
+                      f'{result["products_per_sec"]:>11.1f} {result["peak_mb"]:>8.1f}')
+        finally:
+            os.unlink(pdf_path)
+
+    if args.save is not None:
+        path = args.save or os.path.join(BASELINE_DIR, f'{results["commit"]}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f'\n저장: {path}')
+
+    if args.compare:
+        with open(baseline_path(args.compare), encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], *(int(v) for v in sys.argv[4:8]), float(sys.argv[8]))
+    else:
+        main()
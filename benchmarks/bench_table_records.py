@@ -0,0 +1,131 @@
+"""
+표 필드 레코드 변환 벤치마크 (단일 위치 추출의 type 'table' 필드)
+
+1. 무작위 표(정수/실수/지수/공백/부호/문자열/빈 셀/들쭉날쭉한 행)를 만들어
+   _table_records 결과가 기존 pandas 경로(_table_records_pandas)와 값과 타입까지 같은지 확인한다.
+2. 표 크기별로 표 하나를 레코드로 바꾸는 시간을 비교한다.
+
+    python benchmarks/bench_table_records.py --tables 2000 --shapes 3x4 10x6 50x8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+SPECIAL_CELLS = [
+    'inf', '-Inf', '+infinity', 'nan', 'NaN', '1,000', '12 PCS', 'S', 'M/L', '', ' ', '.', '-', '+.',
+    '1e', '0x1F', '1_0', '١٢', '12\x00', 'True', '3/4', '--1', '1..2', 'None', '2e400', '1e-400',
+]
+PADDING = [' ', '\t', '\n', '\v', '\f', '\r', '\xa0', '']
+
+
+def random_cell(rng):
+    if rng.random() < 0.1:
+        return None
+    digits = lambda n: ''.join(rng.choice('0123456789') for _ in range(n))  # noqa: E731
+    kind = rng.random()
+    if kind < 0.3:
+        text = digits(rng.randint(1, 18))
+    elif kind < 0.6:
+        text = digits(rng.randint(0, 9)) + '.' + digits(rng.randint(0, 9))
+    elif kind < 0.75:
+        text = (digits(rng.randint(0, 6)) + rng.choice(['', '.']) + digits(rng.randint(0, 4))
+                + rng.choice('eE') + rng.choice(['', '+', '-']) + digits(rng.randint(0, 4)))
+    else:
+        text = rng.choice(SPECIAL_CELLS)
+    if rng.random() < 0.2:
+        text = rng.choice('+-') + text
+    if rng.random() < 0.15:
+        text = rng.choice(PADDING) + text + rng.choice(PADDING)
+    return text
+
+
+def random_table(rng):
+    rows, cols = rng.randint(0, 6), rng.randint(0, 5)
+    integer_columns = rng.random() < 0.5
+    table = []
+    for _ in range(rows):
+        width = cols if rng.random() > 0.1 else rng.randint(0, cols + 1)
+        table.append([
+            str(rng.randint(-999, 99999)) if integer_columns and c % 2 == 0 and rng.random() < 0.9 else random_cell(rng)
+            for c in range(width)
+        ])
+    return table
+
+
+def signature(records):
+    """값과 타입(int/float/str/None)을 함께 비교하기 위한 JSON 문자열"""
+    return json.dumps([
+        [[key, 'float' if isinstance(value, float) else type(value).__name__, value] for key, value in record.items()]
+        for record in records
+    ])
+
+
+def check(table_count, seed):
+    rng = random.Random(seed)
+    fast = 0
+    for i in range(table_count):
+        table = random_table(rng)
+        expected = app._table_records_pandas(table)
+        actual = app._table_records(table)
+        if signature(actual) != signature(expected):
+            raise AssertionError(f'표 {i} 결과가 pandas 경로와 다릅니다: {table!r}\n{signature(actual)}\n{signature(expected)}')
+        fast += app._fast_table_records(table) is not None
+    print(f'check: {table_count}개 표 결과 일치 (pandas 없이 변환 {fast}개, pandas 경로 {table_count - fast}개)')
+
+
+def packing_table(rows, cols, rng):
+    """헤더 + 품번/수량/단가/비고가 섞인 일반적인 패킹리스트 표"""
+    header = [f'COL{c}' for c in range(cols)]
+    body = []
+    for _ in range(rows - 1):
+        row = []
+        for c in range(cols):
+            kind = c % 4
+            if kind == 0:
+                row.append(f'AB{rng.randint(1000, 9999)}')
+            elif kind == 1:
+                row.append(str(rng.randint(1, 500)))
+            elif kind == 2:
+                row.append(f'{rng.uniform(1, 100):.2f}')
+            else:
+                row.append(rng.choice([None, '', 'OK', str(rng.randint(1, 9))]))
+        body.append(row)
+    return [header] + body
+
+
+def bench(shapes, repeat):
+    rng = random.Random(0)
+    print(f'{"shape":>8} {"pandas us":>10} {"fast us":>9} {"speedup":>8}')
+    for rows, cols in shapes:
+        table = packing_table(rows, cols, rng)
+        app._table_records_pandas(table)  # pandas import는 측정에서 제외
+        timings = {}
+        for label, fn in (('pandas', app._table_records_pandas), ('fast', app._table_records)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn(table)
+            timings[label] = (time.perf_counter() - start) / repeat
+        print(f'{rows:>4}x{cols:<3} {timings["pandas"] * 1e6:>10.1f} {timings["fast"] * 1e6:>9.1f} '
+              f'{timings["pandas"] / timings["fast"]:>7.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, default=2000, help='결과 비교용 무작위 표 개수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shapes', nargs='+', default=['3x4', '10x6', '50x8'], help='행x열')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    check(args.tables, args.seed)
+    bench([tuple(int(n) for n in shape.split('x')) for shape in args.shapes], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+단계별 시간 수집 / 지표 기록 오버헤드 벤치마크 (운영에서 켜 둬도 되는지 확인)
+
+합성 패킹리스트로 다음을 잰다 (페이지 문자 캐시는 모두 적중한 상태, 가장 빠른 반복 기준).
+
+- y_scan:   extract_with_y_scan 한 번. 수집 안 함 vs StageTimings 활성 (페이지마다 StageTimer 진입/종료)
+- request:  Flask 테스트 클라이언트로 /extract 한 번. METRICS_ENABLED 끔 vs 켬
+            (Server-Timing 헤더 + 지표 누적 + METRICS_DIR 파일 저장 포함)
+- record:   metrics.record 한 번 (지표 누적 + 파일 저장)
+
+--max-overhead를 주면 y_scan 또는 request 오버헤드가 그 비율(%)을 넘을 때 실패(exit 1)한다.
+
+    python benchmarks/bench_timings.py --pages 20 --rows 12 --sizes 8 --max-overhead 5
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def paired(off, on, repeat):
+    """끔/켬을 번갈아 실행한 가장 빠른 시간 (순서에 따른 워밍업/캐시 차이를 줄임)"""
+    off(), on()
+    off_best = on_best = float('inf')
+    for _ in range(repeat):
+        off_best = min(off_best, best_of(off, 1))
+        on_best = min(on_best, best_of(on, 1))
+    return off_best, on_best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-overhead', type=float, default=None, help='허용 오버헤드 (%%)')
+    args = parser.parse_args()
+
+    template = dict(build_template(args.sizes), pattern_extraction=True)
+    pdf = build_packing_list_pdf(pages=args.pages, rows=args.rows, size_count=args.sizes)
+    source = io.BytesIO(pdf)
+    reference = app.extract_with_y_scan(source, template)  # 페이지 문자 캐시 채우기
+    print(f'pages={args.pages} rows/page={args.rows} sizes={args.sizes} products={len(reference)}')
+
+    def timed_scan():
+        timings = app.StageTimings()
+        with timings.activate():
+            if app.extract_with_y_scan(source, template) != reference:
+                raise AssertionError('단계 시간 수집 중 결과가 다릅니다')
+        return timings
+
+    stages = timed_scan().as_dict()
+    results = {'y_scan': paired(lambda: app.extract_with_y_scan(source, template), timed_scan, args.repeat)}
+
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        app.metrics.directory = metrics_dir
+        client = app.app.test_client()
+
+        def post():
+            response = client.post('/extract', data={'pdf': (io.BytesIO(pdf), 'bench.pdf'), 'template': json.dumps(template),
+                                                       'cache': 'false'})
+            if response.status_code != 200:
+                raise AssertionError(response.data[:200])
+
+        def with_metrics(enabled):
+            def run():
+                app.METRICS_ENABLED = enabled
+                post()
+            return run
+
+        results['request'] = paired(with_metrics(False), with_metrics(True), args.repeat)
+        record = best_of(lambda: app.metrics.record('extract', app.StageTimings(), 200), args.repeat * 10)
+
+    print('y_scan 단계별 ms: ' + ', '.join(f'{stage}={ms}' for stage, ms in stages.items()))
+    print(f'{"case":<8} {"off ms":>9} {"on ms":>9} {"overhead":>9}')
+    failures = []
+    for label, (off, on) in results.items():
+        overhead = (on - off) / off * 100
+        print(f'{label:<8} {off * 1000:>9.2f} {on * 1000:>9.2f} {overhead:>8.1f}%')
+        if args.max_overhead is not None and overhead > args.max_overhead:
+            failures.append(f'{label} 오버헤드 {overhead:.1f}% > 허용 {args.max_overhead:.1f}%')
+    print(f'record   {record * 1e6:>9.1f} us (지표 누적 + 파일 저장)')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
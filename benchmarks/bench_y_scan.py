@@ -0,0 +1,71 @@
+"""
+Y축 스캔 엔진 비교 벤치마크
+
+합성 패킹리스트를 각 엔진 × 행 탐지 방식으로 추출해서 페이지당 처리 시간을 비교한다
+(결과 일치는 tests/test_y_scan_equivalence.py에서 확인). 문자 로드를 뺀 행 탐지(scan_page)만의 시간도 따로 잰다. --notes로 제품 행 사이에
+메모 줄을 넣으면 문자가 빽빽한 페이지에서 anchor 후보 거르기의 효과를 볼 수 있다.
+
+    python benchmarks/bench_y_scan.py --pages 5 --rows 12 --sizes 8
+    python benchmarks/bench_y_scan.py --pages 5 --rows 12 --sizes 8 --notes 5 --repeat 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (  # noqa: E402
+    CHAR_ENGINES, ROW_DETECTION_MODES, compile_template, extract_with_y_scan, iter_page_chars, scan_page,
+)
+from synthetic import build_packing_list_pdf, build_template  # noqa: E402
+
+
+def run(pages, rows, sizes, repeat, seed=0, notes=0):
+    template = build_template(sizes)
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(build_packing_list_pdf(pages=pages, rows=rows, size_count=sizes, seed=seed, notes=notes))
+        pdf_path = tmp.name
+
+    try:
+        products = extract_with_y_scan(pdf_path, template)  # 페이지 문자 캐시 채우기
+        print(f'pages={pages} rows/page={rows} sizes={sizes} notes={notes} products={len(products)}')
+
+        for engine in CHAR_ENGINES:
+            for row_detection in ROW_DETECTION_MODES:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    extract_with_y_scan(pdf_path, template, engine=engine, row_detection=row_detection)
+                elapsed = (time.perf_counter() - start) / repeat
+                print(f'  {engine:<8} {row_detection:<8} {elapsed * 1000:9.1f} ms/run  {elapsed / pages * 1000:8.1f} ms/page')
+
+        # 행 탐지만: 문자를 미리 읽어 두고 scan_page 시간만 비교
+        page_chars = [chars for _, chars in iter_page_chars(pdf_path)]
+        fields = compile_template(template).fields
+        print(f'  행 탐지만 (chars={sum(len(chars.texts) for chars in page_chars)})')
+        for engine in CHAR_ENGINES:
+            for row_detection in ROW_DETECTION_MODES:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    for chars in page_chars:
+                        scan_page(chars, fields, engine, row_detection)
+                elapsed = (time.perf_counter() - start) / repeat
+                print(f'  {engine:<8} {row_detection:<8} {elapsed / pages * 1000:8.2f} ms/page')
+    finally:
+        os.unlink(pdf_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=12)
+    parser.add_argument('--sizes', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--notes', type=int, default=0, help='제품 행마다 넣는 메모 줄 수 (0-5)')
+    args = parser.parse_args()
+    run(args.pages, args.rows, args.sizes, args.repeat, notes=args.notes)
+
+
+if __name__ == '__main__':
+    main()
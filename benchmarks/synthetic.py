@@ -0,0 +1,206 @@
+"""
+합성 패킹리스트 PDF 생성기 (벤치마크/검증용)
+
+외부 의존성 없이 Helvetica 표준 폰트만 사용하는 최소 PDF를 직접 작성한다.
+생성된 PDF와 짝이 되는 Y축 스캔 템플릿도 함께 만든다.
+사이즈 그리드가 A4 폭(8열)을 넘으면 페이지를 그만큼 넓힌다.
+"""
+import random
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+FONT_SIZE = 8
+
+FIRST_ROW_TOP = 80      # 첫 제품 행의 top (pdfplumber 좌표, 위에서부터)
+ROW_PITCH = 60          # 제품 행 간격 (row_spacing_threshold 30보다 커야 함)
+QTY_LINE_GAP = 12       # size 줄과 qty 줄 간격
+NOTE_LINE_GAP = 6       # 제품 행 사이 메모 줄 간격 (qty 줄 아래부터)
+MAX_NOTE_LINES = 5
+SIZE_GRID_X = 400
+SIZE_CELL_WIDTH = 22
+
+BRANDS = ['ACNE', 'MAISON', 'NORSE', 'STUSSY', 'AURALEE', 'LEMAIRE']
+COLORS = ['BLACK', 'NAVY', 'IVORY', 'OLIVE', 'GREY', 'BROWN']
+ITEMS = ['WOOL COAT', 'CREWNECK KNIT', 'WIDE PANTS', 'OXFORD SHIRT', 'HOODIE']
+SIZE_LABELS = ['36', '37', '38', '39', '40', '41', '42', '43', '44', '45', '46', '47']
+
+
+def page_width(size_count):
+    """사이즈 그리드가 모두 들어가는 페이지 폭 (8열까지는 A4 폭)"""
+    return max(PAGE_WIDTH, SIZE_GRID_X + size_count * SIZE_CELL_WIDTH)
+
+
+def size_label(i):
+    """i번째 사이즈 열 이름 (SIZE_LABELS 다음부터는 숫자를 이어서 붙임)"""
+    return SIZE_LABELS[i] if i < len(SIZE_LABELS) else str(int(SIZE_LABELS[-1]) + i - len(SIZE_LABELS) + 1)
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _text_op(x, top, text):
+    """top 좌표(위에서부터)를 PDF 기준선 좌표로 바꿔 텍스트 연산자 생성"""
+    baseline = PAGE_HEIGHT - top - FONT_SIZE
+    return f'BT /F1 {FONT_SIZE} Tf {x:.2f} {baseline:.2f} Td ({_escape(text)}) Tj ET'
+
+
+def _row_ops(rng, row_top, size_count):
+    ops = []
+    code = f'S{rng.randint(10, 99)}UI{rng.randint(1000, 9999)}'
+    ops.append(_text_op(30, row_top, code))
+    ops.append(_text_op(110, row_top, rng.choice(BRANDS)))
+    ops.append(_text_op(170, row_top, rng.choice(ITEMS)))
+    ops.append(_text_op(300, row_top, rng.choice(COLORS)))
+    ops.append(_text_op(350, row_top, f'{rng.randint(20, 900)}.00'))
+    for i in range(size_count):
+        x = SIZE_GRID_X + i * SIZE_CELL_WIDTH
+        ops.append(_text_op(x, row_top, size_label(i)))
+        qty = rng.randint(0, 12)
+        if qty:
+            ops.append(_text_op(x, row_top + QTY_LINE_GAP, str(qty)))
+    return ops
+
+
+def _note_ops(row_top, notes):
+    """제품 행 아래 메모 줄 (텍스트 필드 열 일부에만 걸쳐서 행 탐지 후보만 늘리고 제품 행은 되지 않음)"""
+    first = row_top + QTY_LINE_GAP * 2
+    return [
+        _text_op(30, first + i * NOTE_LINE_GAP, f'NOTE {i + 1} CARTON MIXED ASSORTMENT SEE ATTACHED')
+        for i in range(min(notes, MAX_NOTE_LINES))
+    ]
+
+
+def rows_per_page():
+    return (PAGE_HEIGHT - FIRST_ROW_TOP - 40) // ROW_PITCH
+
+
+def build_packing_list_pdf(pages=1, rows=10, size_count=8, seed=0, notes=0):
+    """
+    합성 패킹리스트 PDF 생성
+
+    Args:
+        pages: 페이지 수
+        rows: 페이지당 제품 행 수 (페이지에 들어가는 최대 행 수로 제한)
+        size_count: 사이즈 그리드 열 수 (8열을 넘으면 페이지 폭을 넓힘)
+        seed: 난수 시드 (같은 시드면 같은 PDF)
+        notes: 제품 행마다 아래에 넣는 메모 줄 수 (최대 MAX_NOTE_LINES, 문자가 빽빽한 페이지용)
+
+    Returns:
+        bytes: PDF 파일 내용
+    """
+    rng = random.Random(seed)
+    rows = min(rows, rows_per_page())
+    width = page_width(size_count)
+
+    contents = []
+    for page_index in range(pages):
+        ops = [_text_op(30, 40, f'PACKING LIST  PAGE {page_index + 1}')]
+        for row in range(rows):
+            ops.extend(_row_ops(rng, FIRST_ROW_TOP + row * ROW_PITCH, size_count))
+            ops.extend(_note_ops(FIRST_ROW_TOP + row * ROW_PITCH, notes))
+        contents.append('\n'.join(ops).encode('latin-1'))
+
+    # 객체 번호: 1 카탈로그, 2 페이지 트리, 3 폰트, 이후 (페이지, 콘텐츠) 쌍
+    objects = {}
+    page_ids = []
+    for i, content in enumerate(contents):
+        page_id = 4 + i * 2
+        content_id = page_id + 1
+        page_ids.append(page_id)
+        objects[page_id] = (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>'
+        ).encode('latin-1')
+        objects[content_id] = (
+            f'<< /Length {len(content)} >>\nstream\n'.encode('latin-1') + content + b'\nendstream'
+        )
+    objects[1] = b'<< /Type /Catalog /Pages 2 0 R >>'
+    kids = ' '.join(f'{pid} 0 R' for pid in page_ids)
+    objects[2] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode('latin-1')
+    objects[3] = b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f'{obj_id} 0 obj\n'.encode('latin-1') + objects[obj_id] + b'\nendobj\n'
+    xref_pos = len(out)
+    count = max(objects) + 1
+    out += f'xref\n0 {count}\n0000000000 65535 f \n'.encode('latin-1')
+    for obj_id in range(1, count):
+        out += f'{offsets[obj_id]:010d} 00000 n \n'.encode('latin-1')
+    out += f'trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n'.encode('latin-1')
+    return bytes(out)
+
+
+def build_template(size_count=8):
+    """
+    build_packing_list_pdf()와 짝이 되는 Y축 스캔 템플릿
+
+    bbox는 extract_with_y_scan이 쓰는 문자 top 좌표계 기준 (y0 > y1)
+    """
+    top = FIRST_ROW_TOP
+
+    def bbox(x0, x1, y0, y1):
+        return {'x0': x0, 'x1': x1, 'y0': y0, 'y1': y1, 'page': 0}
+
+    text_fields = [
+        ('code', 25, 100, r'[A-Za-z0-9]+'),
+        ('brand', 105, 165, r'[A-Za-z]+'),
+        ('description', 165, 295, r'[A-Za-z]+'),
+        ('color', 295, 345, r'[A-Za-z]+'),
+        ('price', 345, 395, r'\d+'),
+    ]
+    fields = [
+        {
+            'field': name,
+            'bbox': bbox(x0, x1, top + 10, top - 3),
+            'type': 'text',
+            'pattern': {'regex': regex},
+        }
+        for name, x0, x1, regex in text_fields
+    ]
+    grid_x1 = SIZE_GRID_X + size_count * SIZE_CELL_WIDTH
+    fields.append({
+        'field': 'size_grid',
+        'bbox': bbox(SIZE_GRID_X - 5, grid_x1, top + QTY_LINE_GAP + 10, top - 3),
+        'type': 'table',
+    })
+    return {'vendor': 'SYNTHETIC', 'pattern_extraction': True, 'fields': fields}
+
+
+def build_single_location_template(pages=1, rows=3, size_count=8):
+    """
+    build_packing_list_pdf()와 짝이 되는 단일 위치 추출 템플릿
+
+    페이지마다 앞쪽 rows개 제품 행의 텍스트 필드 5개 + 사이즈 그리드(표)를 각각 필드로 만든다.
+    bbox는 프론트엔드와 같은 PDF 좌표계 (아래가 0, y0 > y1)
+    """
+    rows = min(rows, rows_per_page())
+    columns = [
+        ('code', 25, 100),
+        ('brand', 105, 165),
+        ('description', 165, 295),
+        ('color', 295, 345),
+        ('price', 345, 395),
+    ]
+    grid_x1 = SIZE_GRID_X + size_count * SIZE_CELL_WIDTH
+
+    fields = []
+    for page in range(pages):
+        for row in range(rows):
+            top = FIRST_ROW_TOP + row * ROW_PITCH
+
+            def bbox(x0, x1, bottom):
+                return {'x0': x0, 'x1': x1, 'y0': PAGE_HEIGHT - (top - 3), 'y1': PAGE_HEIGHT - bottom, 'page': page}
+
+            suffix = f'_p{page}_r{row}'
+            for name, x0, x1 in columns:
+                fields.append({'field': name + suffix, 'bbox': bbox(x0, x1, top + 10), 'type': 'text'})
+            fields.append({
+                'field': 'size_grid' + suffix,
+                'bbox': bbox(SIZE_GRID_X - 5, grid_x1, top + QTY_LINE_GAP + 10),
+                'type': 'table',
+            })
+    return {'vendor': 'SYNTHETIC', 'pattern_extraction': False, 'fields': fields}
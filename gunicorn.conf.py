@@ -0,0 +1,74 @@
+"""
+gunicorn 설정 (gunicorn은 실행 디렉터리의 gunicorn.conf.py를 자동으로 읽음)
+
+환경변수:
+- GUNICORN_PRELOAD: true면 마스터 프로세스에서 앱을 로드하고 예열한 뒤 워커를 fork
+  (import한 모듈과 예열 결과를 워커들이 공유). 기본 false
+- WARMUP: false면 예열하지 않음. 기본 true
+- WARMUP_MODULES: 예열 때 함께 import할 모듈 (쉼표 구분, 예: "pandas,numpy"). 기본 없음
+- GUNICORN_TIMEOUT: 워커 timeout (초). 앱의 RESULT_CACHE_WAIT_SECONDS 기본값도 이 값에 맞춰짐. 기본 30
+- JOB_WORKERS: 마스터가 띄울 비동기 작업 워커 수. 0이면 띄우지 않음 (python app.py job-worker로 따로 실행). 기본 1
+"""
+import os
+import subprocess
+import sys
+
+
+def _flag(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('true', '1', 'yes', 'on')
+
+
+preload_app = _flag('GUNICORN_PRELOAD', False)
+timeout = int(float(os.environ.get('GUNICORN_TIMEOUT', '30')))
+
+_warmup_enabled = _flag('WARMUP', True)
+_warmup_modules = tuple(m.strip() for m in os.environ.get('WARMUP_MODULES', '').split(',') if m.strip())
+
+# 작업 워커는 웹 워커(timeout이면 SIGKILL됨)의 자식이 아니라 마스터가 띄운 별도 프로세스로 실행
+_job_workers = int(os.environ.get('JOB_WORKERS', '1'))
+if _job_workers > 0:
+    os.environ['JOB_WORKERS_SUPERVISED'] = 'true'  # 앱을 import하기 전에 설정 (웹 워커는 작업 워커를 띄우지 않음)
+_job_supervisor = None
+
+
+def _warm_up(log):
+    import app  # preload면 이미 로드된 모듈, 아니면 워커가 방금 로드한 모듈
+
+    try:
+        product_count = app.warm_up(_warmup_modules)
+        log.info('예열 완료 (내장 PDF 제품 %d개, 모듈: %s)', product_count, ', '.join(_warmup_modules) or '-')
+    except Exception:
+        # 예열 실패로 서버가 뜨지 않는 일은 없어야 함
+        log.exception('예열 실패')
+
+
+def when_ready(server):
+    """preload: 워커를 fork하기 전에 마스터에서 한 번 예열. 작업 워커 시작"""
+    if preload_app and _warmup_enabled:
+        _warm_up(server.log)
+
+    global _job_supervisor
+    if _job_workers > 0:
+        # --watch-parent: 마스터가 강제 종료되어도 작업 워커가 남지 않음
+        app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+        _job_supervisor = subprocess.Popen([sys.executable, app_path, 'job-worker', str(_job_workers), '--watch-parent'])
+        server.log.info('작업 워커 %d개 시작 (pid %d)', _job_workers, _job_supervisor.pid)
+
+
+def on_exit(server):
+    """작업 워커 종료 (실행 중이던 작업은 다음 실행 때 다시 대기열로 돌아감)"""
+    if _job_supervisor is not None and _job_supervisor.poll() is None:
+        _job_supervisor.terminate()
+        try:
+            _job_supervisor.wait(15)
+        except subprocess.TimeoutExpired:
+            _job_supervisor.kill()
+
+
+def post_worker_init(worker):
+    """preload가 아니면 워커마다 앱을 로드한 직후 예열"""
+    if not preload_app and _warmup_enabled:
+        _warm_up(worker.log)
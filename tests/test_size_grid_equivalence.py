@@ -0,0 +1,45 @@
+"""
+사이즈 그리드 파서 회귀 확인
+
+size_grid_corpus.json의 모든 케이스를 parse_size_grid / parse_size_grids로 파싱해서
+셀 분할/매칭을 바꾸기 전 구현이 만든 size → qty 결과(키 순서 포함)와 같은지 본다.
+열 수별 파싱 시간은 benchmarks/bench_size_grid.py
+"""
+import json
+import os
+
+import pytest
+
+from app import parse_size_grid, parse_size_grids
+from bench_size_grid import build_grids
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'size_grid_corpus.json')
+
+with open(CORPUS_PATH, encoding='utf-8') as f:
+    CASES = json.load(f)['cases']
+
+
+def _field_chars(case):
+    return [tuple(c) for c in case['field_chars']]
+
+
+@pytest.mark.parametrize('case', CASES, ids=[f'{i}-{case["kind"]}' for i, case in enumerate(CASES)])
+def test_corpus_case(case):
+    result = parse_size_grid(_field_chars(case), case.get('pattern'))
+    actual = None if result is None else [[k, v] for k, v in result.items()]
+    assert actual == case['expected']
+
+
+@pytest.mark.parametrize('case', CASES, ids=[f'{i}-{case["kind"]}' for i, case in enumerate(CASES)])
+def test_corpus_case_batch(case):
+    field_chars = _field_chars(case)
+    result = parse_size_grid(field_chars, case.get('pattern'))
+    assert parse_size_grids([field_chars, field_chars], case.get('pattern')) == [result, result]
+
+
+@pytest.mark.parametrize('use_pattern', [False, True], ids=['none', 'cells'])
+@pytest.mark.parametrize('size_count', [8, 24, 60])
+def test_batch_matches_single(size_count, use_pattern):
+    grids, pattern = build_grids(size_count, 50)
+    grid_pattern = pattern if use_pattern else None
+    assert parse_size_grids(grids, grid_pattern) == [parse_size_grid(g, grid_pattern) for g in grids]
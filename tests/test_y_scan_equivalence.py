@@ -0,0 +1,37 @@
+"""
+Y축 스캔 엔진 × 행 탐지 방식 결과 일치 확인
+
+합성 패킹리스트를 기존 선형 스캔('linear' + 'scan')과 각 조합으로 추출해서 제품 목록이 완전히 같은지 본다.
+처리 시간 비교는 benchmarks/bench_y_scan.py
+"""
+import pytest
+
+from app import CHAR_ENGINES, ROW_DETECTION_MODES, extract_with_y_scan
+from synthetic import build_packing_list_pdf, build_template
+
+# (사이즈 열 수, 제품 행마다 넣는 메모 줄 수): 기본 / 넓은 사이즈 그리드 / 문자가 빽빽한 페이지
+CASES = [(8, 0), (24, 0), (8, 5)]
+
+
+@pytest.fixture(scope='module', params=CASES, ids=lambda case: f'sizes{case[0]}-notes{case[1]}')
+def packing_list(request, tmp_path_factory):
+    """(PDF 경로, 템플릿, 선형 스캔 결과)"""
+    sizes, notes = request.param
+    pdf_path = tmp_path_factory.mktemp('y_scan') / 'packing_list.pdf'
+    pdf_path.write_bytes(build_packing_list_pdf(pages=3, rows=12, size_count=sizes, seed=sizes + notes, notes=notes))
+    template = build_template(sizes)
+    reference = extract_with_y_scan(str(pdf_path), template, engine='linear', row_detection='scan')
+    return str(pdf_path), template, reference
+
+
+def test_reference_finds_every_row(packing_list):
+    _, _, reference = packing_list
+    assert len(reference) == 3 * 12
+    assert all(product['size_grid'] for product in reference)
+
+
+@pytest.mark.parametrize('row_detection', ROW_DETECTION_MODES)
+@pytest.mark.parametrize('engine', list(CHAR_ENGINES))
+def test_engine_matches_linear_scan(packing_list, engine, row_detection):
+    pdf_path, template, reference = packing_list
+    assert extract_with_y_scan(pdf_path, template, engine=engine, row_detection=row_detection) == reference